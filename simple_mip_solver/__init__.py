@@ -1,9 +1,14 @@
 from simple_mip_solver.nodes.base_node import BaseNode
 from simple_mip_solver.algorithms.branch_and_bound import BranchAndBound
+from simple_mip_solver.algorithms.solve_many import solve_many
 from simple_mip_solver.nodes.search.depth_first import DepthFirstSearchNode
+from simple_mip_solver.nodes.search.best_estimate import BestEstimateSearchNode
 from simple_mip_solver.nodes.branch.pseudo_cost import PseudoCostBranchNode
+from simple_mip_solver.nodes.branch.reliability import ReliabilityBranchNode
 from simple_mip_solver.nodes.bound.disjunctive_cut import DisjunctiveCutBoundNode
 from simple_mip_solver.nodes.nodes import PseudoCostBranchDepthFirstSearchNode, \
-    DisjunctiveCutBoundPseudoCostBranchNode
+    DisjunctiveCutBoundPseudoCostBranchNode, PseudoCostBranchBestEstimateSearchNode
+from simple_mip_solver.heuristics.diving import FractionalDiving, CoefficientDiving, \
+    PseudoCostDiving
 
 __version__ = '2.3.0'
@@ -1,9 +1,11 @@
 from coinor.cuppy.milpInstance import MILPInstance
-from cylp.py.utils.sparseUtil import csc_matrixPlus
 import inspect
+import numpy as np
 from typing import Any, List, TypeVar, Dict, Type
 
 from simple_mip_solver.nodes.base_node import BaseNode
+from simple_mip_solver.utils.lp_data import build_milp
+from simple_mip_solver.utils.presolve import Presolve
 
 
 BA = TypeVar('BA', bound='BaseAlgorithm')
@@ -13,14 +15,20 @@ class BaseAlgorithm:
     """Parent class to those used to solve Mixed Integer Linear Programs. Contains
     utility functions useful across multiple classes of algorithms"""
     def __init__(self: BA, model: MILPInstance, Node: Type[BaseNode], node_attributes: List[str],
-                 node_funcs: List[str], **kwargs: Any):
+                 node_funcs: List[str], presolve: bool = False, **kwargs: Any):
         # model asserts
         assert isinstance(model, MILPInstance), 'model must be cuppy MILPInstance'
+        assert isinstance(presolve, bool), 'presolve is boolean'
         # todo: should have assert for single constraint in model since we assume that later on
         # cuidado: this model may have changed from what you provided. bear that in mind
         # when using its reference in the future
         self.model = self._convert_constraints_to_greq(model)
         self._swapped_constraint_direction = model.sense != self.model.sense
+        # reduce the model before the root is built from it. _presolve maps
+        # solutions and dual functions of the reduced model back to this one
+        self._presolve = Presolve(self.model) if presolve else None
+        if self._presolve:
+            self.model = self._presolve.reduced_model()
 
         # Node asserts
         assert inspect.isclass(Node), 'Node must be a class'
@@ -46,27 +54,78 @@ class BaseAlgorithm:
 
     @staticmethod
     def _convert_constraints_to_greq(model: MILPInstance) -> MILPInstance:
-        """ If constraints are of the form A <= b, convert them to A >= b
+        """ If constraints are of the form A <= b, convert them to A >= b. Sparse
+        A's (e.g. of models read from MPS files) stay sparse.
 
         :return: Updated MILPInstance with constraints turned around
         """
         if model.sense == '<=':
             # all problems converted to minimization via lp.objective in MILPInstance init
-            if isinstance(model.A, csc_matrixPlus):
-                model.A = model.A.toarray()
-            return MILPInstance(A=-model.A, b=-model.b, c=model.lp.objective,
-                                l=model.l, u=model.u, integerIndices=model.integerIndices,
-                                sense=['Min', '>='], numVars=len(model.c))
+            return build_milp(A=-model.A, b=-model.b, c=model.lp.objective,
+                              l=model.l, u=model.u, integerIndices=model.integerIndices,
+                              sense=['Min', '>='], numVars=len(model.c))
         else:
             return model
 
-    def _process_rtn(self: BA, rtn: Dict[str, Any]):
-        """ Assign the values of <rtn> to their keyed attributes
+    def _process_rtn(self: BA, rtn: Dict[str, Any], snapshot: Dict[str, Any] = None):
+        """ Assign the values of <rtn> to their keyed attributes. If <rtn> was
+        computed from <snapshot>, an earlier copy of _kwargs, instead of _kwargs
+        itself, only fold in how each value changed from <snapshot> so that rtn's
+        computed from the same snapshot do not overwrite each other.
 
         :param rtn:
+        :param snapshot: the kwargs rtn was computed from if not _kwargs
         :return:
         """
         assert isinstance(rtn, dict), 'rtn must be a dictionary'
         assert all(isinstance(k, str) for k in rtn), 'rtn keys must be strings'
         for k, v in rtn.items():
-            self._kwargs[k] = v
+            if snapshot is None or k not in snapshot or k not in self._kwargs:
+                self._kwargs[k] = v
+            else:
+                self._kwargs[k] = self._merge_kwarg(k, self._kwargs[k], snapshot[k], v)
+
+    def _merge_kwarg(self: BA, key: str, current: Any, before: Any, after: Any) -> Any:
+        """ Combine the current value of a kwarg with the change a rtn made
+        to an earlier copy of it. Numbers (e.g. running totals) add the change,
+        dictionaries take the keys that were added or changed, and anything
+        else takes the rtn's value. Values are compared rather than objects
+        since rtn's from worker processes are unpickled copies.
+
+        :param key: the key in _kwargs being merged
+        :param current: the value currently in _kwargs
+        :param before: the value the rtn was computed from
+        :param after: the value in the rtn
+        :return: the merged value
+        """
+        if isinstance(after, (int, float)) and not isinstance(after, bool) and \
+                isinstance(before, (int, float)) and isinstance(current, (int, float)):
+            return current + (after - before)
+        if isinstance(after, dict) and isinstance(before, dict) and isinstance(current, dict):
+            current.update({k: v for k, v in after.items()
+                            if k not in before or not _same_value(before[k], v)})
+            return current
+        return after
+
+
+def _same_value(a: Any, b: Any) -> bool:
+    """ Whether <a> and <b> hold the same value, including arrays and containers
+    of them, which == alone can't answer with a single bool
+
+    :param a: first value
+    :param b: second value
+    :return: True if they are equal
+    """
+    if a is b:
+        return True
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same_value(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return type(a) == type(b) and len(a) == len(b) and \
+            all(_same_value(x, y) for x, y in zip(a, b))
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.array_equal(a, b)
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
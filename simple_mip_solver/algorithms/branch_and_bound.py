@@ -1,24 +1,96 @@
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+import heapq
+from math import floor
+from itertools import repeat
 import numpy as np
 from coinor.cuppy.milpInstance import MILPInstance
 from coinor.gimpy.tree import BinaryTree
 from cylp.cy.CyClpSimplex import CyClpSimplex, CyLPArray
+import os
+import pickle
 from queue import PriorityQueue
 import time
-from typing import Any, Dict, TypeVar, List, Union, Iterable, Type, Tuple
+from typing import Any, Callable, Dict, TypeVar, List, Union, Iterable, Type, Tuple
+import uuid
 
 from simple_mip_solver.algorithms.base_algorithm import BaseAlgorithm
-from simple_mip_solver.nodes.base_node import BaseNode
+from simple_mip_solver.heuristics.diving import DivingHeuristic
+from simple_mip_solver.nodes.base_node import BaseNode, shutdown_strong_branch_pool
 from simple_mip_solver.nodes.branch.pseudo_cost import PseudoCostBranchNode
+from simple_mip_solver.utils.cut_pool import CutPool
+from simple_mip_solver.utils.dual_function import DualFunction
+from simple_mip_solver.utils.lp_data import get_lp_data, build_lp, build_milp, share_coefs, \
+    shared_coefs, sharing_coefs, variable_bounds
+from simple_mip_solver.utils.solve_stats import SolveStats
+from simple_mip_solver.utils.tolerance import variable_epsilon
 from test_simple_mip_solver.example_models import small_branch
 
 B = TypeVar('B', bound='BranchAndBound')
 
 BT = TypeVar('BT', bound='BranchAndBoundTree')
 
+NQ = TypeVar('NQ', bound='NodeQueue')
+
 
 class BranchAndBoundTree(BinaryTree):
     """Class used to represent the underlying tree structure of branch and bound"""
 
+    def __init__(self: BT, **attrs: Any):
+        super().__init__(**attrs)
+        # bound of each leaf keyed by node id, and a min heap of (bound, node id)
+        # pairs over them. heap entries whose pair no longer matches _leaf_bounds
+        # are stale and get discarded when they reach the top
+        self._leaf_bounds = {}
+        self._leaf_bound_heap = []
+        # smallest bound of the leaves left out when the tree was rebuilt from a
+        # checkpoint, None if every leaf is in the tree
+        self.detached_leaf_bound = None
+
+    def add_root(self: BT, root: int, **attrs: Any):
+        super().add_root(root, **attrs)
+        self.update_leaf_bound(root)
+
+    def add_child(self: BT, n: int, parent: int, **attrs: Any):
+        """ Extends super's add_child by moving the leaf bound index from the
+        parent, which is no longer a leaf, to the new child"""
+        rtn = super().add_child(n, parent, **attrs)
+        self._leaf_bounds.pop(parent, None)
+        self.update_leaf_bound(n)
+        return rtn
+
+    def update_leaf_bound(self: BT, node_id: int) -> None:
+        """ Refresh the bound the leaf with id <node_id> contributes to the dual
+        bound of the tree. Call whenever a leaf's objective_value or dual_bound
+        changes, e.g. after it is bounded.
+
+        :param node_id: The id of the leaf to update
+        :return:
+        """
+        assert node_id in self, 'node_id must belong to the tree'
+        # placeholders for ancestors restored from a checkpoint have no instance
+        if self.get_children(node_id) or self.get_node_attr(node_id, 'node') is None:
+            return
+        n = self.get_node_instances(node_id)
+        bound = n.objective_value if n.objective_value is not None else n.dual_bound
+        self._leaf_bounds[node_id] = bound
+        heapq.heappush(self._leaf_bound_heap, (bound, node_id))
+
+    @property
+    def dual_bound(self: BT) -> Union[float, int]:
+        """ The dual bound of the whole tree, i.e. the smallest bound of any leaf.
+        Amortized O(log n) since stale heap entries are each popped at most once
+
+        :return: the dual bound of the tree
+        """
+        heap = self._leaf_bound_heap
+        while heap and self._leaf_bounds.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        if self.detached_leaf_bound is not None:
+            return min(heap[0][0] if heap else float('inf'), self.detached_leaf_bound)
+        assert heap, 'tree must have a root to have a dual bound'
+        return heap[0][0]
+
     def get_leaves(self: BT, subtree_root_id: int, depth: int = None,
                    keep: str = 'all') -> List[BaseNode]:
         """ If depth is None, gather all leaves for a subtree rooted at node with
@@ -26,39 +98,32 @@ class BranchAndBoundTree(BinaryTree):
         node with id <subtree_root_id> after descendents more than <depth> edges
         away have been removed.
 
-        Caution: Could be very slow when used repeatedly on large trees with depth > 1
+        Walks down the subtree through each node's children, so the work done is
+        proportional to the size of the (depth limited) subtree rather than the
+        whole tree. Since every branched node has two children, that is at most
+        twice the number of leaves returned.
 
         :param subtree_root_id: The id of the node that roots our subtree
         :param depth: Depth beyond which nodes are excluded from the subtree
         :param keep: Specifies if returned leaves should keep 'all' of those found, only
         those that are LP 'feasible', or only those with LP's that are 'not infeasible'.
-        :return: the desired leaves of the subtree
+        :return: the desired leaves of the subtree ordered by node id
         """
         assert subtree_root_id in self, 'subtree_root_id must belong to the tree'
         assert keep in ['all', 'feasible', 'not infeasible'], \
             "keep is one of 'all', 'feasible', or 'not infeasible'"
         if depth is not None:
             assert isinstance(depth, int) and depth >= 0, 'depth is a nonnegative integer'
-            if depth == 0:
-                rtn = self.get_node_instances([subtree_root_id])
-            elif depth == 1:
-                rtn = self.get_node_instances(self.get_children(subtree_root_id))
+        leaf_ids = []
+        stack = [(subtree_root_id, 0)]
+        while stack:
+            node_id, node_depth = stack.pop()
+            children = self.get_children(node_id)
+            if not children or node_depth == depth:
+                leaf_ids.append(node_id)
             else:
-                # leaves less than <depth> levels away
-                leaves_within_depth = [
-                    n.attr['node'] for n in self.nodes.values() if n.attr['node'].is_leaf
-                    and subtree_root_id in n.attr['node'].lineage[-depth:]
-                ]
-                # nodes <depth> levels away
-                depth_descendents = [
-                    n.attr['node'] for n in self.nodes.values() if
-                    len(n.attr['node'].lineage) >= depth + 1 and
-                    subtree_root_id == n.attr['node'].lineage[-(depth + 1)]
-                ]
-                rtn = leaves_within_depth + depth_descendents
-        else:
-            rtn = [n.attr['node'] for n in self.nodes.values() if n.attr['node'].is_leaf
-                   and subtree_root_id in n.attr['node'].lineage]
+                stack.extend((child_id, node_depth + 1) for child_id in children)
+        rtn = self.get_node_instances(sorted(leaf_ids))
         return rtn if keep == 'all' else [n for n in rtn if n.lp_feasible] if \
             keep == 'feasible' else [n for n in rtn if n.lp_feasible is not False]
 
@@ -85,7 +150,7 @@ class BranchAndBoundTree(BinaryTree):
             assert isinstance(node_ids, Iterable) and not isinstance(node_ids, str), \
                 'node_ids must be an integer or iterable (that is not a string)'
             node_ids = list(node_ids)
-        missing_ids = set(node_ids) - set(self.nodes)
+        missing_ids = {idx for idx in node_ids if idx not in self.nodes}
         assert not missing_ids, f'the following node_ids are not in the tree: {missing_ids}'
         instances = [self.nodes[idx].attr.get('node') for idx in node_ids]
         assert all(instance is not None for instance in instances), \
@@ -104,10 +169,100 @@ class BranchAndBoundTree(BinaryTree):
         <subtree_root_id> with maximum depth <depth>
         """
         assert subtree_root_id in self, 'subtree_root_id must belong to the tree'
+        if subtree_root_id == self.root.name and depth is None:
+            return self.dual_bound
         return min(n.objective_value if n.objective_value is not None else n.dual_bound
                    for n in self.get_leaves(subtree_root_id, depth=depth))
 
 
+class NodeQueue(PriorityQueue):
+    """PriorityQueue of nodes that can also drop every node that can no longer
+    beat the incumbent in one pass. Nodes whose class sets a best_bound_frequency
+    (e.g. BestEstimateSearchNode) are popped in their own priority order except
+    every best_bound_frequency-th get, which pops the node with the smallest dual
+    bound instead so the dual bound keeps improving.
+
+    Nodes are kept in two heaps, one in priority order and one in dual bound
+    order. A node popped from one is left in the other until it reaches the top
+    and is skipped there, so each get is amortized O(log n)."""
+
+    def _init(self: NQ, maxsize: int) -> None:
+        self._heap = []  # nodes in priority order
+        self._bound_heap = []  # (dual_bound, put count, node) in dual bound order
+        self._open = {}  # id of each node still queued to the node
+        self._puts = 0
+        self._gets = 0
+
+    @property
+    def queue(self: NQ) -> List[BaseNode]:
+        """The queued nodes, in no particular order"""
+        return list(self._open.values())
+
+    def _qsize(self: NQ) -> int:
+        return len(self._open)
+
+    def _put(self: NQ, node: BaseNode) -> None:
+        self._open[id(node)] = node
+        heapq.heappush(self._heap, node)
+        # the put count breaks ties so nodes are never compared by their own order
+        heapq.heappush(self._bound_heap, (node.dual_bound, self._puts, node))
+        self._puts += 1
+
+    def _get(self: NQ) -> BaseNode:
+        self._gets += 1
+        self._drop_popped(self._heap, lambda node: node)
+        frequency = getattr(self._heap[0], 'best_bound_frequency', None)
+        if not frequency or self._gets % frequency:
+            node = heapq.heappop(self._heap)
+        else:
+            self._drop_popped(self._bound_heap, lambda entry: entry[2])
+            node = heapq.heappop(self._bound_heap)[2]
+        del self._open[id(node)]
+        # rebuild once popped nodes make up most of a heap so neither grows unbounded
+        if len(self._heap) + len(self._bound_heap) > 4 * len(self._open):
+            self._rebuild()
+        return node
+
+    def _drop_popped(self: NQ, heap: list, get_node: Callable) -> None:
+        """ Pop nodes off the top of <heap> that were already popped from the
+        other heap. Stale entries keep their node alive, so its id can't be
+        reused by a node put since.
+
+        :param heap: one of the two heaps
+        :param get_node: returns the node of an entry of <heap>
+        :return:
+        """
+        while id(get_node(heap[0])) not in self._open:
+            heapq.heappop(heap)
+
+    def _rebuild(self: NQ) -> None:
+        """ Rebuild both heaps from the nodes still queued in O(n)
+
+        :return:
+        """
+        self._heap = list(self._open.values())
+        heapq.heapify(self._heap)
+        self._bound_heap = [(node.dual_bound, count, node)
+                            for count, node in enumerate(self._open.values())]
+        heapq.heapify(self._bound_heap)
+        self._puts = len(self._bound_heap)
+
+    def prune(self: NQ, cutoff: Union[float, int]) -> List[BaseNode]:
+        """ Remove all nodes whose dual bound is at least <cutoff>. One O(n)
+        pass and re-heapify instead of popping and skipping each node later.
+
+        :param cutoff: the objective value that removed nodes cannot beat
+        :return: the removed nodes
+        """
+        with self.mutex:
+            pruned = [node for node in self._open.values() if node.dual_bound >= cutoff]
+            if pruned:
+                self._open = {key: node for key, node in self._open.items()
+                              if node.dual_bound < cutoff}
+                self._rebuild()
+        return pruned
+
+
 class BranchAndBound(BaseAlgorithm):
     """Class used to solve Mixed Integer Linear Programs with the Branch and
     Bound algorithm"""
@@ -123,7 +278,11 @@ class BranchAndBound(BaseAlgorithm):
     def __init__(self: B, model: MILPInstance, Node: Type[BaseNode] = BaseNode,
                  node_queue: Any = None, node_limit: int = float('inf'),
                  mip_gap: float = .0001, logging: bool = False, max_run_time: float = float('inf'),
-                 initial_primal_bound: float = float('inf'), **kwargs: Any):
+                 initial_primal_bound: float = float('inf'), processes: int = 1,
+                 checkpoint_path: str = None, checkpoint_interval: float = 600,
+                 plunge: bool = False, heuristics: List[DivingHeuristic] = None,
+                 heuristic_frequency: int = 10, reduced_cost_fixing: bool = False,
+                 presolve: bool = False, deadline: float = None, **kwargs: Any):
         f""" Instantiates a Branch and Bound instance.
         
         CAUTION: During instantiation, all problems are converted to minimization
@@ -134,24 +293,63 @@ class BranchAndBound(BaseAlgorithm):
         {self._node_funcs}. Represents a single node in the branch and bound tree.
         :param node_queue: An object containing methods {self._queue_funcs}.
         This object is what holds and prioritizes nodes to be solved in branch and
-        bound.
+        bound. If it also has a prune method like NodeQueue's, open nodes that can
+        no longer beat the incumbent are removed in bulk whenever it improves.
         :param node_limit: if provided, max number of nodes to explore
         :param mip_gap: How close 1 minus the ratio of dual to primal bound must be 
         for the solver to terminate
         :param logging: Whether or not the solver prints status updates
         :param max_run_time: Maximum amount of time (in seconds) the solver will run
-        before terminating
+        before terminating. Processor time of this process, or wall clock time when
+        processes is more than 1 since this process mostly waits on the workers then
         :param initial_primal_bound: Best known objective value for feasible solutions
         to the MIP. NOTE: the MIP will only return a solution if a better one is found.
+        :param processes: Number of worker processes to bound and branch nodes in.
+        When more than 1, batches of up to <processes> nodes are sent to a pool of
+        workers and their results are merged back in the order the nodes left the
+        queue, so runs are repeatable. Nodes and kwargs must be picklable, which
+        rules out passing a 'cglp' for disjunctive cuts.
+        :param checkpoint_path: If provided, file solve saves its progress to
+        every <checkpoint_interval> seconds and when it finishes. Pass it to
+        BranchAndBound.resume to pick up from the last save. Like processes, this
+        rules out passing a 'cglp'.
+        :param checkpoint_interval: Seconds of wall clock time between checkpoints
+        :param plunge: Whether to evaluate one of the children of each branched
+        node right after branching instead of queueing it, following the
+        direction the branched variable was closer to rounding to. The parent
+        passes its LP to that child (see BaseNode.pass_lp), so each dive past
+        the root's children reuses one CyClpSimplex instance and only the
+        siblings left in the queue build their own. Requires processes to be 1.
+        :param heuristics: Objects with a dive method like DivingHeuristic's
+        (e.g. FractionalDiving, CoefficientDiving or PseudoCostDiving) that look
+        for incumbents below the root and every <heuristic_frequency>-th evaluated
+        node that would be branched on. Each dive's simplex iterations are
+        limited by the heuristic's max_iterations.
+        :param heuristic_frequency: how many evaluated nodes apart heuristics are run
+        :param reduced_cost_fixing: Whether to tighten the bounds of integer
+        variables by their reduced costs once there is an incumbent (see
+        BaseNode.reduced_cost_bounds). The bounds the parent's LP relaxation
+        gives are applied to children as they are created, and whenever the
+        incumbent improves the root's are applied to every open node. These
+        bounds only hold at this right hand side, so trees solved with them
+        have no dual function.
+        :param presolve: Whether to reduce the model before building the root
+        node (see utils.presolve.Presolve). model then refers to the reduced
+        MILP, while solution and objective_value are those of the original.
+        Dual functions are mapped back to the original right hand side, so they
+        are only available if presolve didn't tighten bounds with it.
+        :param deadline: If provided, the time.time() after which the solver
+        stops, like max_run_time but in wall clock time (e.g. for a batch of
+        solves sharing one budget). Not saved by checkpoints.
         :param kwargs: dictionary passed to the branch and bound functions as
         key worded arguments and which adds keys and updates values based on
         what is returned
         """
-        node_queue = node_queue or PriorityQueue()
+        node_queue = node_queue or NodeQueue()
 
         # call super
         super().__init__(model=model, Node=Node, node_attributes=self._node_attributes,
-                         node_funcs=self._node_funcs, **kwargs)
+                         node_funcs=self._node_funcs, presolve=presolve, **kwargs)
 
         # node_queue asserts
         for func in self._queue_funcs:
@@ -174,6 +372,40 @@ class BranchAndBound(BaseAlgorithm):
         # initial primal bound assert
         assert initial_primal_bound > -float('inf'), 'initial_primal_bound is real or infinite'
 
+        # processes asserts
+        assert isinstance(processes, int) and processes > 0, 'processes is a positive integer'
+        assert processes == 1 or 'cglp' not in kwargs, \
+            'a cglp references this instance, so it cannot be sent to other processes'
+        assert processes == 1 or kwargs.get('strong_branch_processes', 1) == 1, \
+            'nodes are already bounded in worker processes, so strong_branch_processes must be 1'
+
+        # checkpoint asserts
+        assert checkpoint_path is None or isinstance(checkpoint_path, str), \
+            'checkpoint_path is a string if provided'
+        assert checkpoint_interval > 0, 'checkpoint_interval is positive value'
+        assert checkpoint_path is None or 'cglp' not in kwargs, \
+            'a cglp references this instance, so it cannot be checkpointed'
+
+        # plunge asserts
+        assert isinstance(plunge, bool), 'plunge is boolean'
+        assert not plunge or processes == 1, \
+            'plunging evaluates one node at a time, so processes must be 1'
+
+        # heuristics asserts
+        heuristics = heuristics or []
+        assert isinstance(heuristics, list) and \
+            all(callable(getattr(h, 'dive', None)) for h in heuristics), \
+            'heuristics must be a list of objects with a dive function'
+        assert isinstance(heuristic_frequency, int) and heuristic_frequency > 0, \
+            'heuristic_frequency is a positive integer'
+
+        # reduced cost fixing assert
+        assert isinstance(reduced_cost_fixing, bool), 'reduced_cost_fixing is boolean'
+
+        # deadline assert
+        assert deadline is None or isinstance(deadline, (int, float)), \
+            'deadline is a number if provided'
+
         # kwargs assert
         special_keys = {'right', 'left', 'cuts'}
         assert set(kwargs.keys()).isdisjoint(special_keys), \
@@ -192,13 +424,34 @@ class BranchAndBound(BaseAlgorithm):
         self.tree = BranchAndBoundTree()
         self.tree.add_root(self.root_node.idx, node=self.root_node)
         self.solve_time = 0
+        self.stats = SolveStats()  # time, calls and simplex iterations of each node phase
         self.mip_gap = mip_gap
         self.logging = logging
         self.max_run_time = max_run_time
+        self.processes = processes
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self._shared_cuts = CutPool()
+        self._dual_function = None  # (evaluated_nodes when built, DualFunction)
+        self.plunge = plunge
+        self._plunge_node = None  # child to evaluate next instead of popping the queue
+        self.heuristics = heuristics
+        self.heuristic_frequency = heuristic_frequency
+        self.reduced_cost_fixing = reduced_cost_fixing
+        self.root_node.keep_reduced_costs = reduced_cost_fixing
+        self.deadline = deadline
+        self._coefs_key = uuid.uuid4().hex  # names the model's coefficients when shared
+
+    @property
+    def _model_coefs(self: B) -> Dict[str, Any]:
+        """ The model's constraint coefficients, which every node's LP shares,
+        keyed for sharing with other processes (see utils.lp_data.share_coefs)"""
+        constr = self.model.lp.constraints[0]
+        return {self._coefs_key: constr.varCoefs[constr.variables[0]]}
 
     @property
     def dual_bound(self):
-        return self.tree.subtree_dual_bound(self.root_node.idx)
+        return self.tree.dual_bound
 
     @property
     def current_gap(self):
@@ -219,26 +472,305 @@ class BranchAndBound(BaseAlgorithm):
 
         :return:
         """
-        start = time.process_time()
+        # workers' processor time doesn't show up in this process's
+        clock = time.perf_counter if self.processes > 1 else time.process_time
+        start = last_time_update = clock()
+        last_checkpoint = time.time()
         if self.status == 'unsolved':
             self._node_queue.put(self.root_node)
+        # workers receive the model's coefficients once, so nodes sent to and
+        # from them carry only their bounds, cuts and basis
+        coefs = self._model_coefs
+        executor = ProcessPoolExecutor(max_workers=self.processes, initializer=share_coefs,
+                                       initargs=(coefs,)) if self.processes > 1 else None
 
-        while not (self._node_queue.empty() or self._unbounded or
-                   self.evaluated_nodes >= self.node_limit or
-                   (self.current_gap is not None and self.current_gap <= self.mip_gap) or
-                   time.process_time() - start > self.max_run_time):
-            if self.evaluated_nodes % 100 == 0 and self.logging:
-                print(f'{self.evaluated_nodes} nodes evaluated gap: {self.current_gap}')
-            self._evaluate_node(self._node_queue.get())
+        with sharing_coefs(coefs):
+            try:
+                while not ((self._node_queue.empty() and self._plunge_node is None) or
+                           self._unbounded or
+                           self.evaluated_nodes >= self.node_limit or
+                           (self.current_gap is not None and self.current_gap <= self.mip_gap) or
+                           clock() - start > self.max_run_time or
+                           (self.deadline is not None and time.time() > self.deadline)):
+                    if self.evaluated_nodes % 100 == 0 and self.logging:
+                        print(f'{self.evaluated_nodes} nodes evaluated gap: {self.current_gap}')
+                    if executor:
+                        self._evaluate_nodes_in_parallel(executor)
+                    else:
+                        node, self._plunge_node = self._plunge_node, None
+                        self._evaluate_node(node if node is not None else self._node_queue.get())
+                    self.stats.add_gap(self.solve_time + clock() - last_time_update,
+                                       self.evaluated_nodes, self.current_gap)
+                    if self.checkpoint_path and \
+                            time.time() - last_checkpoint >= self.checkpoint_interval:
+                        self.solve_time += clock() - last_time_update
+                        last_time_update = clock()
+                        self.checkpoint(self.checkpoint_path)
+                        last_checkpoint = time.time()
+            finally:
+                if executor:
+                    executor.shutdown()
+                # nodes share one strong branching pool for the solve
+                shutdown_strong_branch_pool()
 
-        run_time = time.process_time() - start
-        self.solve_time += run_time
+        if self._plunge_node is not None:  # stopped mid dive
+            self._node_queue.put(self._plunge_node)
+            self._plunge_node = None
+        self.solve_time += clock() - last_time_update
         self.status = 'unbounded' if self._unbounded else 'infeasible' if \
             self._node_queue.empty() and self.primal_bound == float('inf') else \
             'optimal' if self.primal_bound < float('inf') and self.current_gap <= self.mip_gap \
             else 'stopped on iterations or time'
-        self.solution = self._best_solution
-        self.objective_value = self.primal_bound
+        self.solution = self._presolve.postsolve(self._best_solution) if self._presolve \
+            else self._best_solution
+        self.objective_value = self.primal_bound  # the LP's objective offset covers presolve
+        if self.checkpoint_path:
+            self.checkpoint(self.checkpoint_path)
+
+    def checkpoint(self: B, path: str) -> None:
+        """ Save what is needed to continue solving to <path>. Only the root and
+        open nodes are saved, each with its bounds, cuts and basis in the compact
+        form of get_lp_data(), so resuming costs time in proportion to the number
+        of open nodes rather than evaluated ones. The model's constraint
+        coefficients, which all of their LP's share, are saved once ahead of them
+        and referred to by key. The smallest bound of the other leaves is kept so
+        the dual bound stays valid. Likewise only the totals of stats and the
+        shared cuts open nodes have yet to pull are saved.
+
+        :param path: file to save the checkpoint to. Written atomically, so an
+        interruption mid-save leaves the previous checkpoint in place.
+        :return:
+        """
+        assert 'cglp' not in self._kwargs, \
+            'a cglp references this instance, so it cannot be checkpointed'
+        open_nodes = list(self._node_queue.queue) + \
+            ([self._plunge_node] if self._plunge_node is not None else [])
+        open_ids = {node.idx for node in open_nodes}
+        # the root isn't queued until solve is first called
+        unbounded_ids = open_ids | ({self.root_node.idx} if self.root_node.lp_feasible is None
+                                    else set())
+        closed_bounds = [bound for idx, bound in self.tree._leaf_bounds.items()
+                         if idx not in unbounded_ids]
+        if self.tree.detached_leaf_bound is not None:
+            closed_bounds.append(self.tree.detached_leaf_bound)
+
+        # only the cuts open nodes have yet to pull are needed to continue
+        unpulled_versions = [node.shared_cut_version for node in open_nodes] + \
+            ([self.root_node.shared_cut_version] if self.root_node.lp_feasible is None else [])
+        shared_cuts = self._shared_cuts.trimmed(min(unpulled_versions, default=
+                                                    self._shared_cuts.version))
+
+        # place in the tree of each open node's ancestors
+        ancestors = {}
+        for node in open_nodes:
+            for idx in (node.lineage or ())[1:]:
+                if idx not in ancestors and idx not in open_ids:
+                    ancestors[idx] = (self.tree.get_parent(idx),
+                                      self.tree.get_node_attr(idx, 'direction'))
+
+        # model.l and model.u can point to freed memory once its LP changes
+        coefs = self._model_coefs
+        checkpoint = {
+            'model': {'A': self._coefs_key, 'b': self.model.b, 'c': self.model.lp.objective.copy(),
+                      'l': self.model.lp.variablesLower.copy(),
+                      'u': self.model.lp.variablesUpper.copy(),
+                      'integerIndices': self.model.integerIndices},
+            'objective_offset': self.model.lp.objectiveOffset,
+            'Node': self._Node,
+            'node_queue_type': type(self._node_queue),
+            'settings': {'node_limit': self.node_limit, 'mip_gap': self.mip_gap,
+                         'logging': self.logging, 'max_run_time': self.max_run_time,
+                         'processes': self.processes, 'checkpoint_path': self.checkpoint_path,
+                         'checkpoint_interval': self.checkpoint_interval, 'plunge': self.plunge,
+                         'heuristics': self.heuristics,
+                         'heuristic_frequency': self.heuristic_frequency,
+                         'reduced_cost_fixing': self.reduced_cost_fixing},
+            'kwargs': self._kwargs,
+            'state': {'primal_bound': self.primal_bound, '_best_solution': self._best_solution,
+                      '_unbounded': self._unbounded, 'evaluated_nodes': self.evaluated_nodes,
+                      'solve_time': self.solve_time, 'stats': self.stats.totals(),
+                      '_shared_cuts': shared_cuts,
+                      '_swapped_constraint_direction': self._swapped_constraint_direction,
+                      '_presolve': self._presolve, 'status': self.status},
+            'root_node': self.root_node,
+            'open_nodes': open_nodes,
+            'ancestors': ancestors,
+            'detached_leaf_bound': min(closed_bounds) if closed_bounds else None
+        }
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'wb') as f, sharing_coefs(coefs):
+            # nodes refer to shared coefficients by key, so those go first
+            pickle.dump(shared_coefs(), f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def resume(cls: Type[B], path: str, **settings: Any) -> B:
+        """ Rebuild the BranchAndBound instance saved by checkpoint to <path>.
+        Call solve on it to continue. The tree holds only the root, the open
+        nodes and the ancestors connecting them, so features that need every
+        leaf (e.g. find_parameterized_dual_bound) are not available.
+
+        :param path: file the checkpoint was saved to
+        :param settings: constructor arguments (e.g. node_limit or max_run_time)
+        to use in place of the saved ones
+        :return: the rebuilt instance
+        """
+        with open(path, 'rb') as f:
+            coefs = pickle.load(f)
+            with sharing_coefs(coefs):
+                checkpoint = pickle.load(f)
+        kwargs = dict(checkpoint['kwargs'])
+        next_node_idx = kwargs.pop('next_node_idx')
+        A = coefs[checkpoint['model']['A']]
+        model = build_milp(sense=['Min', '>='], numVars=len(checkpoint['model']['c']),
+                           **{**checkpoint['model'], 'A': A})
+        # share the saved nodes' coefficients as the model's LP did when saved
+        model.lp.constraints[0].varCoefs[model.x] = A
+        # the saved model was already presolved, so only its offset is restored
+        model.lp.objectiveOffset = checkpoint['objective_offset']
+        bb = cls(model, Node=checkpoint['Node'], node_queue=checkpoint['node_queue_type'](),
+                 **{**checkpoint['settings'], **settings}, **kwargs)
+        bb._kwargs['next_node_idx'] = next_node_idx
+        for attr, value in checkpoint['state'].items():
+            setattr(bb, attr, value)
+        if bb.status == 'unsolved' and checkpoint['open_nodes']:
+            bb.status = 'stopped on iterations or time'  # saved mid solve
+
+        # rebuild the tree connecting the open nodes to the root
+        bb.root_node = checkpoint['root_node']
+        bb.tree = BranchAndBoundTree()
+        bb.tree.add_root(bb.root_node.idx, node=bb.root_node)
+        bb.tree.detached_leaf_bound = checkpoint['detached_leaf_bound']
+        nodes = {node.idx: node for node in checkpoint['open_nodes']}
+        if bb.root_node.idx not in nodes and bb.root_node.lp_feasible is not None:
+            # a bounded root's bound is either covered by its descendants or detached
+            bb.tree._leaf_bounds.pop(bb.root_node.idx)
+        places = {**checkpoint['ancestors'],
+                  **{idx: (node.lineage[-2], 'L' if node._b_dir == 'left' else 'R')
+                     for idx, node in nodes.items() if idx != bb.root_node.idx}}
+        for idx in sorted(places):  # parents are always created before their children
+            parent, direction = places[idx]
+            getattr(bb.tree, f'add_{"left" if direction == "L" else "right"}_child')(
+                idx, parent, node=nodes.get(idx))
+        for node in checkpoint['open_nodes']:
+            bb._node_queue.put(node)
+        return bb
+
+    @classmethod
+    def warm_start(cls: Type[B], previous: B, b: CyLPArray, **settings: Any) -> B:
+        """ Set up solving the MILP <previous> solved again with its right hand
+        side changed to <b>. Call solve on the returned instance to solve it.
+
+        The new tree starts as a copy of <previous>'s. Each of its leaves is
+        requeued to be bounded again at <b>, starting dual simplex from the leaf's
+        final basis and with the bound its lineage's part of the dual function
+        gives at <b> as its dual bound, so only leaves that can still beat the
+        incumbent are bounded and only those whose solution is fractional are
+        branched on further. <previous>'s solution is kept as the incumbent if it
+        is still feasible. The cuts a leaf added are dropped since they were only
+        valid for the old right hand side, and learned pseudo costs are kept.
+
+        :param previous: a solved BranchAndBound instance whose tree has every leaf
+        (i.e. not resumed from a checkpoint)
+        :param b: new right hand side, with constraints in the direction the
+        model <previous> was instantiated with had them
+        :param settings: constructor arguments (e.g. node_limit or max_run_time)
+        to use in place of <previous>'s
+        :return: the new instance
+        """
+        assert isinstance(previous, BranchAndBound), 'previous must be a BranchAndBound instance'
+        assert previous.status != 'unsolved', 'previous must be solved to warm start from it'
+        assert previous.tree.detached_leaf_bound is None, \
+            'warm starts need every leaf, but trees resumed from checkpoints only have open ones'
+        assert 'cglp' not in previous._kwargs, \
+            'a cglp references the previous instance, so it cannot be reused'
+        assert previous._presolve is None, \
+            "presolve reduced previous's model for its right hand side"
+        assert not previous.reduced_cost_fixing, \
+            "reduced cost fixing tightened previous's leaves for its right hand side only"
+        assert isinstance(b, CyLPArray), 'this function only works with CyLP arrays'
+        A = previous.model.A
+        assert b.shape == (A.shape[0],), 'b needs an entry for each constraint'
+
+        kwargs = deepcopy(previous._kwargs)
+        next_node_idx = kwargs.pop('next_node_idx')
+        num_vars = len(previous.model.lp.objective)
+        model = build_milp(
+            A=A, b=-b if previous._swapped_constraint_direction else b,
+            c=previous.model.lp.objective.copy(), l=previous.model.lp.variablesLower.copy(),
+            u=previous.model.lp.variablesUpper.copy(),
+            integerIndices=previous.model.integerIndices, sense=['Min', '>='], numVars=num_vars
+        )
+        defaults = {'node_limit': previous.node_limit, 'mip_gap': previous.mip_gap,
+                    'logging': previous.logging, 'max_run_time': previous.max_run_time,
+                    'processes': previous.processes, 'plunge': previous.plunge,
+                    'heuristics': previous.heuristics,
+                    'heuristic_frequency': previous.heuristic_frequency}
+        bb = cls(model, Node=previous._Node, node_queue=type(previous._node_queue)(),
+                 **{**defaults, **settings}, **kwargs)
+        bb._kwargs['next_node_idx'] = next_node_idx
+        bb._swapped_constraint_direction = previous._swapped_constraint_direction
+
+        # keep the old incumbent if it is still feasible
+        x = previous._best_solution
+        if x is not None and (A @ x >= model.b - variable_epsilon).all():
+            bb._best_solution = x
+            bb.primal_bound = float(np.inner(model.lp.objective, x))
+
+        # the old leaves' bounds on their subtrees at b. dual functions don't
+        # handle cuts, so trees with them start their leaves unbounded
+        old_leaves = previous.tree.get_leaves(previous.root_node.idx)
+        leaf_bounds = {}
+        if all(len(n._lp_data['constraints'] if n._lp is None else n.lp.constraints) == 1
+               for n in old_leaves):
+            leaf_bounds = previous.dual_function().leaf_bounds(b)
+
+        # rebuild each leaf from the new root's constraints with its own variable
+        # bounds and, when it had no cuts to change its shape, its final basis
+        lp_data = get_lp_data(model.lp)
+        node_kwargs = {k: v for k, v in bb._kwargs.items() if k != 'next_node_idx'}
+        nodes = {}
+        for old in old_leaves:
+            if old._lp is None:
+                lower, upper = variable_bounds(old._lp_data)
+                basis = old._lp_data['basis']
+            else:
+                # infeasible leaves may carry the slacks dual_function adds
+                lower = old.lp.variablesLower[:num_vars].copy()
+                upper = old.lp.variablesUpper[:num_vars].copy()
+                basis = old.lp.getBasisStatus()
+            if basis[0].shape != lp_data['basis'][0].shape or \
+                    basis[1].shape != lp_data['basis'][1].shape:
+                basis = lp_data['basis']
+            nodes[old.idx] = bb._Node(
+                lp={**lp_data, 'variables_lower': lower, 'variables_upper': upper,
+                    'basis': basis, 'status': -1},
+                integer_indices=model.integerIndices, idx=old.idx,
+                dual_bound=leaf_bounds.get(old.idx, -float('inf')), b_idx=old._b_idx,
+                b_dir=old._b_dir, b_val=old._b_val, depth=old.depth,
+                ancestors=old.lineage[:-1] or None, **node_kwargs
+            )
+
+        # branched nodes are copied as they were, so the new tree's dual function
+        # still has their bounds
+        for idx in previous.tree.nodes:
+            if idx not in nodes:
+                nodes[idx] = pickle.loads(pickle.dumps(previous.tree.get_node_instances(idx)))
+        bb.root_node = nodes[previous.root_node.idx]
+        bb.tree = BranchAndBoundTree()
+        bb.tree.add_root(bb.root_node.idx, node=bb.root_node)
+        for idx in sorted(nodes):  # parents are always created before their children
+            if idx != bb.root_node.idx:
+                direction = previous.tree.get_node_attr(idx, 'direction')
+                getattr(bb.tree, f'add_{"left" if direction == "L" else "right"}_child')(
+                    idx, previous.tree.get_parent(idx), node=nodes[idx])
+
+        bb.status = 'stopped on iterations or time'  # so solve doesn't queue the root again
+        for old in old_leaves:
+            bb._node_queue.put(nodes[old.idx])
+        bb._prune_node_queue()
+        return bb
 
     def _evaluate_node(self: B, node: BaseNode) -> None:
         """Bounds and optionally branches on the given node. Updates any attributes
@@ -251,7 +783,10 @@ class BranchAndBound(BaseAlgorithm):
         if node.dual_bound < self.primal_bound:
             self.evaluated_nodes += 1
 
+            self._pull_shared_cuts(node)
             self._process_bound_rtn(node.bound(**self._kwargs))
+            if node.idx in self.tree:
+                self.tree.update_leaf_bound(node.idx)
 
             # this solver is not designed to handle unboundedness accurately
             # need feasible milp solution, but may never find one, so assumes we do
@@ -260,50 +795,235 @@ class BranchAndBound(BaseAlgorithm):
 
             if node.lp_feasible and node.objective_value < self.primal_bound:
                 if node.mip_feasible:
-                    self._best_solution = node.solution
-                    self.primal_bound = node.objective_value
+                    self._update_incumbent(node.solution, node.objective_value)
+                else:
+                    self._run_heuristics(node)
+                    # a dive may have found a solution as good as the node's bound
+                    if node.objective_value < self.primal_bound:
+                        self._process_branch_rtn(node.idx, node.branch(**self._kwargs))
+            self.stats.add_node_stats(node.idx, node.stats)
+
+    def _evaluate_nodes_in_parallel(self: B, executor: ProcessPoolExecutor) -> None:
+        """ Parallel counterpart to _evaluate_node. Pops a batch of nodes that
+        cannot be pruned, one for each worker, then bounds and branches them in
+        <executor>'s processes. Results are merged back in the order the nodes
+        were popped so that solves are repeatable.
+
+        :param executor: pool of worker processes to evaluate nodes in
+        :return:
+        """
+        batch = []
+        while not self._node_queue.empty() and \
+                len(batch) < min(self.processes, self.node_limit - self.evaluated_nodes):
+            node = self._node_queue.get()
+            if node.dual_bound < self.primal_bound:
+                self._pull_shared_cuts(node)
+                batch.append(node)
+        if not batch:
+            return
+
+        # every node sees the same kwargs, so merge back only what each changed.
+        # reserve two indices per node for children so the workers don't collide
+        snapshot = deepcopy(self._kwargs)
+        next_node_idx = self._kwargs['next_node_idx']
+        self._kwargs['next_node_idx'] += 2 * len(batch)
+        kwargs_list = [{**snapshot, 'next_node_idx': next_node_idx + 2 * i}
+                       for i in range(len(batch))]
+
+        for node, bound_rtn, branch_rtn in executor.map(
+                _bound_and_branch, batch, kwargs_list, repeat(self.primal_bound)):
+            self.evaluated_nodes += 1
+            # the worker bounded a copy of the node, so it replaces ours in the tree
+            self.tree.set_node_attr(node.idx, 'node', node)
+            if node.idx == self.root_node.idx:
+                self.root_node = node
+            self.stats.add_node_stats(node.idx, node.stats)
+            branch_snapshot = {**snapshot, **bound_rtn}
+            self._process_bound_rtn(bound_rtn, snapshot)
+            self.tree.update_leaf_bound(node.idx)
+
+            if node.unbounded:
+                self._unbounded = True
+
+            if node.lp_feasible and node.objective_value < self.primal_bound:
+                if node.mip_feasible:
+                    self._update_incumbent(node.solution, node.objective_value)
                 else:
-                    self._process_branch_rtn(node.idx, node.branch(**self._kwargs))
+                    # the worker already branched, so its children are kept either way
+                    self._run_heuristics(node)
+                    del branch_rtn['next_node_idx']
+                    self._process_branch_rtn(node.idx, branch_rtn, branch_snapshot)
+            elif branch_rtn:
+                # pruned by an incumbent found earlier in this batch
+                node.is_leaf = True
+                node.children = None
+
+    def _update_incumbent(self: B, solution: np.ndarray,
+                          objective_value: Union[float, int]) -> None:
+        """ Make <solution> the best known feasible solution and prune the open
+        nodes it rules out
+
+        :param solution: a MILP feasible solution better than the incumbent
+        :param objective_value: the objective value of <solution>
+        :return:
+        """
+        self._best_solution = solution
+        self.primal_bound = objective_value
+        self._prune_node_queue()
+        self._fix_open_nodes_by_reduced_cost()
+
+    def _fix_open_nodes_by_reduced_cost(self: B) -> None:
+        """ Tighten every open node's bounds by the root's reduced costs and the
+        incumbent, since what the root's LP relaxation implies holds globally
+
+        :return:
+        """
+        root = self.root_node
+        if not self.reduced_cost_fixing or not root.lp_feasible:
+            return
+        lower, upper = root.reduced_cost_bounds(self.primal_bound)
+        for node in list(getattr(self._node_queue, 'queue', [])) + \
+                ([self._plunge_node] if self._plunge_node is not None else []):
+            node.tighten_bounds(lower, upper)
+
+    def _run_heuristics(self: B, node: BaseNode) -> None:
+        """ Dive from <node> with each heuristic if it is the root or every
+        <heuristic_frequency>-th evaluated node, keeping any solution found that
+        beats the incumbent. Each heuristic's time and simplex iterations are
+        recorded in stats under '<class name>.dive'.
+
+        :param node: a bounded node with a fractional LP relaxation solution
+        :return:
+        """
+        # workers bound copies of nodes, so compare ids
+        if node.idx != self.root_node.idx and self.evaluated_nodes % self.heuristic_frequency:
+            return
+        for heuristic in self.heuristics:
+            phase = f'{type(heuristic).__name__}.dive'
+            with self.stats.record(phase):
+                solution, objective_value, iterations = \
+                    heuristic.dive(node, self.primal_bound, **self._kwargs)
+            self.stats.add_simplex_iterations(phase, iterations)
+            if solution is not None and objective_value < self.primal_bound:
+                self._update_incumbent(solution, objective_value)
+
+    def _prune_node_queue(self: B) -> None:
+        """ Remove every open node that can no longer beat the incumbent from the
+        node queue at once, if the queue supports it. Their LP's are released and
+        they are marked fathomed in the tree.
+
+        :return:
+        """
+        prune = getattr(self._node_queue, 'prune', None)
+        if not callable(prune):
+            return
+        for node in prune(self.primal_bound):
+            node.release_lp()
+            if node.idx in self.tree:
+                self.tree.set_node_attr(node.idx, 'fathomed', True)
+
+    def _merge_kwarg(self: B, key: str, current: Any, before: Any, after: Any) -> Any:
+        """ Extends super's _merge_kwarg to combine the running averages in
+        pseudo costs by how many times each was updated
+
+        :param key: the key in _kwargs being merged
+        :param current: the value currently in _kwargs
+        :param before: the value the rtn was computed from
+        :param after: the value in the rtn
+        :return: the merged value
+        """
+        if key != 'pseudo_costs':
+            return super()._merge_kwarg(key, current, before, after)
+        for idx, directions in after.items():
+            for direction, pseudo_cost in directions.items():
+                prior = before.get(idx, {}).get(direction, {'cost': 0, 'times': 0})
+                added_times = pseudo_cost['times'] - prior['times']
+                if not added_times:
+                    continue
+                added_cost = pseudo_cost['cost'] * pseudo_cost['times'] - \
+                    prior['cost'] * prior['times']
+                merged = current.setdefault(idx, {}).setdefault(direction,
+                                                                 {'cost': 0, 'times': 0})
+                merged['cost'] = max((merged['cost'] * merged['times'] + added_cost) /
+                                     (merged['times'] + added_times), 0)
+                merged['times'] += added_times
+        return current
 
-    def _process_branch_rtn(self: B, parent_id: int, rtn: Dict[str, Any]):
+    def _process_branch_rtn(self: B, parent_id: int, rtn: Dict[str, Any],
+                            snapshot: Dict[str, Any] = None):
         """ Pull the nodes returned from branching out of the rtn dict and into
         the node queue and branch and bound tree before updating the rest of the
         key value pairs in _kwargs
 
         :param rtn:
+        :param snapshot: the kwargs rtn was computed from if not _kwargs
         :return:
         """
         assert isinstance(rtn, dict), 'rtn must be a dictionary'
         assert isinstance(parent_id, int), 'parent_id must be integer'
         assert parent_id in self.tree, 'parent must already exist in tree'
+        # children inherit what their parent's reduced costs imply
+        parent = self.tree.get_node_instances(parent_id)
+        if self.reduced_cost_fixing and self.primal_bound < float('inf') and \
+                parent.reduced_costs is not None:
+            lower, upper = parent.reduced_cost_bounds(self.primal_bound)
+            for direction in ['left', 'right']:
+                if isinstance(rtn.get(direction), BaseNode):
+                    rtn[direction].tighten_bounds(lower, upper)
+        # only the root's reduced costs are needed after branching
+        if parent is not self.root_node:
+            parent.reduced_costs = None
+        # when plunging, dive toward the side the branched variable was closer to
+        plunge_direction = None
+        if self.plunge and 'left' in rtn:
+            b_val = rtn['left']._b_val
+            plunge_direction = 'right' if b_val - floor(b_val) >= .5 else 'left'
         # left is down right is up
         for direction in ['left', 'right']:
             assert direction in rtn, f'{direction} must be in the returned dict'
             assert isinstance(rtn[direction], self._Node), \
                 f'{direction} value must be type {type(self._Node)}'
             assert rtn[direction].idx not in self.tree, 'please give unique node ID'
-            self._node_queue.put(rtn[direction])
+            # only cuts shared while the child is open get pulled into its pool
+            rtn[direction].shared_cut_version = self._shared_cuts.version
+            rtn[direction].keep_reduced_costs = self.reduced_cost_fixing
+            if direction == plunge_direction:
+                # the root's LP is the model's, which checkpoints and warm starts read
+                if parent is not self.root_node:
+                    parent.pass_lp(rtn[direction])
+                self._plunge_node = rtn[direction]
+            else:
+                self._node_queue.put(rtn[direction])
             getattr(self.tree, f'add_{direction}_child')(rtn[direction].idx, parent_id,
                                                          node=rtn[direction])
             del rtn[direction]
-        self._process_rtn(rtn)
+        self._process_rtn(rtn, snapshot)
 
-    def _process_bound_rtn(self: B, rtn: Dict[str, Any]):
+    def _process_bound_rtn(self: B, rtn: Dict[str, Any], snapshot: Dict[str, Any] = None):
         """ Pull the cuts returned from bounding out of the rtn dict and add
-        to all nodes in the node queue before updating the rest of the key value
-        pairs in _kwargs
+        them to the shared cut pool, which open nodes pull from when evaluated,
+        before updating the rest of the key value pairs in _kwargs
 
         :param rtn:
+        :param snapshot: the kwargs rtn was computed from if not _kwargs
         :return:
         """
         assert isinstance(rtn, dict), 'rtn must be a dictionary'
         cuts = rtn.get('cuts')
         if cuts:
-            for name, (pi, pi0) in cuts.items():
-                for node in self._node_queue.queue:
-                    node.cut_pool[name] = (pi, pi0)
+            self._shared_cuts.add(cuts)
             del rtn['cuts']
-        self._process_rtn(rtn)
+        self._process_rtn(rtn, snapshot)
+
+    def _pull_shared_cuts(self: B, node: BaseNode) -> None:
+        """ Add the cuts shared since <node> last pulled from the shared cut
+        pool to its own cut pool, so sharing a cut costs nothing per open node
+
+        :param node: the node about to be evaluated
+        :return:
+        """
+        node.cut_pool.update(self._shared_cuts.cuts_since(node.shared_cut_version))
+        node.shared_cut_version = self._shared_cuts.version
 
     # todo: refactor for multiple constraints and get rid of change in b
     # todo: accomplish b work by just requiring all models entered in min c^T x : Ax >= b
@@ -315,13 +1035,36 @@ class BranchAndBound(BaseAlgorithm):
         """ Calculates a lower bound on the optimal objective value of the current
         MIP at a new RHS b by evaluating the dual function (BB.D from ISE 418 Lecture 8
         Slide 29) at b. Assumes the underlying LP relaxations all have a single
-        constraint object.
+        constraint object. To evaluate many RHS's at once, call the DualFunction
+        returned by dual_function instead.
 
         :param b: new RHS to evaluate
         :return: a lower bound for the value function of the MIP evaluated at b
         """
         assert isinstance(b, CyLPArray), 'this function only works with CyLP arrays'
+        dual_function = self.dual_function()
+        if dual_function.negate_rhs:
+            print('WARNING: your rhs was made negative to reflect constraints'
+                  ' flipping direction at instantiation')
+        return dual_function(b)
+
+    def dual_function(self) -> DualFunction:
+        """ Build the dual function (BB.D from ISE 418 Lecture 8 Slide 29) of the
+        solved tree. Built once and reused until more nodes are evaluated.
+        Assumes the underlying LP relaxations all have a single constraint object.
+
+        :return: the dual function, which can be evaluated at one or many RHS's
+        and saved without the tree's LP's
+        """
         assert self.status != 'unsolved', 'must solve this instance before using this method'
+        assert self.tree.detached_leaf_bound is None, \
+            'dual functions need every leaf, but trees resumed from checkpoints only have open ones'
+        assert not self.reduced_cost_fixing, \
+            'reduced cost fixing tightens bounds for this right hand side only'
+        assert self._presolve is None or not self._presolve.rhs_dependent, \
+            'presolve tightened bounds with this right hand side, so they only hold for it'
+        if self._dual_function is not None and self._dual_function[0] == self.evaluated_nodes:
+            return self._dual_function[1]
         terminal_nodes = self.tree.get_leaves(self.root_node.idx)
         multi_const_nodes = [n.idx for n in terminal_nodes if len(n.lp.constraints) != 1]
         assert not multi_const_nodes, \
@@ -329,92 +1072,116 @@ class BranchAndBound(BaseAlgorithm):
             f'all nodes to branch by bounding variables instead of by adding constraints. ' \
             f'It does not currently handle cuts being added after bounding. The following ' \
             f'IDs belong to nodes that do not conform to these rules: {multi_const_nodes}'
-        assert all(b.shape == n.lp.constraints[0].lower.shape for n in terminal_nodes), \
-            'the shape of the RHS being added should match that of each node'
-        if self._swapped_constraint_direction:
-            b = -b
-            print('WARNING: your rhs was made negative to reflect constraints'
-                  ' flipping direction at instantiation')
-        # note: after first call, this routine will not bound duals again since they already are
-        # also does not update other attributes of the node to reflect its values from solve
-        infeasible_nodes = [n for n in terminal_nodes if n.lp.getStatusCode() == 1]
-        for n in infeasible_nodes:
-            n.lp = self._bound_parameterized_dual(n.lp)
-
-        assert all(n.lp.getStatusCode() in [-1, 0] for n in terminal_nodes)
-
-        # We take a max in each lineage because when minimizing b/c ancestors' LP relaxes
-        # are LB on terminal node objective value. Since ancestor dual evals at b are
-        # LB for for each ancestor node, they are also LB's for terminal node
-        bounds = {}
-        for node in terminal_nodes:
-            bounds[node.idx] = max(
-                np.inner(n.lp.dualConstraintSolution[n.lp.constraints[0].name], b) +
-                np.inner(np.maximum(np.concatenate([sol for sol in n.lp.dualVariableSolution.values()]), np.zeros(n.lp.nVariables)), n.lp.variablesLower) +
-                np.inner(np.minimum(np.concatenate([sol for sol in n.lp.dualVariableSolution.values()]), np.zeros(n.lp.nVariables)), n.lp.variablesUpper)
-                for n in self.tree.get_node_instances(node.lineage)
-            )
-        return min(bounds.values())
+        # infeasible leaves get their duals from bounded copies of their LP's, so the
+        # tree's own LP's (the root's being the model's) keep their shape
+        bounded_lps = {n.idx: self._bound_parameterized_dual(n.lp) for n in terminal_nodes
+                       if n.lp.getStatusCode() == 1}
+
+        assert all(bounded_lps.get(n.idx, n.lp).getStatusCode() in [-1, 0]
+                   for n in terminal_nodes)
+
+        # every node in a leaf's lineage, parents first. When minimizing, ancestors' LP
+        # relaxations bound their descendants', so each ancestor's dual evaluated at b
+        # also bounds its descendants and leaves can take the max over their lineage
+        nodes = {n.idx: n for leaf in terminal_nodes
+                 for n in self.tree.get_node_instances(leaf.lineage)}
+        order = sorted(nodes, key=lambda idx: len(nodes[idx].lineage))
+        row = {idx: i for i, idx in enumerate(order)}
+        constraint_duals, bound_terms = [], []
+        for idx in order:
+            if nodes[idx].lp_feasible is None:
+                # never bounded (e.g. left open or pruned before it was), so it has
+                # no duals of its own and its ancestors bound it instead
+                constraint_duals.append(np.zeros(self.model.A.shape[0]))
+                bound_terms.append(-float('inf'))
+                continue
+            lp = bounded_lps.get(idx, nodes[idx].lp)
+            variable_duals = np.concatenate([sol for sol in lp.dualVariableSolution.values()])
+            # slack columns from _bound_parameterized_dual sit at 0 and add nothing
+            lower = lp.variablesLower[:len(variable_duals)]
+            upper = lp.variablesUpper[:len(variable_duals)]
+            constraint_duals.append(lp.dualConstraintSolution[lp.constraints[0].name])
+            # CLP subtracts the objective offset from its objective values
+            bound_terms.append(np.inner(np.maximum(variable_duals, 0), lower) +
+                               np.inner(np.minimum(variable_duals, 0), upper) -
+                               lp.objectiveOffset)
+        constraint_duals, bound_terms = np.array(constraint_duals), np.array(bound_terms)
+        if self._presolve:
+            constraint_duals, bound_terms = \
+                self._presolve.postsolve_dual_function(constraint_duals, bound_terms)
+        leaf_ids = {n.idx for n in terminal_nodes}
+        dual_function = DualFunction(
+            constraint_duals=constraint_duals, bound_terms=bound_terms,
+            parents=np.array([row[nodes[idx].lineage[-2]] if len(nodes[idx].lineage) > 1
+                              else -1 for idx in order]),
+            leaves=np.array([idx in leaf_ids for idx in order]),
+            negate_rhs=bool(self._swapped_constraint_direction), node_ids=np.array(order)
+        )
+        self._dual_function = (self.evaluated_nodes, dual_function)
+        return dual_function
 
     def _bound_parameterized_dual(self, cur_lp: CyClpSimplex) -> CyClpSimplex:
         """ Place a bound on each index of the dual variable associated with the
         constraints of this node's LP relaxation and resolve. We do this by adding
-        to each constraint i the slack variable 's_i' in the node's LP relaxation,
-        and we give each new variable a large, positive coefficient in the objective.
+        to each constraint row i a slack column s_i in the node's LP relaxation,
+        and we give each new column a large, positive coefficient in the objective.
         By duality, we get the desired dual LP constraints. Therefore, for nodes
         with infeasible primal LP relaxations and unbounded dual LP relaxations,
         resolving gives us a finite (albeit very large) dual solution, which can
         be used to parametrically lower bound the objective value of this node as
         we change its right hand side.
 
+        The slack columns are appended to a copy of <cur_lp> as one sparse block,
+        so <cur_lp> keeps its shape, and dual simplex restarts from <cur_lp>'s
+        basis with each slack at its lower bound. Since they are added below
+        CyLP's modeling layer, they are not in the copy's variables, so x's
+        solution and duals keep their shape while its variablesLower and the
+        like grow by a column for each row.
+
         :param cur_lp: the CyClpSimplex instance for which we want to bound its
         dual solution and resolve
-        :return: A CyClpSimplex instance representing the same model as input,
-        with the additions prescribed in the method description
+        :return: a copy of <cur_lp> with the additions prescribed in the method
+        description
         """
-
-        # we add slack at end so user does not have to worry about adding to each node they create
-        # and so we don't have to go back and update needlessly
         assert isinstance(cur_lp, CyClpSimplex), 'must give CyClpSimplex instance'
-        for i, constr in enumerate(cur_lp.constraints):
-            assert f's_{i}' not in [v.name for v in cur_lp.variables], \
-                f"variable 's_{i}' is a reserved name. please name your variable something else"
-
-        # cylp lacks (a documented) way to add a column, so rebuild the LP :[
-        new_lp = CyClpSimplex()
-        new_lp.logLevel = 0  # quiet output when resolving
-
-        # recreate variables
-        var_map = {v: new_lp.addVariable(v.name, v.dim) for v in cur_lp.variables}
-
-        # bound them
-        for orig_v, new_v in var_map.items():
-            new_lp += CyLPArray(orig_v.lower) <= new_v <= CyLPArray(orig_v.upper)
-
-        # re-add constraints, with slacks this time
-        s = {}
-        for i, constr in enumerate(cur_lp.constraints):
-            s[i] = new_lp.addVariable(f's_{i}', constr.nRows)
-            new_lp += s[i] >= CyLPArray(np.zeros(constr.nRows))
-            new_lp += CyLPArray(constr.lower) <= \
-                sum(constr.varCoefs[v] * var_map[v] for v in constr.variables) \
-                + np.matrix(np.identity(constr.nRows))*s[i] <= CyLPArray(constr.upper)
-
-        # set objective
-        new_lp.objective = sum(
-            CyLPArray(cur_lp.objectiveCoefficients[orig_v.indices]) * new_v for
-            orig_v, new_v in var_map.items()
-        ) + sum(self._M * v.sum() for v in s.values())
-
-        # warm start
-        orig_var_status, orig_slack_status = cur_lp.getBasisStatus()
-        # each s_i at lower bound of 0 when added - status 3
-        np.concatenate((orig_var_status, np.ones(sum(v.dim for v in s.values()))*3))
-        new_lp.setBasisStatus(orig_var_status, orig_slack_status)
-
-        # rerun and reassign
-        new_lp.dual()
-        return new_lp
+        assert cur_lp.nVariables == sum(v.dim for v in cur_lp.variables), \
+            'cur_lp already has columns outside its variables, e.g. slacks from a previous call'
+
+        # each slack column has a single 1 in its own row
+        num_rows = cur_lp.nConstraints
+        var_status, slack_status = cur_lp.getBasisStatus()
+        lp = build_lp(get_lp_data(cur_lp), resolve=False)
+        lp.addVariables(num_rows, np.zeros(num_rows), np.full(num_rows, lp.getCoinInfinity()),
+                        np.full(num_rows, float(self._M)),
+                        np.arange(num_rows + 1, dtype=np.int32),
+                        np.arange(num_rows, dtype=np.int32), np.ones(num_rows))
+
+        # warm start with each s_i at its lower bound of 0 - status 3
+        lp.setBasisStatus(
+            np.concatenate((var_status, np.full(num_rows, 3, dtype=var_status.dtype))),
+            slack_status
+        )
+        lp.dual()
+        return lp
+
+
+def _bound_and_branch(node: BaseNode, kwargs: Dict[str, Any], primal_bound: float) -> \
+        Tuple[BaseNode, Dict[str, Any], Union[Dict[str, Any], None]]:
+    """ Bound <node> and branch on it if BranchAndBound would. Module level so
+    that worker processes can unpickle it.
+
+    :param node: the node to evaluate
+    :param kwargs: copy of BranchAndBound._kwargs to evaluate the node with
+    :param primal_bound: the best known objective value when the node was sent
+    :return: the evaluated node, the rtn from bounding, and the rtn from
+    branching (None if the node was not branched on)
+    """
+    bound_rtn = node.bound(**kwargs)
+    kwargs.update({k: v for k, v in bound_rtn.items() if k != 'cuts'})
+    branch_rtn = None
+    if node.lp_feasible and node.objective_value < primal_bound and not node.mip_feasible:
+        branch_rtn = node.branch(**kwargs)
+    return node, bound_rtn, branch_rtn
 
 
 if __name__ == '__main__':
@@ -0,0 +1,136 @@
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from coinor.cuppy.milpInstance import MILPInstance
+import os
+import scipy.sparse as sp
+import time
+from typing import Any, Dict, Iterable, Iterator, Tuple, Type, Union
+
+from simple_mip_solver.algorithms.branch_and_bound import BranchAndBound
+from simple_mip_solver.nodes.base_node import BaseNode
+from simple_mip_solver.utils.lp_data import build_milp
+
+model_hint = Union[MILPInstance, str]
+result_hint = Dict[str, Any]
+
+
+def solve_many(models: Iterable[model_hint], Node: Type[BaseNode] = BaseNode,
+               processes: int = None, max_run_time: float = float('inf'),
+               total_run_time: float = float('inf'), **kwargs: Any) -> \
+        Iterator[Tuple[int, result_hint]]:
+    """ Solve each model in <models> with its own BranchAndBound instance,
+    spread across a pool of <processes> worker processes that is started once
+    and reused for every solve. Results are yielded as soon as each solve
+    finishes, so they may come back in a different order than <models>.
+
+    Models are read from <models> only as workers free up, so it can be a
+    generator over far more models than fit in memory. Models not started
+    before <total_run_time> runs out are not solved and nothing is yielded for them.
+
+    :param models: MILPInstance objects or paths to MPS files to solve
+    :param Node: Node class each BranchAndBound instance uses
+    :param processes: number of worker processes. Defaults to the number of
+    cpus. When 1, models are solved one after another in this process.
+    :param max_run_time: max_run_time of each BranchAndBound instance
+    :param total_run_time: seconds of wall clock time after which no more
+    models are started. It is passed to each BranchAndBound instance as a
+    deadline, so solves running when it runs out stop then too.
+    :param kwargs: key word arguments passed on to each BranchAndBound instance.
+    Like nodes for BranchAndBound's processes, these must be picklable.
+    :return: generator of (index of the model in <models>, result) pairs, where
+    result is a dictionary of the solve's status, objective_value, solution,
+    dual_bound, solve_time, evaluated_nodes and stats
+    """
+    processes = processes or os.cpu_count()
+    assert isinstance(processes, int) and processes > 0, 'processes is a positive integer'
+    assert max_run_time > 0, 'max_run_time is positive value'
+    assert total_run_time > 0, 'total_run_time is positive value'
+    assert 'cglp' not in kwargs, \
+        'a cglp references a single instance, so it cannot be shared across models'
+    return _solve_many(models, Node, processes, max_run_time, total_run_time, kwargs)
+
+
+def _solve_many(models: Iterable[model_hint], Node: Type[BaseNode], processes: int,
+                max_run_time: float, total_run_time: float, kwargs: Dict[str, Any]) -> \
+        Iterator[Tuple[int, result_hint]]:
+    """ The generator behind solve_many, split out so solve_many checks its
+    arguments when called rather than when first iterated over. See solve_many
+    for what each argument is. """
+    deadline = time.time() + total_run_time
+    tasks = ((idx, _model_data(model)) for idx, model in enumerate(models))
+
+    if processes == 1:
+        for idx, model in tasks:
+            if time.time() >= deadline:
+                return
+            result = _solve_model(model, Node, max_run_time, deadline, kwargs)
+            if result is not None:
+                yield idx, result
+        return
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        running = {}
+        try:
+            while True:
+                # keep each worker busy with one model and the next one queued
+                while len(running) < 2 * processes and time.time() < deadline:
+                    task = next(tasks, None)
+                    if task is None:
+                        break
+                    idx, model = task
+                    running[executor.submit(_solve_model, model, Node, max_run_time,
+                                            deadline, kwargs)] = idx
+                if not running:
+                    return
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx, result = running.pop(future), future.result()
+                    if result is not None:  # else it waited in the queue past the deadline
+                        yield idx, result
+        finally:
+            # drop queued solves if the caller stops early
+            for future in running:
+                future.cancel()
+
+
+def _model_data(model: model_hint) -> Union[Dict[str, Any], str]:
+    """ Convert <model> to something worker processes can unpickle. CyClpSimplex
+    instances cannot be pickled, so MILPInstances are reduced to their arrays,
+    with sparse A's kept sparse, while paths are left for the worker to read.
+
+    :param model: a MILPInstance or path to an MPS file
+    :return: keyword arguments rebuilding the MILPInstance or the path
+    """
+    if isinstance(model, str):
+        return model
+    assert isinstance(model, MILPInstance), 'models must be MILPInstances or paths'
+    A = sp.csc_matrix(model.A) if sp.issparse(model.A) else model.A
+    # lp.objective is always for minimizing, see BaseAlgorithm._convert_constraints_to_greq
+    return {'A': A, 'b': model.b, 'c': model.lp.objective.copy(),
+            'l': model.lp.variablesLower.copy(), 'u': model.lp.variablesUpper.copy(),
+            'integerIndices': model.integerIndices, 'sense': ['Min', model.sense],
+            'numVars': len(model.lp.objective)}
+
+
+def _solve_model(model: Union[Dict[str, Any], str], Node: Type[BaseNode],
+                 max_run_time: float, deadline: float, kwargs: Dict[str, Any]) -> \
+        Union[result_hint, None]:
+    """ Build and solve one model unless <deadline> has passed. Module level
+    so that worker processes can unpickle it.
+
+    :param model: what _model_data returned for the model
+    :param Node: Node class the BranchAndBound instance uses
+    :param max_run_time: max_run_time of the BranchAndBound instance
+    :param deadline: time.time() after which the solve stops or isn't started
+    :param kwargs: key word arguments passed on to the BranchAndBound instance
+    :return: the results of the solve, None if it wasn't started
+    """
+    if time.time() >= deadline:
+        return None
+    model = MILPInstance(file_name=model) if isinstance(model, str) else build_milp(**model)
+    bb = BranchAndBound(model, Node=Node, max_run_time=max_run_time, deadline=deadline,
+                        **kwargs)
+    bb.solve()
+    return {'status': bb.status, 'objective_value': bb.objective_value,
+            'solution': bb.solution, 'dual_bound': bb.dual_bound,
+            'solve_time': bb.solve_time, 'evaluated_nodes': bb.evaluated_nodes,
+            'stats': bb.stats}
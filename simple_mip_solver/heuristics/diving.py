@@ -0,0 +1,174 @@
+from math import floor, ceil
+import numpy as np
+from typing import Any, Dict, List, Tuple, TypeVar, Union
+
+from simple_mip_solver.nodes.base_node import BaseNode
+from simple_mip_solver.nodes.branch.pseudo_cost import rounding_costs
+
+D = TypeVar('D', bound='DivingHeuristic')
+pseudo_costs_hint = Dict[int, Dict[str, Dict[str, Union[float, int]]]]
+
+
+class DivingHeuristic:
+    """ Parent class of the diving primal heuristics, which look for feasible
+    solutions below a node of the branch and bound tree. Starting from the node's
+    LP relaxation solution, a dive repeatedly rounds a fractional integer variable
+    by bounding it to the integer on one side of its value and resolving with dual
+    simplex from the last basis. It stops when the solution is integer feasible,
+    the LP relaxation is infeasible or cannot beat the incumbent, or the dive runs
+    out of simplex iterations. Subclasses choose which variable to round and which
+    way in _select.
+
+    Bounds are changed on the node's own LP, so diving never builds one, and are
+    restored along with the node's basis and solution when the dive ends.
+    """
+
+    def __init__(self: D, max_iterations: int = 500, backtrack: bool = True):
+        """
+        :param max_iterations: most simplex iterations a single dive can take
+        :param backtrack: whether to try rounding the other way when rounding a
+        variable makes the LP relaxation infeasible
+        """
+        assert isinstance(max_iterations, int) and max_iterations > 0, \
+            'max_iterations is a positive integer'
+        assert isinstance(backtrack, bool), 'backtrack is boolean'
+        self.max_iterations = max_iterations
+        self.backtrack = backtrack
+
+    def dive(self: D, node: BaseNode, primal_bound: Union[float, int], **kwargs: Any) -> \
+            Tuple[Union[np.ndarray, None], float, int]:
+        """ Dive from <node> looking for a feasible solution better than <primal_bound>
+
+        :param node: a bounded node with a feasible LP relaxation
+        :param primal_bound: objective value of the incumbent
+        :param kwargs: key word arguments of the branch and bound algorithm
+        (e.g. pseudo costs), passed on to _select
+        :return: the solution found, or None if none was, its objective value,
+        and how many simplex iterations the dive took
+        """
+        assert isinstance(node, BaseNode), 'node must be a BaseNode instance'
+        assert node.lp_feasible, 'node must be bounded and have a feasible LP relaxation'
+        lp = node.lp
+        lower, upper = lp.variablesLower.copy(), lp.variablesUpper.copy()
+        basis = lp.getBasisStatus()
+        max_num_iteration = lp.maxNumIteration
+        select_kwargs = {**kwargs, **self._prepare(node)}
+        solution, objective_value = node.solution, node.objective_value
+        iterations = 0
+        found = False
+        try:
+            while objective_value < primal_bound:
+                fractional = [idx for idx in node._integer_indices
+                              if node._is_fractional(solution[idx])]
+                if not fractional:
+                    found = True
+                    break
+                idx, direction = self._select(node, solution, fractional, **select_kwargs)
+                directions = [direction, 'right' if direction == 'left' else 'left'] \
+                    if self.backtrack else [direction]
+                dive_lower, dive_upper = lp.variablesLower.copy(), lp.variablesUpper.copy()
+                for d in directions:
+                    if iterations >= self.max_iterations:
+                        return None, float('inf'), iterations
+                    l, u = dive_lower.copy(), dive_upper.copy()
+                    if d == 'left':
+                        u[idx] = floor(solution[idx])
+                    else:
+                        l[idx] = ceil(solution[idx])
+                    lp.variablesLower, lp.variablesUpper = l, u
+                    lp.maxNumIteration = self.max_iterations - iterations
+                    lp.dual()
+                    iterations += lp.iteration
+                    if lp.getStatusCode() != 1:  # only retry when infeasible
+                        break
+                if lp.getStatusCode() != 0:  # infeasible, unbounded or out of iterations
+                    return None, float('inf'), iterations
+                solution, objective_value = lp.primalVariableSolution['x'], lp.objectiveValue
+            return (solution, objective_value, iterations) if found else \
+                (None, float('inf'), iterations)
+        finally:
+            # resolving from the node's final basis takes no iterations and gets
+            # its solution and duals back for anything that reads them later
+            lp.variablesLower, lp.variablesUpper = lower, upper
+            lp.setBasisStatus(*basis)
+            lp.maxNumIteration = max_num_iteration
+            lp.dual()
+
+    def _prepare(self: D, node: BaseNode) -> Dict[str, Any]:
+        """ Compute what _select needs that doesn't change over a dive
+
+        :param node: the node the dive starts from
+        :return: key word arguments to pass to _select
+        """
+        return {}
+
+    def _select(self: D, node: BaseNode, solution: np.ndarray, fractional: List[int],
+                **kwargs: Any) -> Tuple[int, str]:
+        """ Choose the variable to round next and which way
+
+        :param node: the node the dive started from
+        :param solution: the dive's current LP relaxation solution
+        :param fractional: indices of the integer variables fractional in <solution>
+        :param kwargs: key word arguments of the branch and bound algorithm and
+        those returned by _prepare
+        :return: index of the variable to round and the direction to round it,
+        'left' for down or 'right' for up
+        """
+        raise NotImplementedError('DivingHeuristic subclasses must choose how to round')
+
+
+class FractionalDiving(DivingHeuristic):
+    """ Rounds the variable closest to an integer to that integer """
+
+    def _select(self: D, node: BaseNode, solution: np.ndarray, fractional: List[int],
+                **kwargs: Any) -> Tuple[int, str]:
+        idx = min(fractional, key=lambda i: min(solution[i] - floor(solution[i]),
+                                                 ceil(solution[i]) - solution[i]))
+        return idx, 'left' if solution[idx] - floor(solution[idx]) < .5 else 'right'
+
+
+class CoefficientDiving(DivingHeuristic):
+    """ Rounds the variable with the fewest locks in the direction it has fewer,
+    where a variable's down (up) locks are the constraints that decreasing
+    (increasing) it can violate. Ties go to the variable closest to rounding."""
+
+    def _prepare(self: D, node: BaseNode) -> Dict[str, Any]:
+        # constraints are Ax >= b, so positive coefficients lock decreasing x
+        A = node.lp.coefMatrix
+        return {'locks': {'left': np.asarray((A > 0).sum(axis=0)).flatten(),
+                          'right': np.asarray((A < 0).sum(axis=0)).flatten()}}
+
+    def _select(self: D, node: BaseNode, solution: np.ndarray, fractional: List[int],
+                locks: Dict[str, np.ndarray] = None, **kwargs: Any) -> Tuple[int, str]:
+        best = None
+        for idx in fractional:
+            distance = {'left': solution[idx] - floor(solution[idx]),
+                        'right': ceil(solution[idx]) - solution[idx]}
+            direction = min(['left', 'right'],
+                            key=lambda d: (locks[d][idx], distance[d]))
+            score = (locks[direction][idx], distance[direction])
+            if best is None or score < best[0]:
+                best = (score, idx, direction)
+        return best[1], best[2]
+
+
+class PseudoCostDiving(DivingHeuristic):
+    """ Rounds each variable in the direction its pseudo costs estimate raises
+    the objective less, choosing the variable whose other direction costs the
+    most in comparison. Directions without a pseudo cost use the average of
+    those that have one, and ties go to the variable closest to rounding."""
+
+    def _select(self: D, node: BaseNode, solution: np.ndarray, fractional: List[int],
+                pseudo_costs: pseudo_costs_hint = None, **kwargs: Any) -> Tuple[int, str]:
+        costs = rounding_costs(pseudo_costs or {}, solution, fractional)
+        best = None
+        for idx in fractional:
+            distance = {'left': solution[idx] - floor(solution[idx]),
+                        'right': ceil(solution[idx]) - solution[idx]}
+            cost = costs[idx]
+            direction = min(['left', 'right'], key=lambda d: (cost[d], distance[d]))
+            other = 'right' if direction == 'left' else 'left'
+            score = (-(1 + cost[other]) / (1 + cost[direction]), distance[direction])
+            if best is None or score < best[0]:
+                best = (score, idx, direction)
+        return best[1], best[2]
@@ -1,15 +1,24 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
 from cylp.cy.CyClpSimplex import CyClpSimplex
 from cylp.py.modeling.CyLPModel import CyLPArray
-from math import floor, ceil, degrees, acos
+from itertools import count, repeat
+from math import floor, ceil, cos, radians
 import numpy as np
+import os
+import pickle
 import re
-from statistics import median
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+import tempfile
 import time
 from typing import Union, List, TypeVar, Dict, Any, Tuple, Set
 
-from simple_mip_solver.utils.floating_point import numerically_safe_cut
+from simple_mip_solver.utils.floating_point import numerically_safe_cuts
+from simple_mip_solver.utils.lp_data import get_lp_data, build_lp, lp_data_hint, \
+    compact_lp_data, expand_lp_data, share_coefs, shared_coefs, variable_bounds
+from simple_mip_solver.utils.solve_stats import SolveStats, timed
 from simple_mip_solver.utils.tolerance import variable_epsilon,\
     good_coefficient_approximation_epsilon, max_nonzero_coefs, parallel_cut_tolerance, \
     cutting_plane_progress_tolerance, max_cut_generation_iterations, max_relative_cut_term_ratio, \
@@ -19,6 +28,15 @@ from test_simple_mip_solver.test_utils.test_utils import check_cut_against_grid,
 
 T = TypeVar('T', bound='BaseNode')
 
+# the pool this process strong branches in as (pid of the process that started it,
+# processes, keys of the coefficients shared with it, pool), reused by every node
+# until shutdown_strong_branch_pool is called
+_strong_branch_executor = None
+# keys of the LP's written for the pool's workers to strong branch from
+_strong_branch_lp_keys = count()
+# in each worker process, the key of the LP it last strong branched from and its data
+_strong_branch_lp = (None, None)
+
 
 class BaseNode:
     """ A node off of which all other types of nodes can be built for running
@@ -26,12 +44,15 @@ class BaseNode:
     best-first search and most fractional branching.
     """
 
-    def __init__(self: T, lp: CyClpSimplex, integer_indices: List[int], idx: int = None,
+    def __init__(self: T, lp: Union[CyClpSimplex, lp_data_hint], integer_indices: List[int],
+                 idx: int = None,
                  dual_bound: Union[float, int] = -float('inf'), b_idx: int = None,
                  b_dir: str = None, b_val: float = None, depth: int = 0,
                  ancestors: tuple = None, *args, **kwargs):
         """
-        :param lp: model object simplex is run against. Assumed Ax >= b
+        :param lp: model object simplex is run against. Assumed Ax >= b. Can also
+        be the dictionary made by get_lp_data(), in which case the CyClpSimplex
+        instance is not built until the node's LP is first accessed
         :param integer_indices: indices of variables we aim to find integer solutions
         :param idx: index of this node (e.g. in the branch and bound tree)
         :param dual_bound: starting lower bound on optimal objective value
@@ -46,8 +67,10 @@ class BaseNode:
         :param kwargs: spillover for extra arguments passed by the API not needed for instantiation
         """
         # check inputs
-        assert isinstance(lp, CyClpSimplex), 'lp must be CyClpSimplex instance'
-        assert all(0 <= idx < lp.nVariables and isinstance(idx, int) for idx in
+        assert isinstance(lp, (CyClpSimplex, dict)), 'lp must be CyClpSimplex instance or lp data'
+        variables_lower, variables_upper = variable_bounds(lp) if isinstance(lp, dict) else \
+            (lp.variablesLower, lp.variablesUpper)
+        assert all(0 <= idx < len(variables_lower) and isinstance(idx, int) for idx in
                    integer_indices), 'indices must match variables'
         assert idx is None or isinstance(idx, int), 'node idx must be integer if provided'
         assert len(set(integer_indices)) == len(integer_indices), \
@@ -61,8 +84,8 @@ class BaseNode:
         assert b_dir in ['right', 'left'] or b_dir is None, \
             'we can only branch right or left'
         if b_val is not None:
-            good_left = 0 < b_val - lp.variablesUpper[b_idx] < 1
-            good_right = 0 < lp.variablesLower[b_idx] - b_val < 1
+            good_left = 0 < b_val - variables_upper[b_idx] < 1
+            good_right = 0 < variables_lower[b_idx] - b_val < 1
             assert (b_dir == 'left' and good_left) or \
                    (b_dir == 'right' and good_right), 'branch val should be within 1 of both bounds'
         assert isinstance(depth, int) and depth >= 0, 'depth is a positive integer'
@@ -70,8 +93,13 @@ class BaseNode:
             assert isinstance(ancestors, tuple), 'ancestors must be a tuple if provided'
             assert idx not in ancestors, 'idx cannot be an ancestor of itself'
 
-        lp.logLevel = 0
-        self.lp = lp
+        self._factorization = None  # LU of the basis of the last solved LP, see tableau_rows
+        if isinstance(lp, dict):
+            self._lp = None
+            self._lp_data = lp
+        else:
+            lp.logLevel = 0
+            self.lp = lp
         self._integer_indices = integer_indices
         self.idx = idx
         self.dual_bound = dual_bound
@@ -80,6 +108,8 @@ class BaseNode:
         self.lp_feasible = None
         self.unbounded = None
         self.mip_feasible = None
+        self.reduced_costs = None
+        self.keep_reduced_costs = False  # whether bounding saves reduced_costs
         self._b_dir = b_dir
         self._b_idx = b_idx
         self._b_val = b_val
@@ -101,16 +131,148 @@ class BaseNode:
         self.number_gmic_removed = 0
         self.gmic_name_pattern = re.compile('^cut_gomory_')
         self._cut_pool = {}
-        self.max_term = np.max(np.abs(self.lp.constraints[0].varCoefs[self.lp.getVarByName('x')]))
+        self.shared_cut_version = 0  # version of the algorithm's shared cut pool last pulled
+        self.max_term = np.max(np.abs(self._lp_data['constraints'][0][1] if self._lp is None else
+                                      self.lp.constraints[0].varCoefs[self.lp.getVarByName('x')]))
         self.children = None
+        # LP's of children made by strong branching, by the index branched on
+        self.strong_branch_children = {}
         self.cut_generation_dual_bound = {}
         self.tracked_cut_generation_iterations = 0
         self.cut_generation_terminator = None
+        self.stats = SolveStats()  # time, calls and simplex iterations of this node's phases
 
         # check formatting
         assert self._sense == '>=', 'must have Ax >= b'
         assert self._variables_nonnegative, 'must have x >= 0 for all variables'
 
+    @property
+    def lp(self) -> CyClpSimplex:
+        """This node's LP relaxation. Nodes made by branching or unpickling
+        (e.g. after being bounded in another process) hold their LP in the compact
+        form made by get_lp_data() until the LP is first accessed"""
+        if self._lp is None and self._lp_data is not None:
+            self._lp = build_lp(self._lp_data)
+            self._lp_data = None
+        return self._lp
+
+    @lp.setter
+    def lp(self, lp: CyClpSimplex):
+        self._lp = lp
+        self._lp_data = None
+        self._factorization = None
+
+    def release_lp(self: T) -> None:
+        """Free the memory CLP holds for this node's LP by swapping it for the
+        compact form made by get_lp_data(). It is rebuilt if accessed again"""
+        if self._lp is not None:
+            lp_data = get_lp_data(self._lp)
+            self._lp = None
+            self._lp_data = lp_data
+            self._factorization = None
+        self.strong_branch_children = {}
+
+    def pass_lp(self: T, child: T) -> None:
+        """ Hand this node's LP to <child>, one of the children it branched into,
+        so the child doesn't build its own. Only the variable bounds (and the basis,
+        if the child comes from strong branching) are changed to the child's, so
+        dual simplex restarts from where the child's LP left off on the same
+        CyClpSimplex instance. This node keeps its LP in the compact form made by
+        get_lp_data() and rebuilds it if accessed again.
+
+        :param child: a child of this node that has not built its LP yet
+        :return:
+        """
+        assert self._lp is not None, 'must have a built LP to pass on'
+        assert child._lp is None and child._lp_data is not None, \
+            'child must not have built its LP yet'
+        assert child.depth == self.depth + 1 and \
+            (self.lineage is None or child.lineage[:-1] == self.lineage), \
+            'child must have been branched from this node'
+        lp = self._lp
+        self.release_lp()
+        lp.variablesLower, lp.variablesUpper = variable_bounds(child._lp_data)
+        basis = child._lp_data['basis']
+        if not all(np.array_equal(a, b) for a, b in zip(basis, lp.getBasisStatus())):
+            lp.setBasisStatus(*basis)
+        child.lp = lp
+
+    def reduced_cost_bounds(self: T, primal_bound: Union[float, int]) -> \
+            Tuple[np.ndarray, np.ndarray]:
+        """ Find bounds on the integer variables that every solution in this
+        node's subtree with objective value less than <primal_bound> satisfies.
+        An integer variable at its lower bound in this node's LP relaxation
+        solution with reduced cost d > 0 raises the objective by at least d for
+        every unit it increases, so it can increase by at most
+        (primal_bound - objective_value) / d. Likewise for variables at their
+        upper bound with d < 0.
+
+        :param primal_bound: objective value of the incumbent
+        :return: lower and upper bounds for each variable, infinite for those
+        reduced costs don't bound
+        """
+        assert self.lp_feasible, 'must have a feasible LP relaxation to bound by reduced cost'
+        lower = np.full(len(self.solution), -float('inf'))
+        upper = np.full(len(self.solution), float('inf'))
+        gap = primal_bound - self.objective_value
+        if gap == float('inf'):
+            return lower, upper
+        idx = np.array(self._integer_indices, dtype=int)
+        d, x = self.reduced_costs[idx], self.solution[idx]
+        # nonbasic variables sit at their bounds. the tolerance keeps rounding error
+        # from cutting off solutions as good as the incumbent
+        up, down = d > variable_epsilon, d < -variable_epsilon
+        upper[idx[up]] = x[up] + np.floor(gap / d[up] + variable_epsilon)
+        lower[idx[down]] = x[down] - np.floor(gap / -d[down] + variable_epsilon)
+        return lower, upper
+
+    def tighten_bounds(self: T, lower: np.ndarray, upper: np.ndarray) -> int:
+        """ Raise this node's variable lower bounds to <lower> and lower its upper
+        bounds to <upper> wherever they are tighter. Changes the LP if it is built
+        and its compact form otherwise, so open nodes don't build their LP's.
+
+        :param lower: lower bound for each variable
+        :param upper: upper bound for each variable
+        :return: how many bounds were tightened
+        """
+        if self._lp is None:
+            current_lower, current_upper = variable_bounds(self._lp_data)
+        else:
+            current_lower, current_upper = self.lp.variablesLower, self.lp.variablesUpper
+        assert len(lower) == len(upper) == len(current_lower), 'need a bound for each variable'
+        new_lower = np.maximum(current_lower, lower)
+        new_upper = np.minimum(current_upper, upper)
+        tightened = int((new_lower > current_lower).sum() + (new_upper < current_upper).sum())
+        if not tightened:
+            return 0
+        if self._lp is None:
+            # siblings may share lp data, so make a new dict instead of editing it
+            self._lp_data = {**self._lp_data, 'variables_lower': new_lower,
+                             'variables_upper': new_upper, 'bound_change': None}
+        else:
+            self.lp.variablesLower, self.lp.variablesUpper = new_lower, new_upper
+        return tightened
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """CyClpSimplex instances cannot be pickled, so swap the LP for its compact
+        form. Shared constraint coefficients (e.g. the model's while BranchAndBound
+        solves) are left for the receiving process to fill back in"""
+        state = self.__dict__.copy()
+        state['_factorization'] = None  # SuperLU objects cannot be pickled either
+        state['strong_branch_children'] = {}  # only needed by the process that branches
+        if self._lp is not None:
+            state['_lp'] = None
+            state['_lp_data'] = get_lp_data(self._lp)
+        if state['_lp_data'] is not None:
+            state['_lp_data'] = compact_lp_data(state['_lp_data'])
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Fill back in the shared constraint coefficients __getstate__ left out"""
+        if state['_lp_data'] is not None:
+            state['_lp_data'] = expand_lp_data(state['_lp_data'])
+        self.__dict__.update(state)
+
     @property
     def cut_pool(self):
         return self._cut_pool
@@ -256,6 +418,7 @@ class BaseNode:
                 return False, f'index {idx} should have dictionary keyed by range of ints'
         return True, None
 
+    @timed()
     def _bound_lp(self: T, track_dual_bound: bool = False) -> None:
         """Solve the current node with simplex to generate a bound on objective
         values of integer feasible solutions of descendent nodes. If feasible,
@@ -271,6 +434,8 @@ class BaseNode:
                 'lp is only bound once per cut generation iteration'
 
         self.lp.dual()
+        self._factorization = None
+        self.stats.add_simplex_iterations('_bound_lp', self.lp.iteration)
         self.lp_feasible = self.lp.getStatusCode() in [0, 2]  # optimal or dual infeasible
         self.unbounded = self.lp.getStatusCode() == 2
         self.objective_value = self.lp.objectiveValue if self.lp_feasible else float('inf')
@@ -281,6 +446,11 @@ class BaseNode:
         int_var_vals = None if not self.lp_feasible else self.solution[self._integer_indices]
         self.mip_feasible = self.lp_feasible and \
             np.max(np.abs(np.round(int_var_vals) - int_var_vals)) <= variable_epsilon
+        # copying the reduced costs costs a column's worth per node, so only do so
+        # for nodes whose algorithm fixes bounds by them
+        duals = self.lp.dualVariableSolution if self.keep_reduced_costs and \
+            self.lp_feasible else None
+        self.reduced_costs = duals['x'] if type(duals) == dict else duals
         if track_dual_bound:
             self.cut_generation_dual_bound[self.tracked_cut_generation_iterations] = \
                 self.objective_value
@@ -323,6 +493,7 @@ class BaseNode:
             # hamstrung by progress tolerance if nothing else has hit it to this point
             self.cut_generation_terminator = self.cut_generation_terminator or 'cuts not deep enough'
 
+    @timed()
     def _remove_slack_cuts(self: T, **kwargs) -> List[str]:
         """ Removes all previously added cutting planes with 0 dual value. I.e.
         removes all cutting planes that won't change the optimal objective.
@@ -374,16 +545,17 @@ class BaseNode:
 
         cut_pool = {}
         if gomory_cuts:
-            for row_idx, (pi, pi0) in self._find_gomory_cuts().items():
+            rows, pis, pi0s = self._find_gomory_cuts()
+            # approximate every cut's coefficients at once
+            safe_pis, safe_pi0s = numerically_safe_cuts(pis=pis, pi0s=pi0s, estimate='over')
+            for row_idx, safe_pi, safe_pi0 in zip(rows, safe_pis, safe_pi0s):
                 idx = f'cut_gomory_{self.idx}_{self.cut_generation_iterations}_{row_idx}'
-                # if idx == 'cut_gomory_5_2_2':
-                #     print()
-                safe_pi, safe_pi0 = numerically_safe_cut(pi=pi, pi0=pi0, estimate='over')
-                cut_pool[idx] = safe_pi, safe_pi0
+                cut_pool[idx] = CyLPArray(safe_pi), float(safe_pi0)
 
             self._update_gmic_counts(cut_idxs=cut_pool, operation='created')
         return cut_pool
 
+    @timed()
     def _select_cuts(self, max_nonzero_coefs: int = max_nonzero_coefs,
                      min_cut_depth: float = min_cut_depth,
                      parallel_cut_tolerance: float = parallel_cut_tolerance,
@@ -411,119 +583,165 @@ class BaseNode:
         assert isinstance(max_relative_cut_term_ratio, (int, float)) and \
             0 < max_relative_cut_term_ratio, 'max_relative_cut_term_ratio must be positive'
 
-        def nonzero_coefs(pi):
-            return sum((pi > good_coefficient_approximation_epsilon) +
-                       (pi < -good_coefficient_approximation_epsilon))
-
+        # stack the pool to measure every cut at once
+        idxs = list(self.cut_pool)
+        pis = np.array([self.cut_pool[idx][0] for idx in idxs]).reshape(len(idxs),
+                                                                         len(self.solution))
+        pi0s = np.array([self.cut_pool[idx][1] for idx in idxs], dtype=float)
+        nonzero_coefs = (np.abs(pis) > good_coefficient_approximation_epsilon).sum(axis=1)
+        norms = np.linalg.norm(pis, axis=1)
         # use euclidean distance on cut to normalize for different coef scales
         # to avoid numerical errors ensure reasonable amount of nonzero coefs
-        cut_depths = {idx: (np.dot(pi, self.solution) - pi0) / np.linalg.norm(pi)
-                      for idx, (pi, pi0) in self.cut_pool.items() if
-                      0 < nonzero_coefs(pi) <= max_nonzero_coefs}
+        usable = np.where((0 < nonzero_coefs) & (nonzero_coefs <= max_nonzero_coefs))[0]
+        cut_depths = (pis[usable] @ self.solution - pi0s[usable]) / norms[usable]
         added_cuts = {}
 
-        if not cut_depths:
+        if not len(usable):
             self.cut_generation_terminator = 'no cuts'
-        elif min(cut_depths.values()) >= 0:
+        elif cut_depths.min() >= 0:
             # hamstrung by rounding cut coefs
             self.cut_generation_terminator = 'no improving cuts'
-        elif min(cut_depths.values()) >= -min_cut_depth:
+        elif cut_depths.min() >= -min_cut_depth:
             # hamstrung by cut depth
             self.cut_generation_terminator = 'no sufficient cuts'
 
-        # add cuts in order of depth of violation
-        for idx in sorted(cut_depths, key=cut_depths.get):
-            # if cuts are no longer violated by current optimal solution, break
-            if cut_depths[idx] >= -min_cut_depth:
-                break
-            (pi, pi0) = self.cut_pool[idx]
-            # if cut has terms too much larger than root LP relaxation, toss it
-            if np.max(np.abs(pi)) > max_relative_cut_term_ratio * self.max_term:
+        # candidates in order of depth of violation. drop those no longer violated
+        # by the current optimal solution and those with terms too much larger
+        # than the root LP relaxation
+        order = np.argsort(cut_depths, kind='stable')
+        order = order[cut_depths[order] < -min_cut_depth]
+        candidates = usable[order]
+        candidates = candidates[np.max(np.abs(pis[candidates]), axis=1, initial=0) <=
+                                max_relative_cut_term_ratio * self.max_term]
+        # select most useful cuts by ensuring >10 degrees between each cut and
+        # others added, i.e. cosine of the angle between them below the tolerance's
+        normalized = pis[candidates] / norms[candidates, np.newaxis]
+        too_parallel = normalized @ normalized.T > cos(radians(parallel_cut_tolerance))
+        selected = []
+        for i, cut_idx in enumerate(candidates):
+            if too_parallel[i, selected].any():
                 continue
-            parallel_cut = False
-            # select most useful cuts by ensuring >10 degrees between this cut and others added
-            for pi_prime, pi0_prime in added_cuts.values():
-                # take the median to avoid floating point error causing arc cos to fail
-                cos_theta = median(
-                    [-1, np.dot(pi, pi_prime) / (np.linalg.norm(pi) * np.linalg.norm(pi_prime)), 1]
-                )
-                if degrees(acos(cos_theta)) < parallel_cut_tolerance:
-                    parallel_cut = True
-                    break
-            if not parallel_cut:
-                # uncomment to check if cut is valid
-                # check_cut_against_grid(lp=self.lp, pi=pi, pi0=pi0, max_val=5)
-                # check_cut(sol=[0, 0, 0, 0.95925926, 0.31111111, 0.4, 1.18847737,
-                #                0, 0, 0, 0, 0.875, 0, 0.45185185, 0.3125, 0.46527778],
-                #           lp=self.lp, pi=pi, pi0=pi0)
-                cut = pi * self.lp.getVarByName('x') >= pi0
-                self.lp.addConstraint(cut, idx)
-                added_cuts[idx] = (pi, pi0)
-                del self.cut_pool[idx]
+            selected.append(i)
+            idx = idxs[cut_idx]
+            (pi, pi0) = self.cut_pool[idx]
+            # uncomment to check if cut is valid
+            # check_cut_against_grid(lp=self.lp, pi=pi, pi0=pi0, max_val=5)
+            # check_cut(sol=[0, 0, 0, 0.95925926, 0.31111111, 0.4, 1.18847737,
+            #                0, 0, 0, 0, 0.875, 0, 0.45185185, 0.3125, 0.46527778],
+            #           lp=self.lp, pi=pi, pi0=pi0)
+            cut = pi * self.lp.getVarByName('x') >= pi0
+            self.lp.addConstraint(cut, idx)
+            added_cuts[idx] = (pi, pi0)
+            del self.cut_pool[idx]
 
         self._update_gmic_counts(cut_idxs=added_cuts, operation='added')
         # not needed in cut generation routine but helpful for testing and subclassing
         return added_cuts
 
-    def _find_gomory_cuts(self: T) -> Dict[int: Tuple[CyLPArray, float]]:
+    @timed()
+    def _find_gomory_cuts(self: T) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """Find Gomory Mixed Integer Cuts (GMICs) for this node's solution.
         Defined in Lehigh University ISE 418 lecture 14 slide 18 and 5.31
         in Conforti et al Integer Programming. Assumes Ax >= b and x >= 0.
+        The GMICs of every tableau row with a fractional integer basic variable
+        are built at once, with a row of the returned matrix for each cut.
 
-        :return: a dict of tuples (pi, pi0) that represent the cut pi*x >= pi0.
-        Each tuple is indexed by the row in the LP tableau that generated the cut
+        :return: tableau rows generating the cuts, the stacked cut coefficients
+        and their right hand sides, so the i-th cut is coefs[i] * x >= rhs[i]
         """
-        cuts = {}
-        tableau = self.tableau  # create own tableau b/c CyLP's is incorrect
+        n = self.lp.nVariables
+        B = np.asarray(self.basic_variable_indices, dtype=int)
+        is_integer = np.zeros(n, dtype=bool)
+        is_integer[self._integer_indices] = True
+        structural = B < n
+        integer_basic = np.zeros(len(B), dtype=bool)
+        integer_basic[structural] = is_integer[B[structural]]
+        x_B = np.zeros(len(B))
+        x_B[structural] = self.solution[B[structural]]
+        f0 = x_B - np.floor(x_B)
+        # if whole number or close, skip to avoid numerical issues from division
+        rows = np.where(integer_basic &
+                        (np.minimum(f0, 1 - f0) > variable_epsilon) &
+                        (f0 >= good_coefficient_approximation_epsilon) &
+                        (f0 + good_coefficient_approximation_epsilon <= 1))[0]
+        empty = rows[:0], np.zeros((0, n)), np.zeros(0)
+        if not len(rows):
+            return empty
+        tableau = self.tableau_rows(rows)  # create own tableau b/c CyLP's is incorrect
         if tableau is None:
-            return cuts
-        for row_idx, basic_idx in enumerate(self.basic_variable_indices):
-            if basic_idx in self._integer_indices and \
-                    self._is_fractional(self.solution[basic_idx]):
-                f0 = self._get_fraction(self.solution[basic_idx])
-                # if whole number or close, skip to avoid numerical issues from division
-                if f0 < good_coefficient_approximation_epsilon or \
-                        f0 + good_coefficient_approximation_epsilon > 1:
-                    continue
-                # 0 for basic variables avoids getting small numbers that should be zero
-                f = {i: 0 if i in self.basic_variable_indices else
-                     self._get_fraction(tableau[row_idx, i]) for i in
-                     range(self.lp.nVariables)}
-                # values for continuous variables
-                a = {i: 0 if i in self.basic_variable_indices else tableau[row_idx, i]
-                     for i in range(self.lp.nVariables)}
-                # primary variable coefficients in GMI cut
-                pi = CyLPArray(
-                    [f[j]/f0 if f[j] <= f0 and j in self._integer_indices else
-                     (1 - f[j])/(1 - f0) if j in self._integer_indices else
-                     a[j]/f0 if a[j] > 0 else -a[j]/(1 - f0) for j in range(self.lp.nVariables)]
-                )
-                # slack variable coefficients in GMI cut
-                pi_slacks = np.array([x/f0 if x > 0 else -x/(1 - f0) for x in
-                                      tableau[row_idx, self.lp.nVariables:]])
-                # sub out slack variables for primary variables. Ax >= b =>
-                # Ax - s = b => s = Ax - b. gomory is pi^T * x + pi_s^T * s >= 1, thus
-                # pi^T * x + pi_s^T * (Ax - b) >= 1 => (pi + A^T * pi_s)^T * x >= 1 + pi_s^T * b
-                coefs = pi + self.lp.coefMatrix.T * pi_slacks
-                rhs = 1 + np.dot(pi_slacks, self.lp.constraintsLower)
-                # append coefs^T * x >= rhs
-                cuts[row_idx] = (coefs, rhs)
-        return cuts
+            return empty
+        # 0 for basic variables avoids getting small numbers that should be zero
+        tableau[:, B] = 0
+        f0 = f0[rows, np.newaxis]
+        a = tableau[:, :n]
+        f = a - np.floor(a)
+        # primary variable coefficients in GMI cut, fractions for integer
+        # variables and values for continuous ones
+        pi = np.where(is_integer, np.where(f <= f0, f / f0, (1 - f) / (1 - f0)),
+                      np.where(a > 0, a / f0, -a / (1 - f0)))
+        # slack variable coefficients in GMI cut
+        s = tableau[:, n:]
+        pi_slacks = np.where(s > 0, s / f0, -s / (1 - f0))
+        # sub out slack variables for primary variables. Ax >= b =>
+        # Ax - s = b => s = Ax - b. gomory is pi^T * x + pi_s^T * s >= 1, thus
+        # pi^T * x + pi_s^T * (Ax - b) >= 1 => (pi + A^T * pi_s)^T * x >= 1 + pi_s^T * b
+        coefs = pi + np.asarray(self._factorization['coef_matrix'].T @ pi_slacks.T).T
+        rhs = 1 + pi_slacks @ self.lp.constraintsLower
+        return rows, coefs, rhs
+
+    def tableau_rows(self: T, rows: Union[List[int], np.ndarray, range]) -> \
+            Union[np.ndarray, None]:
+        """ Rows <rows> of the tableau B^-1 [A, -I] of this node's LP. Row i is
+        y^T [A, -I] for the y solving B^T y = e_i, so one sparse LU factorization
+        of the basis is made per LP solve and only the requested rows are solved
+        for. Rows are kept until the basis changes. Assumes Ax >= b
+
+        :param rows: indices of the tableau rows to return
+        :return: array with a row for each of <rows>, or None if the basis is
+        singular or doesn't have a variable for each constraint
+        """
+        factorization = self._basis_factorization()
+        if factorization is None:
+            return None
+        cache = factorization['rows']
+        missing = sorted({int(i) for i in rows} - cache.keys())
+        if missing:
+            unit = np.zeros((self.lp.nConstraints, len(missing)))
+            unit[missing, range(len(missing))] = 1
+            y = factorization['lu'].solve(unit, trans='T')
+            new_rows = np.asarray(factorization['A'].T @ y).T
+            cache.update(zip(missing, new_rows))
+        return np.array([cache[int(i)] for i in rows]).reshape(-1, factorization['A'].shape[1])
+
+    def _basis_factorization(self: T) -> Union[Dict[str, Any], None]:
+        """ Sparse LU factorization of the basis of this node's LP, made again
+        only when the LP was solved since or its constraints or basis changed
+
+        :return: dictionary of the factorization, the matrix [A, -I], A and the
+        tableau rows solved for so far, or None if the basis is singular or
+        doesn't have a variable for each constraint
+        """
+        B = np.asarray(self.basic_variable_indices, dtype=int)
+        # There should be nConstrs basic variables but sometimes CyLP confuses itself
+        if len(B) != self.lp.nConstraints:
+            return None
+        key = (tuple(c.name for c in self.lp.constraints), B.tobytes())
+        if self._factorization is None or self._factorization['key'] != key:
+            coef_matrix = sp.csc_matrix(self.lp.coefMatrix)
+            # [A, -I] stays sparse, as does the basis
+            A = sp.hstack([coef_matrix, -sp.identity(self.lp.nConstraints)], format='csc')
+            try:
+                lu = splu(A[:, B].tocsc())
+            except RuntimeError:  # catch singular matrices
+                lu = None
+            self._factorization = {'key': key, 'lu': lu, 'A': A, 'coef_matrix': coef_matrix,
+                                   'rows': {}}
+        return self._factorization if self._factorization['lu'] is not None else None
 
     @property
     def tableau(self):
         """CyLP builds the tableau incorrectly, so building from scratch. Assumes Ax >= b"""
-        B = self.basic_variable_indices
-        # There should be nConstrs basic variables but sometimes CyLP confuses itself
-        if len(B) != self.lp.nConstraints:
-            return None
-        A = np.concatenate((self.lp.coefMatrix.toarray(), -np.identity(self.lp.nConstraints)), axis=1)
-        A_B = A[:, B]
-        try:
-            A_B_inv = np.linalg.inv(A_B)
-            return A_B_inv @ A
-        except np.linalg.LinAlgError:  # catch singular matrices
-            return None
+        return self.tableau_rows(range(self.lp.nConstraints))
     
     @property
     def basic_variable_indices(self):
@@ -561,6 +779,7 @@ class BaseNode:
                     furthest_index = idx
         return furthest_index
 
+    @timed()
     def _base_branch(self: T, branch_idx: int, next_node_idx: int = None,
                      **kwargs: Any) -> Dict[str, T]:
         """ Creates two new copies of the node with new bounds placed on the variable
@@ -584,28 +803,16 @@ class BaseNode:
 
         self.is_leaf = False
 
-        # get end basis to warm start the children
-        # appears to be tuple  (variable statuses, slack statuses)
-        basis = self.lp.getBasisStatus()
-
-        # create new lp's for each direction
-        children = {'right': CyClpSimplex(), 'left': CyClpSimplex()}
-        for direction, lp in children.items():
-            x = lp.addVariable('x', self.lp.nCols)
-            l = CyLPArray(self.lp.variablesLower.copy())
-            u = CyLPArray(self.lp.variablesUpper.copy())
-            if direction == 'left':
-                u[branch_idx] = floor(b_val)
-            else:
-                l[branch_idx] = ceil(b_val)
-            lp += l <= x <= u
-            for constr in self.lp.constraints:
-                lp.addConstraint(
-                    CyLPArray(constr.lower.copy()) <= constr.varCoefs[constr.variables[0]] * x
-                    <= CyLPArray(constr.upper.copy()), name=constr.name
-                )
-            lp.objective = self.lp.objective.copy()
-            lp.setBasisStatus(*basis)  # warm start
+        # children share the parent's lp data, keeping only the bound they
+        # branched on and the basis to start from: the parent's end basis, or
+        # where strong branching left them if it did. their LP's aren't built
+        # until bounded, so pruned children never build one
+        children = self.strong_branch_children.get(branch_idx)
+        self.strong_branch_children = {}
+        if children is None:
+            lp_data = get_lp_data(self.lp)
+            children = {direction: _branched_lp_data(lp_data, branch_idx, direction, b_val)
+                        for direction in ['right', 'left']}
 
         self.children = (next_node_idx, next_node_idx + 1) if next_node_idx is not None else None
 
@@ -626,10 +833,13 @@ class BaseNode:
             'next_node_idx': next_node_idx + 2 if next_node_idx is not None else next_node_idx
         }
 
+    @timed()
     def _strong_branch(self: T, idx: int, iterations: int = 5) -> Dict[str, T]:
         """ Run <iterations> iterations of dual simplex starting from the
         optimal solution of this node after branching on index <idx>. Returns
-        bounds of both branches if feasible, None if false
+        bounds of both branches if feasible, None if false. The children's LP's
+        are kept in strong_branch_children so that branching on <idx> later
+        starts them from where strong branching left off.
 
         :param idx: which index to branch on
         :param iterations: how many iterations of dual simplex to perform
@@ -639,13 +849,97 @@ class BaseNode:
         """
         assert isinstance(iterations, int) and iterations > 0, \
             'iterations must be positive integer'
+        # strong branch from this node's basis, even if <idx> has been before
+        strong_branch_children = {i: c for i, c in self.strong_branch_children.items()
+                                  if i != idx}
+        self.strong_branch_children = strong_branch_children
         nodes = {k: v for k, v in self._base_branch(idx).items()
                  if k in ['left', 'right']}
+        lp_data = {direction: n._lp_data for direction, n in nodes.items()}
         for n in nodes.values():
+            max_num_iteration = n.lp.maxNumIteration
             n.lp.maxNumIteration = iterations
             n.lp.dual()
+            self.stats.add_simplex_iterations('_strong_branch', n.lp.iteration)
+            n.lp.maxNumIteration = max_num_iteration
+        # bounding the children picks up from here, so they don't solve again
+        strong_branch_children[idx] = {direction: {**lp_data[direction],
+                                                   'basis': n.lp.getBasisStatus()}
+                                       for direction, n in nodes.items()}
+        self.strong_branch_children = strong_branch_children
         return nodes
 
+    def _strong_branch_pool(self: T, processes: int) -> ProcessPoolExecutor:
+        """ The pool of <processes> worker processes to strong branch in with
+        _strong_branch_in_parallel. Started the first time a node in this process
+        needs it and reused by the nodes after, so a solve starts one pool rather
+        than one per node. Each worker receives the constraint coefficients this
+        process shares when it starts, so the pool is restarted if they change.
+        BranchAndBound shuts it down at the end of each solve with
+        shutdown_strong_branch_pool.
+
+        :param processes: number of worker processes
+        :return: the pool
+        """
+        global _strong_branch_executor
+        assert isinstance(processes, int) and processes > 0, 'processes is a positive integer'
+        coefs = shared_coefs()
+        if _strong_branch_executor is not None and \
+                _strong_branch_executor[:3] != (os.getpid(), processes, coefs.keys()):
+            shutdown_strong_branch_pool()
+        if _strong_branch_executor is None:
+            _strong_branch_executor = os.getpid(), processes, coefs.keys(), ProcessPoolExecutor(
+                max_workers=processes, initializer=share_coefs, initargs=(coefs,))
+        return _strong_branch_executor[3]
+
+    @timed()
+    def _strong_branch_in_parallel(self: T, indices: List[int], executor: ProcessPoolExecutor,
+                                   iterations: int = 5) -> Dict[int, Dict[str, Dict[str, Any]]]:
+        """ Strong branch on each of <indices> like _strong_branch, but with each
+        (index, direction) pair solved in one of <executor>'s processes from their
+        copy of this node's LP. The LP is written to a file once, without the
+        constraint coefficients the workers already share, and each worker loads it
+        the first time it strong branches from it. Gives the same results
+        as calling _strong_branch on each index in turn, and likewise keeps the
+        children's LP's in strong_branch_children. Since the LP's solved stay in
+        the worker processes, only what they ended with is returned rather than
+        nodes.
+
+        :param indices: which indices to strong branch on
+        :param executor: pool made by _strong_branch_pool for this node's LP
+        :param iterations: how many iterations of dual simplex to perform
+        :return: dict keyed by index of dicts keyed by direction, each with the
+        'status' code, 'objective_value' and 'iterations' of that direction's LP
+        """
+        assert isinstance(iterations, int) and iterations > 0, \
+            'iterations must be positive integer'
+        assert self.lp_feasible, 'must solve before strong branching'
+        assert all(idx in self._integer_indices and self._is_fractional(self.solution[idx])
+                   for idx in indices), 'must strong branch on fractional integer indices'
+        lp_data = get_lp_data(self.lp)
+        with tempfile.NamedTemporaryFile(suffix='.pkl', delete=False) as f:
+            pickle.dump(compact_lp_data(lp_data), f)
+        try:
+            pairs = [(idx, direction) for idx in indices for direction in ['right', 'left']]
+            results = list(executor.map(
+                _strong_branch_direction, repeat((next(_strong_branch_lp_keys), f.name)),
+                [idx for idx, _ in pairs], [direction for _, direction in pairs],
+                [self.solution[idx] for idx, _ in pairs], repeat(iterations)
+            ))
+        finally:
+            os.remove(f.name)
+
+        # the workers only send back the basis, so the children share this LP's arrays
+        rtn = {}
+        for (idx, direction), result in zip(pairs, results):
+            self.stats.add_simplex_iterations('_strong_branch_in_parallel', result['iterations'])
+            self.strong_branch_children.setdefault(idx, {})[direction] = {
+                **_branched_lp_data(lp_data, idx, direction, self.solution[idx]),
+                'basis': result.pop('basis')
+            }
+            rtn.setdefault(idx, {})[direction] = result
+        return rtn
+
     def _is_fractional(self: T, value: Union[int, float]) -> bool:
         """Returns True if value fractional, False if not.
 
@@ -686,9 +980,14 @@ class BaseNode:
 
     @property
     def _sense(self: T):
-        inf = self.lp.getCoinInfinity()
-        lower_bounded = self.lp.constraintsLower.max() > -inf
-        upper_bounded = self.lp.constraintsUpper.min() < inf
+        if self._lp is None:  # check the data rather than building the LP
+            inf = self._lp_data['infinity']
+            lower_bounded = max(c[2].max() for c in self._lp_data['constraints']) > -inf
+            upper_bounded = min(c[3].min() for c in self._lp_data['constraints']) < inf
+        else:
+            inf = self.lp.getCoinInfinity()
+            lower_bounded = self.lp.constraintsLower.max() > -inf
+            upper_bounded = self.lp.constraintsUpper.min() < inf
         assert not (lower_bounded and upper_bounded),\
             "all constraints should be bounded same way"
         return '<=' if upper_bounded else '>='
@@ -699,6 +998,8 @@ class BaseNode:
 
         :return:
         """
+        if self._lp is None:
+            return (variable_bounds(self._lp_data)[0] >= 0).all()
         return (self.lp.variablesLower >= 0).all()
 
     @property
@@ -707,4 +1008,63 @@ class BaseNode:
 
         :return:
         """
+        if self._lp is None:
+            return True  # get_lp_data() only takes LP's with just x
         return len(self.lp.variables) == 1 and self.lp.variables[0].name == 'x'
+
+
+def _branched_lp_data(lp_data: lp_data_hint, idx: int, direction: str,
+                      value: Union[int, float]) -> lp_data_hint:
+    """ Lp data of the unsolved LP made by branching <direction> on index <idx>
+    of <lp_data> at fractional <value>. It shares every array with <lp_data> and
+    keeps the branched bound as its 'bound_change' (see utils.lp_data.variable_bounds)
+
+    :param lp_data: dictionary created by get_lp_data()
+    :param idx: index branched on
+    :param direction: 'left' to round <value> down, 'right' to round it up
+    :param value: value of index <idx> being branched on
+    :return: the child's lp data
+    """
+    lower, upper = lp_data['variables_lower'][idx], lp_data['variables_upper'][idx]
+    if direction == 'left':
+        upper = floor(value)
+    else:
+        lower = ceil(value)
+    return {**lp_data, 'bound_change': (idx, lower, upper), 'status': -1}
+
+
+def shutdown_strong_branch_pool() -> None:
+    """ Shut down the pool nodes in this process strong branch in, if one was
+    started. Pools inherited from a parent process are left to it.
+
+    :return:
+    """
+    global _strong_branch_executor
+    if _strong_branch_executor is not None and _strong_branch_executor[0] == os.getpid():
+        _strong_branch_executor[3].shutdown()
+    _strong_branch_executor = None
+
+
+def _strong_branch_direction(lp_file: Tuple[int, str], idx: int, direction: str,
+                             value: Union[int, float], iterations: int) -> Dict[str, Any]:
+    """ Branch <direction> on index <idx> of the LP in <lp_file> and run
+    <iterations> iterations of dual simplex, as BaseNode._strong_branch does for a
+    child. Module level so that worker processes can unpickle it.
+
+    :param lp_file: key and path of the file holding the LP data of the node
+    being strong branched on. Each worker process keeps the last one it loaded
+    :param idx: index to branch on
+    :param direction: 'left' or 'right'
+    :param value: value of index <idx> in the LP's solution
+    :param iterations: how many iterations of dual simplex to perform
+    :return: the LP's status code, objective value, simplex iterations and basis
+    """
+    global _strong_branch_lp
+    if _strong_branch_lp[0] != lp_file[0]:
+        with open(lp_file[1], 'rb') as f:
+            _strong_branch_lp = lp_file[0], expand_lp_data(pickle.load(f))
+    lp = build_lp(_branched_lp_data(_strong_branch_lp[1], idx, direction, value), resolve=False)
+    lp.maxNumIteration = iterations
+    lp.dual()
+    return {'status': lp.getStatusCode(), 'objective_value': lp.objectiveValue,
+            'iterations': lp.iteration, 'basis': lp.getBasisStatus()}
@@ -7,6 +7,7 @@ import re
 from simple_mip_solver import BaseNode
 from simple_mip_solver.utils.cut_generating_lp import CutGeneratingLP
 from simple_mip_solver.utils.floating_point import numerically_safe_cut
+from simple_mip_solver.utils.solve_stats import timed
 from simple_mip_solver.utils.tolerance import min_cglp_norm
 
 G = TypeVar('G', bound='CuttingPlaneBoundNode')
@@ -93,6 +94,7 @@ class DisjunctiveCutBoundNode(BaseNode):
             rtn['cuts'] = self.sharable_cuts
         return rtn
 
+    @timed()
     def _remove_slack_cuts(self: G, **kwargs) -> List[str]:
         """ calls super()'s method then counts removal of disjunctive cuts
 
@@ -130,8 +132,10 @@ class DisjunctiveCutBoundNode(BaseNode):
 
         # dont do if parent or previous iteration's cglp failed to yield good cut
         if self.previous_cglp_added and self.cut_generation_iterations <= max_cglp_calls:
-            pi, pi0 = self.cglp.solve(x_star=CyLPArray(self.solution),
-                                      starting_basis=self._get_cglp_starting_basis(**kwargs))
+            with self.stats.record('CutGeneratingLP.solve'):
+                pi, pi0 = self.cglp.solve(x_star=CyLPArray(self.solution),
+                                          starting_basis=self._get_cglp_starting_basis(**kwargs))
+            self.stats.add_simplex_iterations('CutGeneratingLP.solve', self.cglp.lp.iteration)
             if pi is not None and pi0 is not None and np.linalg.norm(pi) > min_cglp_norm:
                 idx = f'cut_cglp_{self.idx}_{self.cut_generation_iterations}'
                 pi, pi0 = (numerically_safe_cut(pi=pi, pi0=pi0, estimate='over'))
@@ -161,6 +165,7 @@ class DisjunctiveCutBoundNode(BaseNode):
         else:
             return None
 
+    @timed()
     def _select_cuts(self, cglp_cumulative_constraints: bool = True,
                      cglp_cumulative_bounds: bool = True, **kwargs) -> \
             Dict[str, Union[CyLPArray, float]]:
@@ -1,5 +1,6 @@
 from __future__ import annotations
 from math import floor, ceil
+import numpy as np
 from typing import List, Dict, Union, Any, TypeVar
 
 from simple_mip_solver.nodes.base_node import BaseNode
@@ -18,9 +19,10 @@ class PseudoCostBranchNode(BaseNode):
         self.branch_method = 'pseudo cost'
         self.pseudo_costs = None
         self.strong_branch_iters = None
+        self.strong_branch_processes = 1
 
     def bound(self: T, pseudo_costs: pseudo_costs_hint, strong_branch_iters: int = 5,
-              **kwargs: Any) -> Dict[str, Any]:
+              strong_branch_processes: int = 1, **kwargs: Any) -> Dict[str, Any]:
         """ Extends BaseNode's bound by updating psuedocosts if the underlying
         relaxation is feasible
 
@@ -28,6 +30,11 @@ class PseudoCostBranchNode(BaseNode):
         per unit change in variable value
         :param strong_branch_iters: how many iterations to do during strong
         branching when initializing pseudo costs
+        :param strong_branch_processes: number of worker processes to strong branch
+        in. When more than 1 and there is more than one index to strong branch on,
+        each (index, direction) pair is solved in a pool of processes, shared by
+        the nodes of a solve, from a copy of this node's LP (see
+        BaseNode._strong_branch_in_parallel)
         :param kwargs: a dictionary to hold unneeded arguments sent by a general
         branch and bound method
         :return: a dictionary mapping the pseudo costs to the '_pseudo_costs'
@@ -35,8 +42,11 @@ class PseudoCostBranchNode(BaseNode):
         """
         problems = self._check_pseudo_costs(pseudo_costs)
         assert not problems, f'pseudo cost dict has following errors: {problems}'
+        assert isinstance(strong_branch_processes, int) and strong_branch_processes > 0, \
+            'strong_branch_processes is a positive integer'
         self.pseudo_costs = pseudo_costs
         self.strong_branch_iters = strong_branch_iters
+        self.strong_branch_processes = strong_branch_processes
         rtn = super().bound(**kwargs)
         if self.lp_feasible:
             self._update_pseudo_costs()
@@ -57,14 +67,34 @@ class PseudoCostBranchNode(BaseNode):
         sb_indices = [idx for idx in self._integer_indices if
                       self._is_fractional(self.solution[idx])
                       and idx not in self.pseudo_costs]
-        for idx in sb_indices:
-            for strong_branch_node in self._strong_branch(idx, self.strong_branch_iters).values():
-                self._calculate_costs(strong_branch_node)
+        if self.strong_branch_processes > 1 and len(sb_indices) > 1:
+            executor = self._strong_branch_pool(self.strong_branch_processes)
+            results = self._strong_branch_in_parallel(sb_indices, executor,
+                                                      self.strong_branch_iters)
+            for idx in sb_indices:
+                self._calculate_strong_branch_costs(idx, results[idx])
+        else:
+            for idx in sb_indices:
+                for strong_branch_node in self._strong_branch(idx, self.strong_branch_iters).values():
+                    self._calculate_costs(strong_branch_node)
 
         # calculate pseudo_cost[self.b_idx][self.b_dir] if we didn't just above
         if self._b_idx is not None and self._b_idx not in sb_indices:
             self._calculate_costs(self)
 
+        self._keep_best_strong_branch_children()
+
+    def _keep_best_strong_branch_children(self: T) -> None:
+        """ branch() picks the best index by the pseudo costs, so drop the strong
+        branching children of every other index since they can't be reused
+
+        :return:
+        """
+        if self.strong_branch_children:
+            best_idx = self._best_pseudo_costs_index(self.pseudo_costs)
+            self.strong_branch_children = {idx: children for idx, children in
+                                           self.strong_branch_children.items() if idx == best_idx}
+
     def _calculate_costs(self: T, node: T) -> None:
         """ Calculate and save the pseudocost for the index and direction
         branched on in <node>. This is done by finding the rate of change of the
@@ -78,20 +108,50 @@ class PseudoCostBranchNode(BaseNode):
         """
         idx = node._b_idx
         direction = node._b_dir
+        variable_change = node._b_val - node.lp.variablesUpper[idx] if \
+            direction == 'left' else node.lp.variablesLower[idx] - node._b_val
+        self._add_cost(idx, direction, node.lp.getStatusCode(),
+                       node.lp.objectiveValue - node.dual_bound, variable_change)
+
+    def _calculate_strong_branch_costs(self: T, idx: int,
+                                       results: Dict[str, Dict[str, Any]]) -> None:
+        """ Calculate and save the pseudocosts for index <idx> from the results
+        of strong branching on it in other processes, as _calculate_costs does
+        for the nodes _strong_branch returns
+
+        :param idx: index strong branched on
+        :param results: the dict _strong_branch_in_parallel returned for <idx>
+        :return:
+        """
+        value = self.solution[idx]
+        for direction, result in results.items():
+            variable_change = value - floor(value) if direction == 'left' else \
+                ceil(value) - value
+            self._add_cost(idx, direction, result['status'],
+                           result['objective_value'] - self.objective_value, variable_change)
+
+    def _add_cost(self: T, idx: int, direction: str, status: int,
+                  bound_change: Union[float, int], variable_change: Union[float, int]) -> None:
+        """ Average the change in bound per unit change in variable value from
+        branching <direction> on index <idx> into its pseudo cost
 
+        :param idx: index branched on
+        :param direction: direction branched
+        :param status: CLP status code of the LP solved after branching
+        :param bound_change: how much branching changed the bound
+        :param variable_change: how far branching moved the variable's value
+        :return:
+        """
         # set defaults for pseudo costs if they dont exist
         self.pseudo_costs[idx] = self.pseudo_costs.get(idx, {})
         self.pseudo_costs[idx][direction] = self.pseudo_costs[idx].get(
             direction, {'cost': 0, 'times': 0})
-        if node.lp.getStatusCode() in [0, 3]:  # optimal or hit max iters
+        if status in [0, 3]:  # optimal or hit max iters
             # CLP gets tripped up warm starting sometimes and gives an objective
             # better than the dual bound despite having added a constraint
             # since its just pseudocosting, give the lowest possible value
-            bound_change = node.lp.objectiveValue - node.dual_bound
             if bound_change < 0:
                 bound_change = 0
-            variable_change = node._b_val - node.lp.variablesUpper[idx] if \
-                direction == 'left' else node.lp.variablesLower[idx] - node._b_val
             cost = self.pseudo_costs[idx][direction]['cost']
             times = self.pseudo_costs[idx][direction]['times']
             self.pseudo_costs[idx][direction]['cost'] = (cost * times + bound_change /
@@ -161,3 +221,38 @@ class PseudoCostBranchNode(BaseNode):
                     problems.append(f'index {idx} direction {direction} times must'
                                     ' be nonnegative int')
         return problems
+
+
+def rounding_costs(pseudo_costs: pseudo_costs_hint, solution: np.ndarray, indices: List[int],
+                   default: Union[float, int] = 0) -> Dict[int, Dict[str, float]]:
+    """ Estimate how much the objective grows rounding each of <indices> of
+    <solution> down ('left') or up ('right') as the direction's pseudo cost times
+    the distance rounded. Directions never branched on (i.e. without 'times')
+    use the average pseudo cost of the indices that have been in that direction,
+    or <default> if none have.
+
+    :param pseudo_costs: dictionary holding expected change in objective
+    per unit change in variable value
+    :param solution: values of the variables to round
+    :param indices: indices of <solution> to estimate the costs of rounding
+    :param default: pseudo cost of directions no index has been branched in yet.
+    0 estimates rounding them as free, while 1 makes their cost the distance
+    rounded, i.e. how fractional the index is
+    :return: estimated cost of rounding each of <indices> in each direction
+    """
+    average = {}
+    for direction in ['left', 'right']:
+        known = [costs[direction]['cost'] for costs in pseudo_costs.values()
+                 if costs.get(direction, {}).get('times')]
+        average[direction] = sum(known) / len(known) if known else default
+    rtn = {}
+    for idx in indices:
+        value = solution[idx]
+        distance = {'left': value - floor(value), 'right': ceil(value) - value}
+        rtn[idx] = {}
+        for direction in ['left', 'right']:
+            pseudo_cost = pseudo_costs.get(idx, {}).get(direction, {})
+            unit_cost = pseudo_cost['cost'] if pseudo_cost.get('times') else \
+                average[direction]
+            rtn[idx][direction] = unit_cost * distance[direction]
+    return rtn
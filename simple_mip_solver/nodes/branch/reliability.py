@@ -0,0 +1,166 @@
+from __future__ import annotations
+from typing import List, Dict, Any, TypeVar
+
+from simple_mip_solver.nodes.branch.pseudo_cost import PseudoCostBranchNode, pseudo_costs_hint, \
+    rounding_costs
+
+T = TypeVar('T', bound='ReliabilityBranchNode')
+
+
+class ReliabilityBranchNode(PseudoCostBranchNode):
+    """ An extension of the PseudoCostBranchNode class to allow for reliability
+    branching, which strong branches only on the most promising indices whose
+    pseudo costs are not yet reliable
+    """
+
+    def __init__(self: T, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.branch_method = 'reliability'
+        self.reliability_threshold = None
+        self.max_strong_branch_candidates = None
+        self.strong_branch_lookahead = None
+
+    def bound(self: T, pseudo_costs: pseudo_costs_hint, reliability_threshold: int = 8,
+              max_strong_branch_candidates: int = 100, strong_branch_lookahead: int = 8,
+              **kwargs: Any) -> Dict[str, Any]:
+        """ Extends PseudoCostBranchNode's bound by limiting how much strong
+        branching updating the pseudo costs does
+
+        :param pseudo_costs: dictionary holding expected change in objective
+        per unit change in variable value
+        :param reliability_threshold: how many times both directions of an index
+        must have been branched on for its pseudo costs to be trusted without
+        strong branching
+        :param max_strong_branch_candidates: how many of the best scoring
+        fractional indices to consider strong branching on
+        :param strong_branch_lookahead: how many strong branched indices in a row
+        can fail to improve the best score before strong branching stops
+        :param kwargs: a dictionary to hold unneeded arguments sent by a general
+        branch and bound method
+        :return: a dictionary mapping the pseudo costs to the '_pseudo_costs'
+        parameter in the branch and bound object
+        """
+        assert isinstance(reliability_threshold, int) and reliability_threshold > 0, \
+            'reliability_threshold is a positive integer'
+        assert isinstance(max_strong_branch_candidates, int) and \
+            max_strong_branch_candidates > 0, 'max_strong_branch_candidates is a positive integer'
+        assert isinstance(strong_branch_lookahead, int) and strong_branch_lookahead > 0, \
+            'strong_branch_lookahead is a positive integer'
+        self.reliability_threshold = reliability_threshold
+        self.max_strong_branch_candidates = max_strong_branch_candidates
+        self.strong_branch_lookahead = strong_branch_lookahead
+        return super().bound(pseudo_costs=pseudo_costs, **kwargs)
+
+    def _update_pseudo_costs(self: T) -> None:
+        """ Update the pseudo costs for the variable branched on in the current
+        node and strong branch on fractional indices whose pseudo costs are not
+        yet reliable. Indices are taken in order of their current score, only
+        the best max_strong_branch_candidates are considered, and strong branching
+        stops once strong_branch_lookahead indices in a row fail to improve the
+        best score. With more than one strong_branch_processes, strong branching
+        is done in batches of candidates across the pool of processes, giving the
+        same pseudo costs as doing it here one at a time.
+
+        Follows reliability branching in Branching rules revisited by Achterberg,
+        Koch and Martin.
+
+        :return:
+        """
+        fractional = [idx for idx in self._integer_indices if
+                      self._is_fractional(self.solution[idx])]
+        scores = self._scores(self.pseudo_costs, fractional)
+        candidates = sorted(fractional, key=scores.get,
+                            reverse=True)[:self.max_strong_branch_candidates]
+        unreliable = [idx for idx in candidates if not self._is_reliable(idx)]
+        parallel = self.strong_branch_processes > 1 and len(unreliable) > 1
+        # with more than one process, the next unreliable candidates are strong
+        # branched together. the lookahead may stop before using all of them,
+        # but pseudo costs are only updated with those the sequential loop uses
+        batch_size = max(1, self.strong_branch_processes // 2)
+        results = {}
+        sb_indices = []
+        best_score = -float('inf')
+        fails = 0
+        for idx in candidates:
+            strong_branched = idx in unreliable
+            if strong_branched and parallel:
+                if idx not in results:
+                    start = unreliable.index(idx)
+                    results.update(self._strong_branch_in_parallel(
+                        unreliable[start:start + batch_size],
+                        self._strong_branch_pool(self.strong_branch_processes),
+                        self.strong_branch_iters))
+                self._calculate_strong_branch_costs(idx, results[idx])
+            elif strong_branched:
+                nodes = self._strong_branch(idx, self.strong_branch_iters)
+                for strong_branch_node in nodes.values():
+                    self._calculate_costs(strong_branch_node)
+            if strong_branched:
+                sb_indices.append(idx)
+                scores[idx] = self._scores(self.pseudo_costs, [idx])[idx]
+            if scores[idx] > best_score:
+                best_score, fails = scores[idx], 0
+            elif strong_branched:
+                fails += 1
+                if fails >= self.strong_branch_lookahead:
+                    break
+
+        # calculate pseudo_cost[self.b_idx][self.b_dir] if we didn't just above
+        if self._b_idx is not None and self._b_idx not in sb_indices:
+            self._calculate_costs(self)
+
+        self._keep_best_strong_branch_children()
+
+    def _check_pseudo_costs(self: T, pseudo_costs: pseudo_costs_hint) -> List[str]:
+        """ Extends PseudoCostBranchNode's check to allow indices with pseudo costs
+        for only one direction, which indices branched on without being strong
+        branched get. _scores gives the missing direction the average cost.
+
+        :param pseudo_costs: dictionary suspected of holding expected change in
+        objective per unit change in variable value
+        :return: list of any problems found with the pseudo cost dictionary
+        """
+        # a direction never branched on checks like one branched on 0 times
+        unbranched = {'cost': 0, 'times': 0}
+        return super()._check_pseudo_costs({
+            idx: {direction: pc.get(direction, unbranched) for direction in ['right', 'left']}
+            if isinstance(pc, dict) else pc for idx, pc in pseudo_costs.items()
+        })
+
+    def _is_reliable(self: T, idx: int) -> bool:
+        """ Returns True if both directions of index <idx> have been branched on
+        at least reliability_threshold times
+
+        :param idx: index to check
+        :return: whether the pseudo costs of <idx> are reliable
+        """
+        return all(self.pseudo_costs.get(idx, {}).get(direction, {}).get('times', 0) >=
+                   self.reliability_threshold for direction in ['right', 'left'])
+
+    def _scores(self: T, pseudo_costs: pseudo_costs_hint, indices: List[int]) -> \
+            Dict[int, float]:
+        """ Score each of <indices> by the smaller of its expected changes in bound
+        from branching up and down, as PseudoCostBranchNode does. Directions never
+        branched on estimate theirs as rounding_costs does, with a default pseudo
+        cost of 1 so that before any index has pseudo costs in a direction, the
+        most fractional indices score best rather than all scoring 0.
+
+        :param pseudo_costs: dictionary holding expected change in objective
+        per unit change in variable value
+        :param indices: indices to score
+        :return: dictionary of each index's score
+        """
+        costs = rounding_costs(pseudo_costs, self.solution, indices, default=1)
+        return {i: min(cost.values()) for i, cost in costs.items()}
+
+    def _best_pseudo_costs_index(self: T, pseudo_costs: pseudo_costs_hint) -> int:
+        """ Select the fractional index with the best score, which does not need
+        every fractional index to have pseudo costs
+
+        :param pseudo_costs: dictionary holding expected change in objective
+        per unit change in variable value
+        :return: index with the best score
+        """
+        scores = self._scores(pseudo_costs, [i for i in self._integer_indices
+                                             if self._is_fractional(self.solution[i])])
+        return sorted(scores, key=scores.get, reverse=True)[0]
@@ -3,6 +3,7 @@ nodes. I.e. create new classes here for nodes with custom search, branch, and/or
 
 from simple_mip_solver.nodes.branch.pseudo_cost import PseudoCostBranchNode
 from simple_mip_solver.nodes.bound.disjunctive_cut import DisjunctiveCutBoundNode
+from simple_mip_solver.nodes.search.best_estimate import BestEstimateSearchNode
 from simple_mip_solver.nodes.search.depth_first import DepthFirstSearchNode
 
 
@@ -12,3 +13,7 @@ class PseudoCostBranchDepthFirstSearchNode(PseudoCostBranchNode, DepthFirstSearc
 
 class DisjunctiveCutBoundPseudoCostBranchNode(DisjunctiveCutBoundNode, PseudoCostBranchNode):
     pass
+
+
+class PseudoCostBranchBestEstimateSearchNode(PseudoCostBranchNode, BestEstimateSearchNode):
+    pass
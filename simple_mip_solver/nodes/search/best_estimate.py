@@ -0,0 +1,69 @@
+from typing import Any, Dict, TypeVar, Union
+
+from simple_mip_solver.nodes.base_node import BaseNode
+from simple_mip_solver.nodes.branch.pseudo_cost import rounding_costs
+
+T = TypeVar('T', bound='BestEstimateSearchNode')
+
+
+class BestEstimateSearchNode(BaseNode):
+    """ An extension of the BaseNode class to allow for best estimate search
+    when nodes are stored in a priority queue. A node's estimate is its dual
+    bound plus the pseudo cost estimate of what rounding its parent's solution
+    to integrality costs, so nodes likely to lead to good incumbents go first.
+    NodeQueue switches to the node with the best dual bound every
+    <best_bound_frequency> nodes so the dual bound still improves."""
+
+    best_bound_frequency = 10
+
+    def __init__(self: T, *args: Any, estimate: Union[float, int] = None, **kwargs: Any):
+        """
+        :param args: positional arguments for BaseNode
+        :param estimate: estimated objective value of the best integer solution
+        in this node's subtree. Defaults to its dual bound
+        :param kwargs: key word arguments for BaseNode
+        """
+        super().__init__(*args, **kwargs)
+        assert estimate is None or isinstance(estimate, (int, float)), \
+            'estimate must be a float or an int if provided'
+        self.search_method = 'best estimate'
+        self.estimate = self.dual_bound if estimate is None else estimate
+
+    def _base_branch(self: T, branch_idx: int, **kwargs: Any) -> Dict[str, T]:
+        """ Extends BaseNode's _base_branch by estimating each child's objective
+        value. Every fractional index other than <branch_idx> adds the cheaper
+        of its estimated costs to round down or up, while <branch_idx> adds the
+        cost of rounding in the direction the child branched.
+
+        :param branch_idx: index of variable to branch on
+        :param kwargs: key word arguments for BaseNode's _base_branch. Pseudo
+        costs are taken from 'pseudo_costs' if given, else from the ones a
+        PseudoCostBranchNode keeps.
+        :return: dict of Nodes with the new bounds keyed by direction they branched
+        """
+        rtn = super()._base_branch(branch_idx, **kwargs)
+        pseudo_costs = kwargs.get('pseudo_costs', getattr(self, 'pseudo_costs', None)) or {}
+        costs = rounding_costs(pseudo_costs, self.solution, [
+            idx for idx in self._integer_indices if self._is_fractional(self.solution[idx])
+        ])
+        others = sum(min(cost.values()) for idx, cost in costs.items() if idx != branch_idx)
+        for direction in ['left', 'right']:
+            rtn[direction].estimate = self.objective_value + others + \
+                costs[branch_idx][direction]
+        return rtn
+
+    def __eq__(self, other: T):
+        if isinstance(other, BestEstimateSearchNode):
+            return self.estimate == other.estimate
+        else:
+            raise TypeError('A Best Estimate Node can only be compared with another '
+                            'Best Estimate Node')
+
+    # self < other means self gets better priority in priority queue
+    # want priority to go to node with lowest estimate
+    def __lt__(self, other: T):
+        if isinstance(other, BestEstimateSearchNode):
+            return self.estimate < other.estimate
+        else:
+            raise TypeError('A Best Estimate Node can only be compared with another '
+                            'Best Estimate Node')
@@ -0,0 +1,173 @@
+from coinor.cuppy.milpInstance import MILPInstance
+import argparse
+import inspect
+import json
+from math import isclose
+from multiprocessing import Pool
+import os
+import resource
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Tuple, Type
+
+from simple_mip_solver import BaseNode, BranchAndBound
+from simple_mip_solver.nodes import nodes
+from test_simple_mip_solver import example_models
+
+result_hint = Dict[str, Any]
+
+model_folder = os.path.dirname(os.path.abspath(inspect.getfile(example_models)))
+model_sets = {name: os.path.join(model_folder, name) for name in
+              ['example_models', 'scale_1_models', 'example_value_functions']}
+# the combinations of branch, bound and search methods defined in nodes.py
+node_classes = {name: cls for name, cls in inspect.getmembers(nodes, inspect.isclass)
+                if issubclass(cls, BaseNode) and cls.__module__ == nodes.__name__}
+
+
+def find_models(model_set: str) -> List[str]:
+    """ Find the MPS files in the bundled model set <model_set>, including those
+    in its subfolders (e.g. one per instance in example_value_functions)
+
+    :param model_set: one of the keys of model_sets
+    :return: sorted paths of the model set's MPS files
+    """
+    assert model_set in model_sets, f'model_set must be one of {list(model_sets)}'
+    return sorted(os.path.join(fldr, file) for fldr, _, files in os.walk(model_sets[model_set])
+                  for file in files if file.endswith('.mps'))
+
+
+def _solve(task: Tuple[str, Type[BaseNode], Dict[str, Any]]) -> result_hint:
+    """ Solve one model with one Node class and measure it. Module level so
+    that worker processes can unpickle it.
+
+    :param task: the path to the model, the Node class to solve it with, and
+    key word arguments for BranchAndBound
+    :return: the measurements of the solve
+    """
+    file, Node, kwargs = task
+    start = time.perf_counter()
+    bb = BranchAndBound(MILPInstance(file_name=file), Node=Node, **kwargs)
+    bb.solve()
+    return {
+        'model': os.path.relpath(file, model_folder),
+        'Node': Node.__name__,
+        'status': bb.status,
+        'objective_value': bb.objective_value,
+        'wall_time': time.perf_counter() - start,
+        'solve_time': bb.solve_time,
+        'evaluated_nodes': bb.evaluated_nodes,
+        'simplex_iterations': bb.stats.simplex_iterations,
+        'gap_history': bb.stats.gap_history,
+        'phases': bb.stats.phases,
+        # ru_maxrss is in kilobytes on linux
+        'peak_memory': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    }
+
+
+def run_benchmark(files: Iterable[str], Nodes: Iterable[Type[BaseNode]] = None,
+                  max_run_time: float = 60, **kwargs: Any) -> List[result_hint]:
+    """ Solve each model in <files> with each Node class in <Nodes>. Every solve
+    runs in its own fresh worker process so peak memory is measured per solve
+    and one solve cannot warm up caches for the next.
+
+    :param files: paths to the MPS files to solve
+    :param Nodes: Node classes to solve each model with. Defaults to every
+    class in nodes.py
+    :param max_run_time: max_run_time for each solve
+    :param kwargs: key word arguments passed on to BranchAndBound
+    :return: the measurements of each solve in the order they were run
+    """
+    Nodes = list(node_classes.values()) if Nodes is None else list(Nodes)
+    assert all(inspect.isclass(Node) and issubclass(Node, BaseNode) for Node in Nodes), \
+        'Nodes must be BaseNode subclasses'
+    kwargs = {'pseudo_costs': {}, 'max_run_time': max_run_time, **kwargs}
+    tasks = [(file, Node, kwargs) for file in files for Node in Nodes]
+    with Pool(processes=1, maxtasksperchild=1) as pool:
+        return list(pool.imap(_solve, tasks))
+
+
+def compare(results: List[result_hint], baseline: List[result_hint],
+            tolerance: float = .25, min_time: float = .1) -> List[str]:
+    """ Flag each solve in <results> that got worse than the same model and
+    Node class in <baseline>. A solve regresses if its status or objective
+    value changed, or if its wall time, node count, simplex iterations or peak
+    memory grew by more than <tolerance> of the baseline's. Wall times also have
+    to grow by more than <min_time> seconds so timer noise on fast solves is
+    not flagged. Solves missing from <baseline> are skipped.
+
+    :param results: measurements made by run_benchmark
+    :param baseline: earlier measurements made by run_benchmark
+    :param tolerance: relative growth allowed before flagging
+    :param min_time: seconds of wall time growth allowed before flagging
+    :return: a message for each regression found
+    """
+    assert tolerance >= 0, 'tolerance is nonnegative'
+    assert min_time >= 0, 'min_time is nonnegative'
+    base = {(r['model'], r['Node']): r for r in baseline}
+    regressions = []
+    for r in results:
+        b = base.get((r['model'], r['Node']))
+        if b is None:
+            continue
+        name = f"{r['model']} with {r['Node']}"
+        if r['status'] != b['status']:
+            regressions.append(f"{name}: status {b['status']} -> {r['status']}")
+        elif r['objective_value'] != b['objective_value'] and \
+                not isclose(r['objective_value'], b['objective_value'], abs_tol=.01):
+            regressions.append(f"{name}: objective value {b['objective_value']} -> "
+                               f"{r['objective_value']}")
+        for key in ['wall_time', 'evaluated_nodes', 'simplex_iterations', 'peak_memory']:
+            if r[key] > (1 + tolerance) * b[key] and \
+                    (key != 'wall_time' or r[key] - b[key] > min_time):
+                regressions.append(f'{name}: {key} {b[key]} -> {r[key]}')
+    return regressions
+
+
+def write_results(results: List[result_hint], path: str) -> None:
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=1)
+
+
+def read_results(path: str) -> List[result_hint]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv: List[str] = None) -> int:
+    """ Command line entry point. For example, to check the example_models set
+    against a saved baseline:
+    python -m simple_mip_solver.utils.benchmark --model-sets example_models --baseline base.json
+
+    :param argv: command line arguments, defaults to sys.argv[1:]
+    :return: exit code, 1 if any regressions were found and 0 otherwise
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the bundled model sets')
+    parser.add_argument('--model-sets', nargs='+', choices=list(model_sets),
+                        default=list(model_sets), help='model sets to solve')
+    parser.add_argument('--nodes', nargs='+', choices=list(node_classes),
+                        default=list(node_classes), help='Node classes to solve with')
+    parser.add_argument('--max-run-time', type=float, default=60,
+                        help='seconds each solve may run')
+    parser.add_argument('--output', default='benchmark.json',
+                        help='file to write the results to')
+    parser.add_argument('--baseline', help='results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=.25,
+                        help='relative growth allowed before flagging a regression')
+    args = parser.parse_args(argv)
+
+    files = [file for model_set in args.model_sets for file in find_models(model_set)]
+    results = run_benchmark(files, [node_classes[name] for name in args.nodes],
+                            max_run_time=args.max_run_time)
+    write_results(results, args.output)
+    print(f'{len(results)} solves written to {args.output}')
+    if not args.baseline:
+        return 0
+    regressions = compare(results, read_results(args.baseline), tolerance=args.tolerance)
+    for regression in regressions:
+        print(regression)
+    print(f'{len(regressions)} regressions against {args.baseline}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
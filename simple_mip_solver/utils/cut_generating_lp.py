@@ -1,6 +1,6 @@
 from cylp.cy.CyClpSimplex import CyClpSimplex, CyLPArray
 import numpy as np
-from scipy.sparse import csc_matrix
+import scipy.sparse as sp
 from typing import Tuple, TypeVar, Iterable, Union
 
 from simple_mip_solver import BranchAndBound
@@ -10,7 +10,7 @@ CGLP = TypeVar('CGLP', bound='CutGeneratingLP')
 
 class CutGeneratingLP:
 
-    def __init__(self: CGLP, bb: BranchAndBound, root_id: int, A: np.matrix = None,
+    def __init__(self: CGLP, bb: BranchAndBound, root_id: int, A: Union[np.matrix, sp.spmatrix] = None,
                  b: CyLPArray = None, var_lb: CyLPArray = None, var_ub: CyLPArray = None,
                  depth: int = None):
         """ Creates an object that can generate a strong cut valid for the
@@ -49,7 +49,7 @@ class CutGeneratingLP:
 
     # test by making sure we get the coef matrix, bounds, and objective we would expect for the given inputs
     # for passing nothing, coef matrix, and bounds
-    def _create_cglp(self, A: np.matrix = None, b: CyLPArray = None,
+    def _create_cglp(self, A: Union[np.matrix, sp.spmatrix] = None, b: CyLPArray = None,
                      var_lb: CyLPArray = None, var_ub: CyLPArray = None) -> CyClpSimplex:
         """ Create the cut generating LP, optionally overriding the constraints
         or variable bounds of the disjunctive terms' LP relaxations.
@@ -92,8 +92,8 @@ class CutGeneratingLP:
         assert (A is None and b is None) or (A is not None and b is not None), \
             "A and b must both have values or must both be None"
         if A is not None:
-            assert isinstance(A, np.matrix) or isinstance(A, csc_matrix), \
-                "A must be a numpy or sparse csc matrix"
+            assert isinstance(A, np.matrix) or sp.issparse(A), \
+                "A must be a numpy or scipy sparse matrix"
             assert A.shape[1] == num_vars, \
                 "A must have same number of columns as each disjunctive term has variables"
         if b is not None:
@@ -159,11 +159,13 @@ class CutGeneratingLP:
             lp += 0 <= w[idx] <= wb[idx]
             lp += 0 <= v[idx] <= vb[idx]
 
-        # add constraints
+        # add constraints, with the identity blocks sparse so each term adds
+        # num_vars nonzeros for them rather than num_vars^2
+        identity = sp.identity(num_vars, format='csc')
         for i, constr in constrs.items():
             # (pi, pi0) must be valid for each disjunctive term's LP relaxation
-            lp.addConstraint(0 >= -pi + constr['A'].T * u[i] + np.matrix(np.eye(num_vars)) * w[i] -
-                             np.matrix(np.eye(num_vars)) * v[i], name=f'Au_{i} + Iw_{i} - Iv{i} <= pi')
+            lp.addConstraint(0 >= -pi + constr['A'].T * u[i] + identity * w[i] - identity * v[i],
+                             name=f'Au_{i} + Iw_{i} - Iv{i} <= pi')
             lp.addConstraint(0 <= -pi0 + constr['b'] * u[i] + lb[i] * w[i] - ub[i] * v[i],
                              name=f'bu_{i} + lbw_{i} - ubv{i} >= pi0')
         # normalize variables so they don't grow arbitrarily
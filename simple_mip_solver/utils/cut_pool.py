@@ -0,0 +1,54 @@
+from cylp.py.modeling.CyLPModel import CyLPArray
+from typing import Dict, Tuple, TypeVar
+
+CP = TypeVar('CP', bound='CutPool')
+
+
+class CutPool:
+    """ Append only pool of cuts valid for every node in a branch and bound tree.
+    Its version counts the cuts added so far, so a node that remembers the
+    version it last pulled from only needs the cuts added since.
+    """
+
+    def __init__(self: CP):
+        self._cuts = []  # (name, (pi, pi0)) pairs in the order they were added
+        self._offset = 0  # cuts dropped from the front by trimmed()
+
+    @property
+    def version(self: CP) -> int:
+        return self._offset + len(self._cuts)
+
+    def add(self: CP, cuts: Dict[str, Tuple[CyLPArray, float]]) -> None:
+        """ Share <cuts> with every node that pulls from this pool later
+
+        :param cuts: dictionary of (pi, pi0) pairs keyed by cut name
+        :return:
+        """
+        assert isinstance(cuts, dict), 'cuts must be a dictionary'
+        self._cuts.extend(cuts.items())
+
+    def cuts_since(self: CP, version: int) -> Dict[str, Tuple[CyLPArray, float]]:
+        """ Get the cuts added to the pool after it was at version <version>
+
+        :param version: the version of the pool last pulled from
+        :return: dictionary of (pi, pi0) pairs keyed by cut name
+        """
+        assert isinstance(version, int) and 0 <= version <= self.version, \
+            'version must be an integer no greater than the current version'
+        assert version >= self._offset, 'cuts before this version were trimmed'
+        return dict(self._cuts[version - self._offset:])
+
+    def trimmed(self: CP, version: int) -> CP:
+        """ Get a copy of this pool without the cuts added before version
+        <version>, e.g. those every open node has already pulled. Versions
+        stay the same, so nodes can keep pulling from the copy.
+
+        :param version: the earliest version still to be pulled from
+        :return: the trimmed copy
+        """
+        assert isinstance(version, int) and self._offset <= version <= self.version, \
+            'version must be an integer between the trimmed and current versions'
+        pool = CutPool()
+        pool._cuts = self._cuts[version - self._offset:]
+        pool._offset = version
+        return pool
@@ -0,0 +1,134 @@
+import numpy as np
+from typing import Dict, TypeVar, Union, Iterable
+
+DF = TypeVar('DF', bound='DualFunction')
+
+
+class DualFunction:
+    """ The dual function of a solved branch and bound tree (BB.D from ISE 418
+    Lecture 8 Slide 29), a lower bound on the value function of the MILP at any
+    right hand side b of Ax >= b. Each node n in the lineage of a leaf bounds
+    its subtree below by the affine function y_n^T b + r_n, where y_n are its
+    constraint duals and r_n is what its variable bound duals contribute. A leaf
+    takes the max of these over its lineage and the tree takes the min over its
+    leaves.
+
+    Holds only those arrays, so it can be saved and loaded without any LP's.
+    Evaluating at many right hand sides at once costs two matrix products and
+    one elementwise max per level of the tree, with each ancestor's affine
+    function computed once no matter how many leaves share it.
+    """
+
+    def __init__(self: DF, constraint_duals: np.ndarray, bound_terms: np.ndarray,
+                 parents: np.ndarray, leaves: np.ndarray, negate_rhs: bool = False,
+                 node_ids: np.ndarray = None):
+        """
+        :param constraint_duals: row n holds y_n for node n
+        :param bound_terms: entry n holds r_n for node n
+        :param parents: entry n is the row of node n's parent, -1 for the root.
+        Parents must come before their children.
+        :param leaves: boolean mask of which rows are leaves of the tree
+        :param negate_rhs: whether to negate right hand sides before evaluating,
+        e.g. because the constraints were flipped to Ax >= b at instantiation
+        :param node_ids: entry n is the id of node n in the tree. Defaults to its row
+        """
+        constraint_duals = np.asarray(constraint_duals, dtype=float)
+        bound_terms = np.asarray(bound_terms, dtype=float)
+        parents = np.asarray(parents, dtype=int)
+        leaves = np.asarray(leaves, dtype=bool)
+        assert constraint_duals.ndim == 2, 'constraint_duals is a 2-D array'
+        num_nodes = constraint_duals.shape[0]
+        assert bound_terms.shape == parents.shape == leaves.shape == (num_nodes,), \
+            'bound_terms, parents, and leaves need an entry for each row of constraint_duals'
+        assert all(-1 <= p < n for n, p in enumerate(parents)), \
+            'parents must come before their children'
+        assert leaves.any(), 'there must be at least one leaf'
+        assert isinstance(negate_rhs, bool), 'negate_rhs is boolean'
+        node_ids = np.arange(num_nodes) if node_ids is None else np.asarray(node_ids, dtype=int)
+        assert node_ids.shape == (num_nodes,), \
+            'node_ids needs an entry for each row of constraint_duals'
+
+        self.constraint_duals = constraint_duals
+        self.bound_terms = bound_terms
+        self.parents = parents
+        self.leaves = leaves
+        self.negate_rhs = negate_rhs
+        self.node_ids = node_ids
+        # rows grouped by depth so each level only needs its parents' values
+        depth = np.zeros(num_nodes, dtype=int)
+        for n, p in enumerate(parents):
+            depth[n] = depth[p] + 1 if p >= 0 else 0
+        self._levels = [np.where(depth == d)[0] for d in range(1, depth.max(initial=0) + 1)]
+
+    @property
+    def num_constraints(self: DF) -> int:
+        return self.constraint_duals.shape[1]
+
+    def __call__(self: DF, b: Union[np.ndarray, Iterable], chunk_size: int = 10000) -> \
+            Union[float, np.ndarray]:
+        """ Evaluate the dual function at one or many right hand sides
+
+        :param b: a right hand side, or a 2-D array with one in each row
+        :param chunk_size: number of right hand sides to evaluate at a time, which
+        caps memory use at about 8 * chunk_size * (number of nodes) bytes
+        :return: the dual bound at <b>, or an array of them for each row of <b>
+        """
+        b = np.asarray(b, dtype=float)
+        single = b.ndim == 1
+        b = np.atleast_2d(b)
+        assert b.ndim == 2 and b.shape[1] == self.num_constraints, \
+            'the shape of the RHS being added should match that of each node'
+        assert isinstance(chunk_size, int) and chunk_size > 0, 'chunk_size is positive integer'
+        if self.negate_rhs:
+            b = -b
+        bounds = np.concatenate([self._evaluate(b[start:start + chunk_size])
+                                 for start in range(0, b.shape[0], chunk_size)])
+        return bounds[0] if single else bounds
+
+    def leaf_bounds(self: DF, b: Union[np.ndarray, Iterable]) -> Dict[int, float]:
+        """ Evaluate the bound each leaf's lineage gives on the leaf's subtree at
+        the right hand side <b>. The dual function at <b> is the smallest of these.
+
+        :param b: a right hand side
+        :return: dictionary of each leaf's bound at <b> keyed by its node id
+        """
+        b = np.asarray(b, dtype=float)
+        assert b.shape == (self.num_constraints,), \
+            'the shape of the RHS being added should match that of each node'
+        values = self._lineage_max(-b[None, :] if self.negate_rhs else b[None, :])[:, 0]
+        return {int(idx): float(bound) for idx, bound in
+                zip(self.node_ids[self.leaves], values[self.leaves])}
+
+    def _lineage_max(self: DF, b: np.ndarray) -> np.ndarray:
+        # values[n, k] is node n's affine bound at b[k], then the max over its lineage
+        values = self.constraint_duals @ b.T + self.bound_terms[:, None]
+        for level in self._levels:
+            values[level] = np.maximum(values[level], values[self.parents[level]])
+        return values
+
+    def _evaluate(self: DF, b: np.ndarray) -> np.ndarray:
+        return self._lineage_max(b)[self.leaves].min(axis=0)
+
+    def save(self: DF, path: str) -> None:
+        """ Save the arrays defining this dual function to <path> in numpy's
+        .npz format
+
+        :param path: file to save to
+        :return:
+        """
+        with open(path, 'wb') as f:
+            np.savez(f, constraint_duals=self.constraint_duals, bound_terms=self.bound_terms,
+                     parents=self.parents, leaves=self.leaves, negate_rhs=self.negate_rhs,
+                     node_ids=self.node_ids)
+
+    @classmethod
+    def load(cls, path: str) -> DF:
+        """ Load a dual function saved by save
+
+        :param path: file the dual function was saved to
+        :return: the loaded dual function
+        """
+        with np.load(path) as data:
+            return cls(data['constraint_duals'], data['bound_terms'], data['parents'],
+                       data['leaves'], negate_rhs=bool(data['negate_rhs']),
+                       node_ids=data['node_ids'])
@@ -1,11 +1,14 @@
 from cylp.cy.CyClpSimplex import CyLPArray
 from math import floor, ceil
 import numpy as np
-from typing import Tuple, Union
+from typing import Tuple, Union, Dict
 import warnings
 
 from simple_mip_solver.utils.tolerance import good_coefficient_approximation_epsilon, \
-    exact_coefficient_approximation_epsilon, max_term
+    exact_coefficient_approximation_epsilon, max_term, fraction_memo_size
+
+# fractions get_fractions() found, keyed by (x, max_term, estimate)
+_fraction_memo: Dict[Tuple[float, float, Union[str, None]], Tuple[float, float]] = {}
 
 
 def scale_cut(pi: np.ndarray, pi0: float, max_abs: float = 1, **kwargs) -> \
@@ -70,37 +73,169 @@ def numerically_safe_cut(pi: CyLPArray, pi0: float, estimate: str = 'over',
     :return: (safe_pi, safe_pi0), a close, outer-approximation of (pi, pi0) with
     integer coefficients
     """
-    estimates = ['over', 'under']
     assert isinstance(pi, CyLPArray), 'pi is a CyLPArray'
     assert isinstance(pi0, float) or isinstance(pi0, int), 'pi0 is a number'
-    assert estimate in estimates, 'estimate must be over or under to ensure safety'
-
-    nums, dens = [], []
-
-    pi_scaled, pi0_scaled = scale_cut(pi, pi0, **kwargs)
-    if pi_scaled is None:
-        return pi, pi0  # if pi == 0 then its already integer so just return
-
-    for coef in pi_scaled:
-        n, d = get_fraction(coef, estimate=estimate, **kwargs)
-        # if the fraction is not a good approximation, see if the exact is really close
-        if coef != 0 and abs(1 - ((n/d) / coef)) > good_coefficient_approximation_epsilon:
-            n_prime, d_prime = get_fraction(coef, estimate=None, **kwargs)
-            # I think this is small enough to avoid floating point error but I could be wrong...
-            if abs(n_prime / d_prime - coef) < exact_coefficient_approximation_epsilon:
-                n, d = n_prime, d_prime
-        nums.append(n)
-        dens.append(d)
-    lcm = np.lcm.reduce(dens)
+    assert estimate in ['over', 'under'], 'estimate must be over or under to ensure safety'
+
+    safe_pis, safe_pi0s = numerically_safe_cuts(pis=np.array([pi]), pi0s=np.array([pi0]),
+                                                estimate=estimate, make_integer=make_integer,
+                                                **kwargs)
+    return CyLPArray(safe_pis[0]), float(safe_pi0s[0])
+
+
+def numerically_safe_cuts(pis: np.ndarray, pi0s: np.ndarray, estimate: str = 'over',
+                          make_integer: bool = False, max_abs: float = 1, **kwargs) -> \
+        Tuple[np.ndarray, np.ndarray]:
+    """ Array version of numerically_safe_cut(), which approximates every cut
+    (pis[i], pi0s[i]) at once with the same guarantees. All coefficients go
+    through get_fractions() together.
+
+    :param pis: matrix with the coefficients of a cut in each row
+    :param pi0s: bound of each cut
+    :param estimate: 'over' generates outer approximations for pi^T x >= pi0.
+    'under' generates outer approximations for pi^T x <= pi0
+    :param make_integer: True multiplies each cut's coefficients and bound by the
+    least common multiple of its coefficient denominators so the coefficients are integer
+    :param max_abs: largest absolute value of coefficients in each cut before
+    they are approximated
+    :param kwargs: placeholder for extra arguments passed along to subroutines
+    :return: (safe_pis, safe_pi0s), close, outer-approximations of each cut
+    """
+    assert isinstance(pis, np.ndarray) and pis.ndim == 2, 'pis is a 2D array'
+    assert isinstance(pi0s, np.ndarray) and pi0s.shape == (len(pis),), \
+        'pi0s has a bound for each cut'
+    assert estimate in ['over', 'under'], 'estimate must be over or under to ensure safety'
+    assert isinstance(max_abs, (int, float)) and max_abs > 0, 'max_abs should be positive'
+
+    safe_pis, safe_pi0s = pis.astype(float), pi0s.astype(float)
+    # if pi == 0 then its already integer so leave it be
+    rows = np.where(np.abs(pis).max(axis=1, initial=0) > 0)[0]
+    if not len(rows):
+        return safe_pis, safe_pi0s
+
+    # scale the largest element of each cut to have max absolute value max_abs
+    scale = max_abs / np.abs(pis[rows]).max(axis=1)
+    pi_scaled = pis[rows] * scale[:, np.newaxis]
+    pi0_scaled = pi0s[rows] * scale
+
+    nums, dens = get_fractions(pi_scaled, estimate=estimate, **kwargs)
+    # if the fraction is not a good approximation, see if the exact is really close
+    with np.errstate(divide='ignore', invalid='ignore'):
+        poor = (pi_scaled != 0) & \
+            (np.abs(1 - (nums / dens) / pi_scaled) > good_coefficient_approximation_epsilon)
+    if poor.any():
+        exact_nums, exact_dens = nums.copy(), dens.copy()
+        exact_nums[poor], exact_dens[poor] = get_fractions(pi_scaled[poor], **kwargs)
+        # I think this is small enough to avoid floating point error but I could be wrong...
+        close = poor & (np.abs(exact_nums / exact_dens - pi_scaled) <
+                        exact_coefficient_approximation_epsilon)
+        nums[close], dens[close] = exact_nums[close], exact_dens[close]
+    nums, dens = nums.astype(np.int64), dens.astype(np.int64)
+    lcm = np.lcm.reduce(dens, axis=1)
     # floating point error from doing this can make a tight approximation invalid
     # but I'm betting the floating point error is small enough CLP will tolerate it
-    safe_pi = CyLPArray((lcm if make_integer else 1)*np.array(nums)/np.array(dens))
+    safe_pis[rows] = (lcm[:, np.newaxis] if make_integer else 1) * nums / dens
     # opposite estimate for other side of constraint
-    n, d = get_fraction(x=pi0_scaled*lcm if make_integer else pi0_scaled,
-                        estimate='under' if estimate == 'over' else 'over')
-    safe_pi0 = n/d
+    n, d = get_fractions(pi0_scaled * lcm if make_integer else pi0_scaled,
+                         estimate='under' if estimate == 'over' else 'over')
+    safe_pi0s[rows] = n / d
+
+    return safe_pis, safe_pi0s
+
+
+def get_fractions(x: np.ndarray, max_term: int = max_term, estimate: str = None,
+                  **kwargs) -> Tuple[np.ndarray, np.ndarray]:
+    """ Array version of get_fraction(), finding the nearest fraction to each
+    entry of x. The continued fraction recursion runs on all entries at once,
+    dropping each as it finishes, and values seen before are looked up from the
+    last fraction_memo_size found. Fractions are exactly those of get_fraction().
+
+    :param x: the numbers to estimate as fractions
+    :param max_term: the largest numerator or denominator allowed
+    :param estimate: 'over' ensures the returned fractions >= x, 'under' ensures
+    the returned fractions <= x
+    :return: a tuple of arrays shaped like x of the numerators and the (positive)
+    denominators, as floats
+    """
+    assert isinstance(x, np.ndarray), 'x should be a numpy array'
+    assert isinstance(max_term, (int, float)) and max_term > 0, 'max_term should be positive'
+    if estimate is not None:
+        assert estimate in ['over', 'under'], "estimate should be 'over' or 'under' when provided"
+
+    values, inverse = np.unique(x.astype(float), return_inverse=True)
+    keys = [(value, max_term, estimate) for value in values.tolist()]
+    found = [_fraction_memo.get(key) for key in keys]
+    new = np.array([fraction is None for fraction in found], dtype=bool)
+    fractions = np.array([fraction or (0, 1) for fraction in found], dtype=float).reshape(-1, 2)
+    if new.any():
+        if max_term > 2 ** 53:
+            # floats can't hold every term exactly, so leave it to python's integers
+            fractions[new] = [get_fraction(value, max_term=max_term, estimate=estimate)
+                              for value in values[new].tolist()]
+        else:
+            fractions[new] = np.stack(_continued_fractions(values[new], max_term, estimate),
+                                      axis=1)
+        if len(_fraction_memo) + new.sum() > fraction_memo_size:
+            _fraction_memo.clear()
+        if new.sum() <= fraction_memo_size:
+            _fraction_memo.update(zip([key for key, is_new in zip(keys, new) if is_new],
+                                      map(tuple, fractions[new].tolist())))
+    fractions = fractions[inverse.reshape(-1)]
+    return fractions[:, 0].reshape(x.shape), fractions[:, 1].reshape(x.shape)
+
 
-    return safe_pi, safe_pi0
+def _continued_fractions(x: np.ndarray, max_term: Union[int, float],
+                         estimate: Union[str, None]) -> Tuple[np.ndarray, np.ndarray]:
+    """ The recursion of get_fraction() run on each entry of the 1D array x at
+    once. Since every entry starts together, all still running are on the same
+    iteration, which decides which convergent those exceeding max_term take.
+
+    :param x: the numbers to estimate as fractions
+    :param max_term: the largest numerator or denominator allowed
+    :param estimate: 'over', 'under' or None as in get_fraction()
+    :return: arrays of the numerators and denominators
+    """
+    nums, dens = np.zeros(len(x)), np.ones(len(x))
+
+    # Just round if we're large
+    large = np.abs(x) > max_term
+    nums[large] = np.ceil(x[large]) if estimate == 'over' else np.floor(x[large]) if \
+        estimate == 'under' else np.round(x[large])
+
+    # the entries still running with their last two convergents n1/d1 and n2/d2
+    running = np.where(~large)[0]
+    n2, d2 = np.zeros(len(running)), np.ones(len(running))
+    n1, d1 = np.ones(len(running)), np.zeros(len(running))
+    real_number = x[running]
+    i = -1
+    with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+        while len(running):
+            i += 1
+            integer_part = np.floor(real_number)  # a_i in the wiki article
+            n = integer_part * n1 + n2
+            d = integer_part * d1 + d2
+            # stop if we exceed bound - even if this would be an exact solution
+            exceeded = (n > max_term) | (d > max_term)
+            fractional_part = real_number - integer_part
+            # if we found an exact match, take the latest iterate
+            exact = ~exceeded & (fractional_part == 0)
+            nums[running[exact]], dens[running[exact]] = n[exact], d[exact]
+            # else, the last iterate exceeded max_term, so take a previous one if available
+            # odd iterations are overestimates and even number iterations are underestimates
+            if estimate == 'over' and not (i - 1) % 2 and i - 2 < 0:
+                # ceil(x) when x is juuussttt over a whole number - not close, but warned
+                nums[running[exceeded]] = np.ceil(x[running[exceeded]])
+                dens[running[exceeded]] = 1
+            elif (estimate == 'over' and not (i - 1) % 2) or \
+                    (estimate == 'under' and (i - 1) % 2):
+                nums[running[exceeded]], dens[running[exceeded]] = n2[exceeded], d2[exceeded]
+            else:
+                nums[running[exceeded]], dens[running[exceeded]] = n1[exceeded], d1[exceeded]
+            # set up for next iteration
+            going = ~(exceeded | exact)
+            running, real_number = running[going], 1 / fractional_part[going]
+            n2, d2, n1, d1 = n1[going], d1[going], n[going], d[going]
+    return nums, dens
 
 
 def get_fraction(x: float, max_term: int = max_term, estimate: str = None, **kwargs) -> Tuple[int, int]:
@@ -0,0 +1,216 @@
+from coinor.cuppy.milpInstance import MILPInstance
+from cylp.cy.CyClpSimplex import CyClpSimplex
+from contextlib import contextmanager
+from cylp.py.modeling.CyLPModel import CyLPArray
+import numpy as np
+import scipy.sparse as sp
+from typing import Any, Dict, Iterator, List, Tuple, Union
+
+lp_data_hint = Dict[str, Any]
+
+# constraint coefficients this process shares with others, by key. lp data
+# compacted while a matrix is shared refers to it by its key instead of holding it
+_shared_coefs = {}
+
+
+def get_lp_data(lp: CyClpSimplex) -> lp_data_hint:
+    """ Collect what is needed to rebuild <lp> into a dictionary of arrays. Unlike
+    CyClpSimplex instances, this dictionary can be pickled (e.g. to be sent to
+    another process). Assumes x is the only variable in <lp>, as BaseNode does.
+
+    Constraint coefficients are referenced rather than copied since CyLP does not
+    change them in place, and build_lp() keeps the ones it is given, so the LP's
+    rebuilt from one another all share their parent's. Pickling still copies
+    them, so use compact_lp_data() to send lp data to processes that hold them.
+
+    :param lp: the LP to collect
+    :return: dictionary of the LP's variable bounds, constraints, objective
+    (with offset), basis, and solve status
+    """
+    assert isinstance(lp, CyClpSimplex), 'lp must be CyClpSimplex instance'
+    assert len(lp.variables) == 1 and lp.variables[0].name == 'x' and \
+        lp.nVariables == lp.variables[0].dim, 'x must be our only variable'
+    # take row bounds from CLP since constraint objects keep them as they were given
+    constraints, start = [], 0
+    for constr in lp.constraints:
+        end = start + constr.nRows
+        constraints.append((constr.name, constr.varCoefs[constr.variables[0]],
+                            lp.constraintsLower[start:end].copy(),
+                            lp.constraintsUpper[start:end].copy()))
+        start = end
+    return {
+        'variables_lower': lp.variablesLower.copy(),
+        'variables_upper': lp.variablesUpper.copy(),
+        'constraints': constraints,
+        'objective': lp.objective.copy(),
+        'objective_offset': lp.objectiveOffset,
+        'basis': lp.getBasisStatus(),
+        'status': lp.getStatusCode(),
+        'max_num_iteration': lp.maxNumIteration,
+        'infinity': lp.getCoinInfinity()
+    }
+
+
+def build_lp(lp_data: lp_data_hint, variables_lower: np.ndarray = None,
+             variables_upper: np.ndarray = None, basis: Tuple[np.ndarray, np.ndarray] = None,
+             resolve: bool = True) -> CyClpSimplex:
+    """ Create a CyClpSimplex instance from the dictionary returned by get_lp_data(),
+    warm started from the saved basis.
+
+    :param lp_data: dictionary created by get_lp_data(), optionally with a
+    'bound_change' (see variable_bounds)
+    :param variables_lower: lower bounds to use in place of the saved ones
+    :param variables_upper: upper bounds to use in place of the saved ones
+    :param basis: starting basis to use in place of the saved one
+    :param resolve: if the saved LP had been solved, solve the new one too so
+    that its solution attributes match the original's. Since it starts from the
+    saved basis, this usually takes no simplex iterations.
+    :return: the rebuilt LP
+    """
+    lp = CyClpSimplex()
+    lp.logLevel = 0  # quiet output when resolving
+    x = lp.addVariable('x', len(lp_data['variables_lower']))
+    saved_lower, saved_upper = variable_bounds(lp_data)
+    l = CyLPArray(saved_lower if variables_lower is None else variables_lower)
+    u = CyLPArray(saved_upper if variables_upper is None else variables_upper)
+    lp += l <= x <= u
+    for name, coefs, lower, upper in lp_data['constraints']:
+        lp.addConstraint(CyLPArray(lower.copy()) <= coefs * x <= CyLPArray(upper.copy()),
+                         name=name)
+        # CLP has its own copy now, so keep ours rather than CyLP's for sharing
+        lp.constraints[-1].varCoefs[x] = coefs
+    lp.objective = lp_data['objective'].copy()
+    lp.objectiveOffset = lp_data['objective_offset']
+    lp.setBasisStatus(*(lp_data['basis'] if basis is None else basis))  # warm start
+    if resolve and lp_data['status'] != -1:
+        lp.maxNumIteration = lp_data['max_num_iteration']
+        lp.dual()
+    return lp
+
+
+def variable_bounds(lp_data: lp_data_hint) -> Tuple[np.ndarray, np.ndarray]:
+    """ The variable bounds of the LP <lp_data> describes. Its 'bound_change',
+    if it has one, is an (index, lower, upper) tuple to apply to the saved bounds,
+    so that LP's differing in one bound (e.g. the children of a branch) can share
+    the rest of their lp data.
+
+    :param lp_data: dictionary created by get_lp_data()
+    :return: the variable lower and upper bounds, copies if changed and the
+    saved arrays otherwise
+    """
+    lower, upper = lp_data['variables_lower'], lp_data['variables_upper']
+    if lp_data.get('bound_change') is None:
+        return lower, upper
+    idx, idx_lower, idx_upper = lp_data['bound_change']
+    lower, upper = lower.copy(), upper.copy()
+    lower[idx], upper[idx] = idx_lower, idx_upper
+    return lower, upper
+
+
+def share_coefs(coefs: Dict[str, Any]) -> None:
+    """ Share the constraint coefficient matrices in <coefs> for the rest of this
+    process, e.g. as a worker pool's initializer so each worker receives them once.
+
+    :param coefs: coefficient matrices keyed by names unique across processes
+    :return:
+    """
+    _shared_coefs.update(coefs)
+
+
+@contextmanager
+def sharing_coefs(coefs: Dict[str, Any]) -> Iterator[None]:
+    """ Share the constraint coefficient matrices in <coefs> while in this
+    context. Those already shared stay so after it.
+
+    :param coefs: coefficient matrices keyed by names unique across processes
+    :return:
+    """
+    new_keys = [key for key in coefs if key not in _shared_coefs]
+    share_coefs({key: coefs[key] for key in new_keys})
+    try:
+        yield
+    finally:
+        for key in new_keys:
+            del _shared_coefs[key]
+
+
+def shared_coefs() -> Dict[str, Any]:
+    """ The constraint coefficient matrices this process shares, by key
+
+    :return: a copy of the dictionary of shared matrices
+    """
+    return dict(_shared_coefs)
+
+
+def compact_lp_data(lp_data: lp_data_hint) -> lp_data_hint:
+    """ Swap each shared coefficient matrix in <lp_data> for its key, so that
+    pickling it copies only what is particular to the LP (e.g. bounds, cuts and
+    basis). Undo with expand_lp_data() in a process sharing the same matrices.
+
+    :param lp_data: dictionary created by get_lp_data()
+    :return: <lp_data> if it has no shared matrices, a compacted copy otherwise
+    """
+    keys = {id(coefs): key for key, coefs in _shared_coefs.items()}
+    if not any(id(c[1]) in keys for c in lp_data['constraints']):
+        return lp_data
+    return {**lp_data, 'constraints': [(name, keys.get(id(coefs), coefs), lower, upper)
+                                       for name, coefs, lower, upper in lp_data['constraints']]}
+
+
+def expand_lp_data(lp_data: lp_data_hint) -> lp_data_hint:
+    """ Swap the keys compact_lp_data() left in <lp_data> for the shared
+    coefficient matrices they name
+
+    :param lp_data: dictionary created by compact_lp_data()
+    :return: <lp_data> if it has no keys, an expanded copy otherwise
+    """
+    if not any(isinstance(c[1], str) for c in lp_data['constraints']):
+        return lp_data
+    for name, coefs, _, _ in lp_data['constraints']:
+        assert not isinstance(coefs, str) or coefs in _shared_coefs, \
+            f'coefficients of constraint {name} are not shared with this process'
+    return {**lp_data, 'constraints': [
+        (name, _shared_coefs[coefs] if isinstance(coefs, str) else coefs, lower, upper)
+        for name, coefs, lower, upper in lp_data['constraints']
+    ]}
+
+
+def build_milp(A: Union[np.ndarray, sp.spmatrix], b: np.ndarray, c: np.ndarray,
+               l: np.ndarray = None, u: np.ndarray = None, integerIndices: List[int] = None,
+               sense: List[str] = None, numVars: int = None) -> MILPInstance:
+    """ Create a MILPInstance from arrays the way its constructor does, except
+    that A is used as given. MILPInstance makes A a dense np.matrix, which large
+    sparse models don't fit in memory as, while CyLP builds constraints from
+    scipy.sparse matrices directly. Takes the same key word arguments as
+    MILPInstance so either can build a model.
+
+    :param A: coefficient matrix of the constraints, dense or scipy.sparse
+    :param b: right hand side of the constraints
+    :param c: objective coefficients
+    :param l: variable lower bounds
+    :param u: variable upper bounds
+    :param integerIndices: indices of the integer variables
+    :param sense: ['Min' or 'Max', '<=' or '>='], the objective and constraint senses
+    :param numVars: number of variables, by default the number of columns of A
+    :return: the MILPInstance, whose A is <A>
+    """
+    assert sense is not None and sense[0] in ['Min', 'Max'] and sense[1] in ['<=', '>='], \
+        "sense is ['Min' or 'Max', '<=' or '>=']"
+    model = MILPInstance.__new__(MILPInstance)
+    model.A, model.b, model.c, model.l, model.u = A, b, c, l, u
+    model.points = model.rays = None
+    model.sense, model.integerIndices = sense[1], integerIndices
+
+    lp = CyClpSimplex()
+    x = lp.addVariable('x', A.shape[1] if numVars is None else numVars)
+    if l is not None:
+        lp += x >= CyLPArray(l)
+    if u is not None:
+        lp += x <= CyLPArray(u)
+    A = A if sp.issparse(A) else np.matrix(A)
+    b = CyLPArray(b)
+    lp += A * x <= b if model.sense == '<=' else A * x >= b
+    c = CyLPArray(c)
+    lp.objective = -c if sense[0] == 'Max' else c
+    model.lp, model.x = lp, x
+    return model
@@ -0,0 +1,320 @@
+from coinor.cuppy.milpInstance import MILPInstance
+from cylp.py.modeling.CyLPModel import CyLPArray
+from math import ceil, floor
+import numpy as np
+import scipy.sparse as sp
+from typing import Tuple, TypeVar, Union
+
+from simple_mip_solver.utils.lp_data import build_milp
+from simple_mip_solver.utils.tolerance import variable_epsilon, presolve_bound_tolerance
+
+P = TypeVar('P', bound='Presolve')
+
+
+class Presolve:
+    """ Reduces a MILP of the form min c^T x : Ax >= b, l <= x <= u before branch
+    and bound and maps what is found for the reduced MILP back to the original
+    (postsolve). Repeats the following until a pass changes nothing:
+
+    * Rows whose variables are all fixed are removed, and rows with a single
+      variable that isn't become a bound on it
+    * Rows that hold for every x within its bounds are removed
+    * Bounds are tightened by what the other variables of each row can contribute
+    * Rows of only integer variables are divided by the gcd of their coefficients
+      and their right hand side rounded up
+    * Rows that are positive multiples of another row on the unfixed variables
+      are removed, keeping the one with the tightest right hand side
+
+    Variables whose bounds meet are then fixed and removed, with their part of
+    the objective kept as the LP's objective offset so objective values stay
+    those of the original MILP.
+
+    Holds only arrays, so it can be pickled (e.g. in a checkpoint), and keeps A
+    as a sparse matrix, reading and scaling one row's nonzeros at a time. Bounds from
+    singleton rows and row activities only hold at the model's right hand side,
+    which rhs_dependent records. Everything else presolve does relaxes or
+    rescales rows, so dual functions of the reduced MILP still bound the
+    original one's at any right hand side once mapped back.
+    """
+
+    def __init__(self: P, model: MILPInstance, max_passes: int = 10):
+        """
+        :param model: the MILP to reduce, with constraints Ax >= b and minimizing
+        :param max_passes: most times to repeat the reductions
+        """
+        assert isinstance(model, MILPInstance), 'model must be cuppy MILPInstance'
+        assert model.sense == '>=', 'presolve expects constraints of the form Ax >= b'
+        assert isinstance(max_passes, int) and max_passes > 0, \
+            'max_passes is a positive integer'
+
+        # model.l and model.u can point to freed memory once its LP changes
+        lp = model.lp
+        self._infinity = lp.getCoinInfinity()
+        # copied since rows are rescaled in place
+        self._A = sp.csr_matrix(model.A, dtype=float, copy=True)
+        self._A.eliminate_zeros()
+        self._A.sort_indices()
+        self._b = np.array(model.b, dtype=float).flatten()
+        self._c = np.array(lp.objective, dtype=float)
+        self._l = np.where(lp.variablesLower <= -self._infinity, -np.inf, lp.variablesLower)
+        self._u = np.where(lp.variablesUpper >= self._infinity, np.inf, lp.variablesUpper)
+        self.num_rows, self.num_vars = self._A.shape
+        self._integer = np.zeros(self.num_vars, dtype=bool)
+        self._integer[model.integerIndices] = True
+        self._rows = np.ones(self.num_rows, dtype=bool)  # rows still in the model
+        self.row_scales = np.ones(self.num_rows)  # what each row was divided by
+        self.rhs_dependent = False
+        self.infeasible = False
+        self.removed_rows = 0
+        self.tightened_bounds = 0
+        self.tightened_rows = 0
+
+        for _ in range(max_passes):
+            changes = [self._remove_small_rows(), self._remove_redundant_rows(),
+                       self._tighten_bounds(), self._tighten_integer_coefficients(),
+                       self._remove_duplicate_rows()]
+            if self.infeasible or not any(changes):
+                break
+
+        # keep a row and a variable so the reduced MILP is well formed
+        self.kept_rows = np.flatnonzero(self._rows) if self._rows.any() else np.array([0])
+        fixed = self._l == self._u
+        if fixed.all():
+            fixed[0] = False
+        self.kept_vars = np.flatnonzero(~fixed)
+        self.fixed_values = np.where(fixed, self._l, 0)
+        self.objective_offset = float(self._c[fixed] @ self._l[fixed])
+        # what the fixed variables contribute to each kept row, moved to its rhs
+        self.fixed_activity = self._A[self.kept_rows] @ self.fixed_values
+        self.fixed_variables = int(fixed.sum())
+
+    def reduced_model(self: P) -> MILPInstance:
+        """ Build the reduced MILP. Its LP's objective offset is the objective
+        value of the fixed variables, so its objective values are the original's
+
+        :return: the reduced MILP, minimizing with constraints Ax >= b
+        """
+        rows, cols = self.kept_rows, self.kept_vars
+        model = build_milp(
+            A=self._A[rows][:, cols].tocsc(), b=CyLPArray(self._b[rows] - self.fixed_activity),
+            c=CyLPArray(self._c[cols]),
+            l=CyLPArray(np.maximum(self._l[cols], -self._infinity)),
+            u=CyLPArray(np.minimum(self._u[cols], self._infinity)),
+            integerIndices=[i for i, j in enumerate(cols) if self._integer[j]],
+            sense=['Min', '>='], numVars=len(cols)
+        )
+        model.lp.objectiveOffset = -self.objective_offset  # CLP subtracts it
+        return model
+
+    def postsolve(self: P, solution: Union[np.ndarray, None]) -> Union[np.ndarray, None]:
+        """ Map a solution of the reduced MILP to one of the original
+
+        :param solution: solution of the reduced MILP, or None if there is none
+        :return: the solution with the fixed variables put back in
+        """
+        if solution is None:
+            return None
+        assert len(solution) == len(self.kept_vars), 'solution must be of the reduced MILP'
+        rtn = self.fixed_values.copy()
+        rtn[self.kept_vars] = solution
+        return rtn
+
+    def postsolve_dual_function(self: P, constraint_duals: np.ndarray,
+                                bound_terms: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """ Map the affine functions y_n^T b + r_n of a dual function of the reduced
+        MILP to ones of the right hand side of the original. Removed rows get a
+        dual of 0, and rows presolve divided by g have their duals divided by g.
+        The reduced right hand side is (b / g) minus the fixed variables' activity,
+        which is at most what presolve rounded it up to, so the mapped function
+        still bounds the original MILP's value function below.
+
+        :param constraint_duals: row n holds y_n for node n of the reduced MILP
+        :param bound_terms: entry n holds r_n for node n of the reduced MILP
+        :return: the constraint duals and bound terms for the original MILP
+        """
+        constraint_duals = np.asarray(constraint_duals, dtype=float)
+        assert constraint_duals.ndim == 2 and \
+            constraint_duals.shape[1] == len(self.kept_rows), \
+            'constraint_duals needs a column for each row of the reduced MILP'
+        duals = np.zeros((constraint_duals.shape[0], self.num_rows))
+        duals[:, self.kept_rows] = constraint_duals / self.row_scales[self.kept_rows]
+        return duals, np.asarray(bound_terms, dtype=float) - \
+            constraint_duals @ self.fixed_activity
+
+    def _row(self: P, row: int) -> Tuple[np.ndarray, np.ndarray]:
+        """ The nonzeros of <row>
+
+        :param row: index of the row
+        :return: their column indices and coefficients, as views into _A
+        """
+        start, end = self._A.indptr[row], self._A.indptr[row + 1]
+        return self._A.indices[start:end], self._A.data[start:end]
+
+    def _fixed_activity(self: P, row: int) -> Tuple[np.ndarray, np.ndarray, float]:
+        """ Split <row> into its unfixed variables and the activity of its fixed ones
+
+        :param row: index of the row
+        :return: column indices and coefficients of the unfixed variables in
+        <row> and the activity of the fixed variables
+        """
+        cols, a = self._row(row)
+        fixed = self._l[cols] == self._u[cols]
+        return cols[~fixed], a[~fixed], float(a[fixed] @ self._l[cols[fixed]])
+
+    def _set_bound(self: P, idx: int, value: float, lower: bool) -> bool:
+        """ Raise the lower bound (if <lower>) or lower the upper bound of variable
+        <idx> to <value> if that is tighter by more than the tolerances allow.
+        Integer variables have <value> rounded first.
+
+        :param idx: index of the variable
+        :param value: the new bound
+        :param lower: whether <value> is a lower bound or an upper bound
+        :return: whether the bound changed
+        """
+        if self._integer[idx]:
+            value = ceil(value - variable_epsilon) if lower else floor(value + variable_epsilon)
+        current = self._l[idx] if lower else self._u[idx]
+        margin = presolve_bound_tolerance * max(1, abs(value))
+        if (lower and value <= current + margin) or (not lower and value >= current - margin):
+            return False
+        if lower:
+            self._l[idx] = value
+        else:
+            self._u[idx] = value
+        if self._l[idx] > self._u[idx] + variable_epsilon:
+            self.infeasible = True
+        elif self._l[idx] > self._u[idx]:  # crossed within tolerance, so fix it
+            self._l[idx] = self._u[idx] = value
+        self.tightened_bounds += 1
+        return True
+
+    def _drop_row(self: P, row: int) -> None:
+        self._rows[row] = False
+        self.removed_rows += 1
+
+    def _remove_small_rows(self: P) -> int:
+        """ Remove rows with no unfixed variables, and turn rows with one into a
+        bound on it. Rows with no unfixed variables that are violated are kept
+        so the LP relaxation is infeasible.
+
+        :return: how many rows were removed
+        """
+        removed = 0
+        for row in np.flatnonzero(self._rows):
+            cols, a, fixed_activity = self._fixed_activity(row)
+            if len(cols) > 1:
+                continue
+            rhs = self._b[row] - fixed_activity
+            if not len(cols):
+                if rhs > variable_epsilon:
+                    self.infeasible = True
+                    continue
+            else:
+                self._set_bound(cols[0], rhs / a[0], lower=a[0] > 0)
+                self.rhs_dependent = True
+            self._drop_row(row)
+            removed += 1
+        return removed
+
+    def _activity_terms(self: P, row: int, largest: bool) -> np.ndarray:
+        """ The largest (or smallest) value each term of <row> can take within
+        the variable bounds
+
+        :param row: index of the row
+        :param largest: whether to find the largest or smallest values
+        :return: each term's value, in the order of the row's nonzeros
+        """
+        cols, a = self._row(row)
+        l, u = self._l[cols], self._u[cols]
+        return np.where(a > 0, a * (u if largest else l), a * (l if largest else u))
+
+    def _remove_redundant_rows(self: P) -> int:
+        """ Remove rows that every x within the variable bounds satisfies
+
+        :return: how many rows were removed
+        """
+        removed = 0
+        for row in np.flatnonzero(self._rows):
+            if self._activity_terms(row, largest=False).sum() >= self._b[row]:
+                self._drop_row(row)
+                removed += 1
+        return removed
+
+    def _tighten_bounds(self: P) -> int:
+        """ For each row a^T x >= b, a variable x_j with a_j > 0 is at least
+        (b - M_j) / a_j, where M_j is the largest the row's other terms can be
+        within their bounds. Likewise variables with a_j < 0 are at most that.
+
+        :return: how many bounds were tightened
+        """
+        tightened = 0
+        for row in np.flatnonzero(self._rows):
+            cols, a = self._row(row)
+            terms = self._activity_terms(row, largest=True)
+            infinite = np.isinf(terms)
+            if infinite.sum() > 1:  # every variable has another term without limit
+                continue
+            finite_sum = terms[~infinite].sum()
+            for k, idx in enumerate(cols):
+                if self._l[idx] == self._u[idx] or (infinite.any() and not infinite[k]):
+                    continue
+                others = finite_sum - (0 if infinite[k] else terms[k])
+                tightened += self._set_bound(idx, (self._b[row] - others) / a[k],
+                                             lower=a[k] > 0)
+                if self.infeasible:
+                    return tightened
+        self.rhs_dependent |= tightened > 0
+        return tightened
+
+    def _tighten_integer_coefficients(self: P) -> int:
+        """ Divide each row whose unfixed variables are all integer with integer
+        coefficients by the gcd of those coefficients and round its right hand
+        side up, since integer solutions make its left hand side integer too.
+
+        :return: how many rows were tightened
+        """
+        tightened = 0
+        for row in np.flatnonzero(self._rows):
+            cols, coefs = self._row(row)
+            unfixed = self._l[cols] != self._u[cols]
+            a = coefs[unfixed]
+            if not len(a) or not self._integer[cols[unfixed]].all() or \
+                    np.abs(a - np.round(a)).max() > variable_epsilon:
+                continue
+            g = int(np.gcd.reduce(np.abs(np.round(a)).astype(np.int64)))
+            if not g:  # coefficients that round to 0
+                continue
+            fixed_activity = coefs[~unfixed] @ self._l[cols[~unfixed]]
+            rhs = (self._b[row] - fixed_activity) / g
+            if g == 1 and abs(rhs - round(rhs)) <= variable_epsilon:
+                continue
+            coefs[unfixed] = np.round(a)  # coefs is a view, so this scales _A
+            coefs /= g
+            self._b[row] = ceil(rhs - variable_epsilon) + fixed_activity / g
+            self.row_scales[row] *= g
+            tightened += 1
+        self._A.eliminate_zeros()  # in case any coefficients rounded to 0
+        self.tightened_rows += tightened
+        return tightened
+
+    def _remove_duplicate_rows(self: P) -> int:
+        """ Remove rows that are a positive multiple of another on the unfixed
+        variables, keeping whichever has the tightest right hand side
+
+        :return: how many rows were removed
+        """
+        groups = {}
+        for row in np.flatnonzero(self._rows):
+            cols, a, fixed_activity = self._fixed_activity(row)
+            scale = np.abs(a).max() if len(a) else 0
+            if not scale:
+                continue
+            rhs = (self._b[row] - fixed_activity) / scale
+            key = (tuple(cols), tuple(np.round(a / scale, 9)))
+            groups.setdefault(key, []).append((rhs, row))
+        removed = 0
+        for rows in groups.values():
+            for _, row in sorted(rows)[:-1]:
+                self._drop_row(row)
+                removed += 1
+        return removed
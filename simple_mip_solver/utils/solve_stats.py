@@ -0,0 +1,127 @@
+from contextlib import contextmanager
+from functools import wraps
+import time
+from typing import Any, Callable, Dict, Iterator, TypeVar, Union
+
+SS = TypeVar('SS', bound='SolveStats')
+phase_stats_hint = Dict[str, Union[int, float]]
+
+
+class SolveStats:
+    """ Counts how many times each instrumented phase of a solve ran, how much
+    processor time it took, and how many simplex iterations its LP solves took.
+    Phases are named after what they time, e.g. '_bound_lp' for BaseNode._bound_lp
+    or 'CutGeneratingLP.solve'. Each node keeps its own instance and BranchAndBound
+    adds them into its own once the node is evaluated, so the totals are
+    cumulative and the per node breakdown is kept in <nodes>.
+
+    Times are inclusive, so a phase that calls another (e.g. _strong_branch
+    calling _base_branch) also counts the time of the one it called. Recording
+    costs two clock reads per call. BranchAndBound also records how its gap
+    changes over the solve in <gap_history>.
+    """
+
+    def __init__(self: SS):
+        self.phases = {}  # phase name -> {'calls', 'time', 'simplex_iterations'}
+        self.nodes = {}  # node id -> that node's phases
+        self.gap_history = []  # (solve time, evaluated nodes, gap) each time the gap changes
+        self._active = set()  # phases being timed, so nested calls aren't counted twice
+
+    def _phase(self: SS, phase: str) -> phase_stats_hint:
+        if phase not in self.phases:
+            self.phases[phase] = {'calls': 0, 'time': 0., 'simplex_iterations': 0}
+        return self.phases[phase]
+
+    @contextmanager
+    def record(self: SS, phase: str) -> Iterator[None]:
+        """ Count one call of <phase> and add the processor time spent in the
+        with block to it. If <phase> is already being recorded (e.g. a subclass
+        method calling super's), only the outer call counts.
+
+        :param phase: name of the phase being timed
+        :return:
+        """
+        if phase in self._active:
+            yield
+            return
+        self._active.add(phase)
+        start = time.process_time()
+        try:
+            yield
+        finally:
+            stats = self._phase(phase)
+            stats['time'] += time.process_time() - start
+            stats['calls'] += 1
+            self._active.discard(phase)
+
+    def add_simplex_iterations(self: SS, phase: str, iterations: int) -> None:
+        """ Credit <iterations> simplex iterations to <phase>
+
+        :param phase: name of the phase that ran the iterations
+        :param iterations: number of simplex iterations run
+        :return:
+        """
+        assert isinstance(iterations, int) and iterations >= 0, \
+            'iterations is a nonnegative integer'
+        self._phase(phase)['simplex_iterations'] += iterations
+
+    def add_node_stats(self: SS, node_id: int, stats: SS) -> None:
+        """ Add the phases recorded by the node with id <node_id> to the totals
+        and keep them as that node's breakdown
+
+        :param node_id: id of the node <stats> belongs to
+        :param stats: the node's SolveStats instance
+        :return:
+        """
+        assert isinstance(stats, SolveStats), 'stats must be a SolveStats instance'
+        for phase, node_stats in stats.phases.items():
+            total = self._phase(phase)
+            for key, value in node_stats.items():
+                total[key] += value
+        self.nodes[node_id] = stats.phases
+
+    def add_gap(self: SS, solve_time: float, evaluated_nodes: int,
+                gap: Union[float, None]) -> None:
+        """ Add a point to the gap history if the gap changed since the last one
+
+        :param solve_time: time the solve has run for, as BranchAndBound measures it
+        :param evaluated_nodes: number of nodes evaluated so far
+        :param gap: the solve's current gap, None if there is no incumbent
+        :return:
+        """
+        if not self.gap_history or self.gap_history[-1][2] != gap:
+            self.gap_history.append((solve_time, evaluated_nodes, gap))
+
+    def totals(self: SS) -> SS:
+        """ Get a copy holding only the totals of each phase and the latest gap,
+        which doesn't grow with the number of nodes evaluated like <nodes> and
+        <gap_history> do
+
+        :return: the copy
+        """
+        stats = SolveStats()
+        stats.phases = {phase: dict(phase_stats) for phase, phase_stats in self.phases.items()}
+        stats.gap_history = self.gap_history[-1:]
+        return stats
+
+    @property
+    def simplex_iterations(self: SS) -> int:
+        return sum(stats['simplex_iterations'] for stats in self.phases.values())
+
+
+def timed(phase: str = None) -> Callable:
+    """ Decorate a method of a class with a SolveStats instance in its stats
+    attribute so every call is recorded under <phase>
+
+    :param phase: name to record calls under. Defaults to the method's name
+    :return: the decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        name = phase or func.__name__
+
+        @wraps(func)
+        def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            with self.stats.record(name):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
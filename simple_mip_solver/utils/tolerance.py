@@ -41,3 +41,10 @@ min_cglp_norm = 1e-4
 # make this big while forcing integer coefs will make you sad :,(
 # set to 1e16 when running tightly
 max_term = 1e3
+
+# most fractions get_fractions() remembers before forgetting them all and starting over
+fraction_memo_size = 100000
+
+# smallest relative change to a variable bound presolve makes, so tightening
+# continuous bounds by row activities can't creep along forever
+presolve_bound_tolerance = 1e-6
@@ -2,11 +2,15 @@ from coinor.cuppy.milpInstance import MILPInstance
 from cylp.cy import CyClpSimplex
 import inspect
 import numpy as np
+import os
+import pickle
+import scipy.sparse as sp
 import unittest
 from unittest.mock import patch
 
 from simple_mip_solver import BaseNode
 from simple_mip_solver.algorithms.base_algorithm import BaseAlgorithm
+from test_simple_mip_solver import example_models
 from test_simple_mip_solver.example_models import small_branch, h3p1, small_branch_max
 
 
@@ -33,6 +37,17 @@ class TestBaseAlgorithm(unittest.TestCase):
         self.assertFalse(alg.evaluated_nodes)
         self.assertTrue(alg._kwargs == {'next_node_idx': 1})
         self.assertTrue(alg._M == 999999999)
+        self.assertFalse(alg._presolve)
+
+        # presolve reduces the model the root is built from
+        alg = BaseAlgorithm(small_branch_max, BaseNode, self._node_attributes,
+                            self._node_funcs, presolve=True)
+        self.assertTrue(alg._presolve.rhs_dependent)
+        self.assertTrue(all(alg._presolve.kept_rows == [0]))
+        self.assertTrue((alg.root_node.lp.coefMatrix == np.matrix([[-1, 0, -1]])).all())
+        self.assertTrue(all(alg.root_node.lp.constraintsLower == np.array([-1])),
+                        'x1 + x3 <= 1.5 rounds down for integer x')
+        self.assertTrue(all(alg.root_node.lp.variablesUpper == np.array([1, 1, 1])))
 
         # check function calls
         with patch.object(BaseAlgorithm, '_convert_constraints_to_greq') as cctg:
@@ -90,6 +105,11 @@ class TestBaseAlgorithm(unittest.TestCase):
                                BaseAlgorithm, small_branch, BaseNode, self._node_attributes,
                                self._node_funcs, next_node_idx=1)
 
+        # presolve assert
+        self.assertRaisesRegex(AssertionError, 'presolve is boolean',
+                               BaseAlgorithm, small_branch, BaseNode, self._node_attributes,
+                               self._node_funcs, presolve=1)
+
     def test_convert_constraints_to_greq(self):
         # check one that needs changed
         m = BaseAlgorithm._convert_constraints_to_greq(small_branch_max)
@@ -103,6 +123,17 @@ class TestBaseAlgorithm(unittest.TestCase):
         self.assertTrue((m2.A == m.A).all())
         self.assertTrue((m2.b == m.b).all())
 
+        # sparse A's, e.g. of models read from MPS files, stay sparse
+        model = MILPInstance(file_name=os.path.join(
+            os.path.dirname(os.path.abspath(inspect.getfile(example_models))),
+            'example_models', 'constraints_high_variables_high_density_high_max_obj_coeff_high_'
+            'max_cons_coeff_high_tightness_high.mps'))
+        m = BaseAlgorithm._convert_constraints_to_greq(model)
+        self.assertTrue(m.sense == '>=')
+        self.assertTrue(sp.issparse(m.A) and sp.issparse(model.A), "model's A is left alone")
+        self.assertTrue((-m.A != model.A).nnz == 0)
+        self.assertTrue((m.lp.coefMatrix != -model.A).nnz == 0)
+
     def test_process_rtn_fails_asserts(self):
         alg = BaseAlgorithm(small_branch, BaseNode, self._node_attributes, self._node_funcs)
         self.assertRaisesRegex(AssertionError, 'rtn must be a dictionary',
@@ -113,6 +144,40 @@ class TestBaseAlgorithm(unittest.TestCase):
         alg._process_rtn({'pseudo_costs': 5})
         self.assertTrue(alg._kwargs['pseudo_costs'] == 5)
 
+    def test_process_rtn_with_snapshot(self):
+        alg = BaseAlgorithm(small_branch, BaseNode, self._node_attributes, self._node_funcs)
+        alg._kwargs.update({'total_cuts': 3, 'dual_bounds': {0: 1}, 'strategy': 'a'})
+        snapshot = {'total_cuts': 3, 'dual_bounds': {0: 1}, 'strategy': 'a'}
+
+        # two rtns computed from the same snapshot should both count
+        alg._process_rtn({'total_cuts': 5, 'dual_bounds': {0: 1, 1: 2}, 'strategy': 'b'},
+                         snapshot)
+        alg._process_rtn({'total_cuts': 4, 'dual_bounds': {0: 1, 2: 3}, 'new': 1}, snapshot)
+        self.assertTrue(alg._kwargs['total_cuts'] == 6)
+        self.assertTrue(alg._kwargs['dual_bounds'] == {0: 1, 1: 2, 2: 3})
+        self.assertTrue(alg._kwargs['strategy'] == 'b')
+        self.assertTrue(alg._kwargs['new'] == 1)
+
+    def test_merge_kwarg(self):
+        alg = BaseAlgorithm(small_branch, BaseNode, self._node_attributes, self._node_funcs)
+        self.assertTrue(alg._merge_kwarg('a', 10, 2, 5) == 13)
+        self.assertTrue(alg._merge_kwarg('a', 1.5, 1, 1) == 1.5)
+        self.assertTrue(alg._merge_kwarg('a', True, False, False) is False)
+        self.assertTrue(alg._merge_kwarg('a', {1: 1}, {}, {2: 2}) == {1: 1, 2: 2})
+        self.assertTrue(alg._merge_kwarg('a', 'x', 'y', 'z') == 'z')
+
+        # rtn's from other processes are copies, so unchanged keys must not
+        # overwrite what other rtn's merged
+        before = {1: {'right': {'cost': 1, 'times': 1}}, 2: np.array([1., 2.])}
+        current = {1: {'right': {'cost': 3, 'times': 2}}, 2: np.array([1., 2.])}
+        after = pickle.loads(pickle.dumps(before))
+        after[3] = 3
+        merged = alg._merge_kwarg('a', current, before, after)
+        self.assertTrue(merged[1] == {'right': {'cost': 3, 'times': 2}})
+        self.assertTrue(merged[3] == 3)
+        after[2] = np.array([1., 3.])
+        self.assertTrue(all(alg._merge_kwarg('a', current, before, after)[2] == [1, 3]))
+
 
 if __name__ == '__main__':
     unittest.main()
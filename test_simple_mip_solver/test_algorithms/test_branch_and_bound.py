@@ -1,19 +1,30 @@
 from coinor.cuppy.milpInstance import MILPInstance
+from concurrent.futures import ProcessPoolExecutor
 from cylp.cy.CyClpSimplex import CyClpSimplex, CyLPArray
 import inspect
 from math import isclose
 import numpy as np
 import os
+import pickle
 from queue import PriorityQueue
 import re
+import scipy.sparse as sp
+import tempfile
+import time
 import unittest
 from unittest.mock import patch
 
-from simple_mip_solver import BaseNode, BranchAndBound, \
-    PseudoCostBranchDepthFirstSearchNode as PCBDFSNode, PseudoCostBranchNode
-from simple_mip_solver.algorithms.branch_and_bound import BranchAndBoundTree
+from simple_mip_solver import BaseNode, BestEstimateSearchNode, BranchAndBound, \
+    PseudoCostBranchDepthFirstSearchNode as PCBDFSNode, PseudoCostBranchNode, \
+    FractionalDiving, CoefficientDiving, PseudoCostDiving, ReliabilityBranchNode
+from simple_mip_solver.algorithms.branch_and_bound import BranchAndBoundTree, \
+    NodeQueue, _bound_and_branch
 from simple_mip_solver.algorithms.base_algorithm import BaseAlgorithm
+from simple_mip_solver.nodes import base_node
 from simple_mip_solver.utils.cut_generating_lp import CutGeneratingLP
+from simple_mip_solver.utils.dual_function import DualFunction
+from simple_mip_solver.utils.lp_data import build_lp, build_milp, get_lp_data, shared_coefs
+from simple_mip_solver.utils.solve_stats import SolveStats
 from test_simple_mip_solver.example_models import no_branch, small_branch, infeasible, \
     unbounded, infeasible2, h3p1, h3p1_0, h3p1_1, h3p1_2, h3p1_3, h3p1_4, h3p1_5, \
     small_branch_copy
@@ -118,6 +129,25 @@ class TestBranchAndBoundTree(unittest.TestCase):
         leaves = bb.tree.get_leaves(1, depth=3, keep='feasible')
         self.assertTrue({n.idx for n in leaves} == {5, 9})
 
+        # leaves deeper than depth are just themselves
+        for depth in [None, 1, 2]:
+            leaves = bb.tree.get_leaves(5, depth=depth)
+            self.assertTrue([n.idx for n in leaves] == [5])
+
+        # results come back ordered by id
+        leaves = bb.tree.get_leaves(0)
+        self.assertTrue([n.idx for n in leaves] == sorted(n.idx for n in leaves))
+
+    def test_get_leaves_ignores_lineage(self):
+        bb = BranchAndBound(self.small_branch_std, gomory_cuts=False)
+        bb.solve()
+        expected = {d: [n.idx for n in bb.tree.get_leaves(1, depth=d)] for d in [None, 2, 3]}
+        # subtree queries come from the tree structure, not each node's lineage
+        for node_id in bb.tree.nodes:
+            bb.tree.get_node_instances(node_id).lineage = None
+        for d, leaf_ids in expected.items():
+            self.assertTrue([n.idx for n in bb.tree.get_leaves(1, depth=d)] == leaf_ids)
+
     def test_get_disjunction_fails_asserts(self):
         bb = BranchAndBound(self.small_branch_std, gomory_cuts=False)
         bb.solve()
@@ -187,6 +217,106 @@ class TestBranchAndBoundTree(unittest.TestCase):
         self.assertTrue(bb.tree.subtree_dual_bound(2) == float('inf'))
         self.assertTrue(bb.tree.subtree_dual_bound(0, depth=1) == -2.75)
 
+    def test_update_leaf_bound_fails_asserts(self):
+        bb = BranchAndBound(self.small_branch_std, gomory_cuts=False)
+        self.assertRaisesRegex(AssertionError, 'node_id must belong to the tree',
+                               bb.tree.update_leaf_bound, 1)
+
+    def test_update_leaf_bound(self):
+        bb = BranchAndBound(small_branch_copy, gomory_cuts=False, node_limit=1)
+        self.assertTrue(bb.tree._leaf_bounds == {0: -float('inf')})
+        bb.solve()
+
+        # parent leaves the index once branched on and children enter it
+        self.assertTrue(bb.tree._leaf_bounds == {1: -2.75, 2: -2.75})
+
+        # stale bounds are ignored
+        bb.tree.get_node_instances(1).dual_bound = -1
+        bb.tree.get_node_instances(2).dual_bound = 0
+        bb.tree.update_leaf_bound(1)
+        bb.tree.update_leaf_bound(2)
+        self.assertTrue(bb.tree.dual_bound == -1)
+
+        # internal nodes are not added back
+        bb.tree.update_leaf_bound(0)
+        self.assertTrue(set(bb.tree._leaf_bounds) == {1, 2})
+
+    def test_dual_bound(self):
+        bb = BranchAndBound(small_branch_copy, gomory_cuts=False, node_limit=1)
+        self.assertTrue(bb.tree.dual_bound == -float('inf'))
+        for node_limit in [2, 4, float('inf')]:
+            bb.node_limit = node_limit
+            bb.solve()
+            scan_bound = min(n.objective_value if n.objective_value is not None
+                             else n.dual_bound for n in bb.tree.get_leaves(0))
+            self.assertTrue(bb.tree.dual_bound == scan_bound)
+
+        # leaves left out of the tree still count
+        bb.tree.detached_leaf_bound = -5
+        self.assertTrue(bb.tree.dual_bound == -5)
+        bb.tree.detached_leaf_bound = 5
+        self.assertTrue(bb.tree.dual_bound == scan_bound)
+
+    def test_update_leaf_bound_skips_placeholders(self):
+        tree = BranchAndBoundTree()
+        root = BaseNode(small_branch.lp, small_branch.integerIndices, idx=0, dual_bound=-3)
+        tree.add_root(0, node=root)
+        tree.add_left_child(1, 0, node=None)
+        self.assertFalse(tree._leaf_bounds)
+        tree.detached_leaf_bound = -1
+        self.assertTrue(tree.dual_bound == -1)
+
+
+class TestNodeQueue(unittest.TestCase):
+
+    def test_prune(self):
+        lp = BaseAlgorithm._convert_constraints_to_greq(small_branch).lp
+        queue = NodeQueue()
+        nodes = [BaseNode(lp, small_branch.integerIndices, dual_bound=d)
+                 for d in [4, -1, 2, 0, 3, 1]]
+        for node in nodes:
+            queue.put(node)
+        pruned = queue.prune(2)
+        self.assertTrue(sorted(n.dual_bound for n in pruned) == [2, 3, 4])
+        self.assertTrue(queue.qsize() == 3)
+        self.assertTrue([queue.get().dual_bound for _ in range(3)] == [-1, 0, 1],
+                        'remaining nodes should still pop in order')
+        self.assertFalse(queue.prune(2))
+
+    def test_get_best_bound(self):
+        lp = BaseAlgorithm._convert_constraints_to_greq(small_branch).lp
+        # estimates order the queue, but every 10th get takes the best dual bound
+        queue = NodeQueue()
+        for i in range(12):
+            queue.put(BestEstimateSearchNode(lp, small_branch.integerIndices,
+                                             dual_bound=-i, estimate=i))
+        popped = [queue.get() for _ in range(12)]
+        self.assertTrue([n.estimate for n in popped[:9]] == list(range(9)))
+        self.assertTrue(popped[9].dual_bound == -11, 'should switch to best bound')
+        self.assertTrue([n.estimate for n in popped[10:]] == [9, 10],
+                        'remaining nodes should still pop in order')
+
+        # nodes popped from one heap are skipped in the other, each node popping once
+        queue = NodeQueue()
+        nodes = [BestEstimateSearchNode(lp, small_branch.integerIndices, dual_bound=-i % 7,
+                                        estimate=i % 5) for i in range(100)]
+        for node in nodes:
+            queue.put(node)
+        popped = []
+        for i in range(100):
+            popped.append(queue.get())
+            self.assertTrue(len(queue.queue) == queue.qsize() == 99 - i)
+            self.assertTrue(len(queue._heap) + len(queue._bound_heap) <= 4 * (99 - i),
+                            'popped nodes should not pile up in the heaps')
+        self.assertTrue(sorted(map(id, popped)) == sorted(map(id, nodes)))
+        self.assertTrue(queue.empty())
+
+        # nodes without a frequency always pop in priority order
+        queue = NodeQueue()
+        for d in range(12, 0, -1):
+            queue.put(BaseNode(lp, small_branch.integerIndices, dual_bound=d))
+        self.assertTrue([queue.get().dual_bound for _ in range(12)] == list(range(1, 13)))
+
 
 class TestBranchAndBound(unittest.TestCase):
 
@@ -211,6 +341,15 @@ class TestBranchAndBound(unittest.TestCase):
         self.bound_root.bound(gomory_cuts=False)
         self.root_branch_rtn = self.bound_root.branch()
 
+    @staticmethod
+    def presolve_model(b):
+        # presolve divides the first row by 2, drops the second as a copy of it
+        # and fixes x_3, without tightening any bounds
+        return MILPInstance(A=np.array([[2., 2., 0.], [1., 1., 0.], [1., -1., 1.]]), b=b,
+                            c=CyLPArray([1, 2, 3]), l=CyLPArray([0, 0, 1]),
+                            u=CyLPArray([float('inf'), float('inf'), 1]), integerIndices=[0, 1],
+                            sense=['Min', '>='], numVars=3)
+
     def test_init(self):
         bb = BranchAndBound(self.small_branch_std)
         self.assertTrue(isinstance(bb, BaseAlgorithm))
@@ -229,6 +368,16 @@ class TestBranchAndBound(unittest.TestCase):
         self.assertTrue(bb.mip_gap, 'mip gap should be an attribute')
         self.assertFalse(bb.logging)
         self.assertTrue(bb.max_run_time == float('inf'))
+        self.assertTrue(bb.processes == 1)
+        self.assertTrue(isinstance(bb._node_queue, NodeQueue))
+        self.assertFalse(bb.checkpoint_path)
+        self.assertTrue(bb.checkpoint_interval == 600)
+        self.assertTrue(isinstance(bb.stats, SolveStats))
+        self.assertFalse(bb.stats.phases)
+        self.assertTrue(bb.heuristics == [])
+        self.assertTrue(bb.heuristic_frequency == 10)
+        self.assertFalse(bb.reduced_cost_fixing)
+        self.assertFalse(bb._presolve)
 
     def test_init_fails_asserts(self):
         bb = BranchAndBound(self.small_branch_std)
@@ -255,11 +404,53 @@ class TestBranchAndBound(unittest.TestCase):
         # run time assert
         self.assertRaisesRegex(AssertionError, f'max_run_time', BranchAndBound,
                                model=self.small_branch_std, max_run_time=0)
+        self.assertRaisesRegex(AssertionError, 'deadline is a number', BranchAndBound,
+                               model=self.small_branch_std, deadline='now')
 
         # initial primal bound assert
         self.assertRaisesRegex(AssertionError, f'initial_primal_bound', BranchAndBound,
                                model=self.small_branch_std, initial_primal_bound=-float('inf'))
 
+        # processes asserts
+        self.assertRaisesRegex(AssertionError, 'processes is a positive integer', BranchAndBound,
+                               model=self.small_branch_std, processes=0)
+        self.assertRaisesRegex(AssertionError, 'cglp references this instance', BranchAndBound,
+                               model=self.small_branch_std, processes=2, cglp=5)
+        self.assertRaisesRegex(AssertionError, 'strong_branch_processes must be 1',
+                               BranchAndBound, model=self.small_branch_std, processes=2,
+                               strong_branch_processes=2)
+
+        # checkpoint asserts
+        self.assertRaisesRegex(AssertionError, 'checkpoint_path is a string', BranchAndBound,
+                               model=self.small_branch_std, checkpoint_path=5)
+        self.assertRaisesRegex(AssertionError, 'checkpoint_interval is positive', BranchAndBound,
+                               model=self.small_branch_std, checkpoint_interval=0)
+        self.assertRaisesRegex(AssertionError, 'cglp references this instance', BranchAndBound,
+                               model=self.small_branch_std, checkpoint_path='a', cglp=5)
+
+        # plunge asserts
+        self.assertRaisesRegex(AssertionError, 'plunge is boolean', BranchAndBound,
+                               model=self.small_branch_std, plunge=1)
+        self.assertRaisesRegex(AssertionError, 'processes must be 1', BranchAndBound,
+                               model=self.small_branch_std, plunge=True, processes=2)
+
+        # heuristics asserts
+        self.assertRaisesRegex(AssertionError, 'heuristics must be a list', BranchAndBound,
+                               model=self.small_branch_std, heuristics=FractionalDiving())
+        self.assertRaisesRegex(AssertionError, 'heuristics must be a list', BranchAndBound,
+                               model=self.small_branch_std, heuristics=[5])
+        self.assertRaisesRegex(AssertionError, 'heuristic_frequency is a positive integer',
+                               BranchAndBound, model=self.small_branch_std,
+                               heuristic_frequency=0)
+
+        # reduced cost fixing assert
+        self.assertRaisesRegex(AssertionError, 'reduced_cost_fixing is boolean', BranchAndBound,
+                               model=self.small_branch_std, reduced_cost_fixing=1)
+
+        # presolve assert
+        self.assertRaisesRegex(AssertionError, 'presolve is boolean', BranchAndBound,
+                               model=self.small_branch_std, presolve=1)
+
         # kwargs asserts
         self.assertRaisesRegex(AssertionError, 'saved for later use', BranchAndBound,
                                model=self.small_branch_std, right=-5)
@@ -293,15 +484,417 @@ class TestBranchAndBound(unittest.TestCase):
             self.assertTrue(bb.status == 'stopped on iterations or time')
             self.assertTrue(bb.solve_time)
 
+    def test_solve_stopped_on_deadline(self):
+        bb = BranchAndBound(self.small_branch_std, deadline=time.time() - 1)
+        bb.solve()
+        self.assertTrue(bb.status == 'stopped on iterations or time')
+        self.assertTrue(bb.evaluated_nodes == 0)
+
     def test_solve_optimal(self):
         # check and make sure we're good with both nodes
         for Node in [BaseNode, PCBDFSNode]:
+            self.setUp()  # solving leaves the model's LP optimal, so start from a fresh one
             bb = BranchAndBound(self.small_branch_std, Node=Node, pseudo_costs={})
             bb.solve()
             self.assertTrue(bb.status == 'optimal')
             self.assertTrue(all(s.is_integer for s in bb.solution))
             self.assertTrue(bb.objective_value == -2)
             self.assertTrue(bb.solve_time)
+            self.assertTrue(len(bb.stats.nodes) == bb.evaluated_nodes)
+            self.assertTrue(set(bb.stats.nodes) <= set(bb.tree.nodes))
+            self.assertTrue(bb.stats.phases['_bound_lp']['calls'] >= bb.evaluated_nodes)
+            branched = sum(1 for n in bb.tree.get_node_instances(bb.tree.nodes)
+                           if not n.is_leaf)
+            self.assertTrue(bb.stats.phases.get('_base_branch', {'calls': 0})['calls'] >= branched)
+            self.assertTrue(bb.stats.simplex_iterations > 0)
+            self.assertTrue(bb.stats.gap_history[-1][2] == bb.current_gap)
+
+    def test_solve_plunging(self):
+        bb = BranchAndBound(self.small_branch_std, gomory_cuts=False)
+        bb.solve()
+        with patch('simple_mip_solver.nodes.base_node.build_lp', wraps=build_lp) as bl:
+            plunged = BranchAndBound(self.small_branch_std, gomory_cuts=False, plunge=True)
+            plunged.solve()
+        self.assertTrue(plunged.status == 'optimal')
+        self.assertTrue(plunged.objective_value == bb.objective_value)
+        self.assertTrue(plunged._plunge_node is None)
+
+        # every child evaluated right after its parent reuses its parent's LP
+        # unless the parent is the root
+        plunged_ids = [n.idx for n in plunged.tree.get_node_instances(plunged.tree.nodes)
+                       if n.lp_feasible is not None and n.depth > 1 and
+                       n.lineage[-2] + 1 in (n.idx, n.idx + 1)]
+        self.assertTrue(plunged_ids)
+        self.assertTrue(bl.call_count < plunged.evaluated_nodes - 1)
+        self.assertTrue(plunged.root_node._lp is plunged.model.lp,
+                        "the root's LP is never passed on")
+
+        # a dive cut short goes back in the queue
+        bb = BranchAndBound(self.small_branch_std, gomory_cuts=False, plunge=True,
+                            node_limit=2)
+        bb.solve()
+        self.assertTrue(bb._plunge_node is None)
+        self.assertTrue(bb.evaluated_nodes == 2 and not bb._node_queue.empty())
+        bb.node_limit = float('inf')
+        bb.solve()
+        self.assertTrue(bb.objective_value == plunged.objective_value)
+
+    def test_checkpoint_saves_plunge_node(self):
+        bb = BranchAndBound(self.small_branch_std, gomory_cuts=False, plunge=True)
+        bb._evaluate_node(bb.root_node)
+        self.assertTrue(bb._plunge_node is not None and bb._node_queue.qsize() == 1)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'checkpoint.pkl')
+            bb.checkpoint(path)
+            resumed = BranchAndBound.resume(path)
+        self.assertTrue(resumed.plunge)
+        self.assertTrue(resumed.heuristics == [] and resumed.heuristic_frequency == 10)
+        self.assertFalse(resumed.reduced_cost_fixing)
+        self.assertTrue({n.idx for n in resumed._node_queue.queue} == {1, 2})
+
+    def test_solve_in_parallel(self):
+        # parallel solves should match serial ones and repeat themselves
+        fldr_pth = os.path.join(os.path.dirname(os.path.abspath(inspect.getfile(example_models))),
+                                'example_models')
+        for file in sorted(os.listdir(fldr_pth))[:8]:
+            for Node in [BaseNode, PCBDFSNode]:
+                results = []
+                for processes in [1, 3, 3]:
+                    bb = BranchAndBound(MILPInstance(file_name=os.path.join(fldr_pth, file)),
+                                        Node=Node, pseudo_costs={}, processes=processes)
+                    bb.solve()
+                    self.assertTrue(bb.status == 'optimal')
+                    results.append(bb)
+                serial, parallel, repeat = results
+                self.assertTrue(isclose(serial.objective_value, parallel.objective_value,
+                                        abs_tol=.01))
+                self.assertTrue(parallel.objective_value == repeat.objective_value)
+                self.assertTrue(parallel.evaluated_nodes == repeat.evaluated_nodes)
+                self.assertTrue(parallel.tree.nodes.keys() == repeat.tree.nodes.keys())
+                self.assertTrue(isclose(parallel.dual_bound, parallel.objective_value,
+                                        abs_tol=.01))
+
+    def test_solve_in_parallel_stopped_on_time(self):
+        # the main process mostly waits on workers, so the limit is in wall clock time
+        rng = np.random.default_rng(0)
+        A, c = rng.integers(1, 20, (15, 40)), rng.integers(1, 30, 40).astype(float)
+        model = build_milp(A=-A, b=CyLPArray(-A.sum(axis=1) / 2), c=CyLPArray(-c),
+                           l=CyLPArray(np.zeros(40)), u=CyLPArray(np.ones(40)),
+                           integerIndices=list(range(40)), sense=['Min', '>='], numVars=40)
+        bb = BranchAndBound(model, gomory_cuts=False, max_run_time=.5, processes=2)
+        start = time.perf_counter()
+        bb.solve()
+        elapsed = time.perf_counter() - start
+        self.assertTrue(bb.status == 'stopped on iterations or time')
+        self.assertTrue(elapsed < 1.5, 'should stop soon after max_run_time')
+        self.assertTrue(.5 < bb.solve_time <= elapsed)
+
+    def test_solve_in_parallel_shares_coefficients(self):
+        # workers get the model's coefficients once, and the nodes they send back
+        # share this process's rather than each bringing a copy
+        bb = BranchAndBound(example_models.random, gomory_cuts=False, processes=2)
+        bb.solve()
+        self.assertTrue(bb.status == 'optimal' and bb.evaluated_nodes > 2)
+        A = bb.model.lp.constraints[0].varCoefs[bb.model.lp.getVarByName('x')]
+        for idx in bb.tree.nodes:
+            node = bb.tree.get_node_instances(idx)
+            lp_data = get_lp_data(node.lp) if node._lp is not None else node._lp_data
+            self.assertTrue(lp_data['constraints'][0][1] is A)
+        self.assertFalse(shared_coefs(), 'coefficients are only shared while solving')
+
+    def test_solve_strong_branch_in_parallel(self):
+        # every node strong branches in one pool, shut down when the solve ends
+        m = example_models.random
+        results = []
+        for processes in [1, 2]:
+            model = MILPInstance(A=m.A, b=m.b, c=m.lp.objective, l=m.l, u=m.u,
+                                 sense=['Min', m.sense], integerIndices=m.integerIndices,
+                                 numVars=len(m.lp.objective))
+            bb = BranchAndBound(model, Node=ReliabilityBranchNode, pseudo_costs={},
+                                strong_branch_processes=processes)
+            with patch('simple_mip_solver.nodes.base_node.ProcessPoolExecutor',
+                       wraps=ProcessPoolExecutor) as ppe:
+                bb.solve()
+            self.assertTrue(ppe.call_count == processes - 1)
+            self.assertTrue(base_node._strong_branch_executor is None)
+            results.append(bb)
+        self.assertTrue(results[1].stats.phases['_strong_branch_in_parallel']['calls'] > 1,
+                        'more than one node should strong branch')
+        self.assertTrue(results[0].objective_value == results[1].objective_value)
+        self.assertTrue(results[0].evaluated_nodes == results[1].evaluated_nodes)
+
+    def test_evaluate_nodes_in_parallel(self):
+        bb = BranchAndBound(self.small_branch_std, processes=2, gomory_cuts=False)
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            unbounded_root = bb.root_node
+            bb._node_queue.put(bb.root_node)
+            bb._evaluate_nodes_in_parallel(executor)
+            self.assertTrue(bb.evaluated_nodes == 1)
+            self.assertTrue(bb._kwargs['next_node_idx'] == 3)
+            root = bb.tree.get_node_attr(0, 'node')
+            self.assertTrue(root is not unbounded_root, 'the evaluated copy should replace it')
+            self.assertTrue(root is bb.root_node and root.lp_feasible)
+            self.assertTrue(root.children == (1, 2))
+            self.assertTrue(bb._node_queue.qsize() == 2)
+            self.assertTrue(bb.dual_bound == root.objective_value)
+
+            # nodes that can be pruned are dropped rather than sent to workers
+            bb.primal_bound = -float('inf')
+            with patch.object(executor, 'map') as m:
+                bb._evaluate_nodes_in_parallel(executor)
+                self.assertFalse(m.called)
+            self.assertTrue(bb._node_queue.empty())
+
+    def test_merge_kwarg(self):
+        bb = BranchAndBound(self.small_branch_std)
+        before = {0: {'left': {'cost': 1, 'times': 1}, 'right': {'cost': 2, 'times': 1}}}
+        after = {0: {'left': {'cost': 2, 'times': 2}, 'right': {'cost': 2, 'times': 1}},
+                 1: {'left': {'cost': 4, 'times': 1}, 'right': {'cost': 5, 'times': 1}}}
+        current = {0: {'left': {'cost': 3, 'times': 3}, 'right': {'cost': 2, 'times': 1}}}
+        merged = bb._merge_kwarg('pseudo_costs', current, before, after)
+        # left on 0 gained one update of cost 3 on top of three averaging 3
+        self.assertTrue(merged[0]['left'] == {'cost': 3, 'times': 4})
+        self.assertTrue(merged[0]['right'] == {'cost': 2, 'times': 1})
+        self.assertTrue(merged[1] == after[1])
+
+        # everything else is left to super
+        self.assertTrue(bb._merge_kwarg('total_cuts', 3, 1, 2) == 4)
+
+    def test_bound_and_branch(self):
+        node = BaseNode(self.small_branch_std.lp, self.small_branch_std.integerIndices, idx=0)
+        out_node, bound_rtn, branch_rtn = _bound_and_branch(
+            node, {'next_node_idx': 1, 'gomory_cuts': False}, float('inf'))
+        self.assertTrue(out_node is node)
+        self.assertTrue(node.lp_feasible)
+        self.assertTrue(isinstance(bound_rtn, dict))
+        self.assertTrue(branch_rtn['next_node_idx'] == 3)
+        self.assertTrue(branch_rtn['left'].idx == 1 and branch_rtn['right'].idx == 2)
+
+        # no branching when the node can be pruned
+        node = BaseNode(self.small_branch_std.lp, self.small_branch_std.integerIndices, idx=0)
+        self.assertTrue(_bound_and_branch(node, {'gomory_cuts': False}, -float('inf'))[2] is None)
+
+    def test_checkpoint_fails_asserts(self):
+        bb = BranchAndBound(self.small_branch_std)
+        bb._kwargs['cglp'] = 5
+        with tempfile.TemporaryDirectory() as folder:
+            self.assertRaisesRegex(AssertionError, 'cglp references this instance',
+                                   bb.checkpoint, os.path.join(folder, 'checkpoint.pkl'))
+
+    def test_checkpoint_and_resume(self):
+        fldr_pth = os.path.join(os.path.dirname(os.path.abspath(inspect.getfile(example_models))),
+                                'example_models')
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'checkpoint.pkl')
+            for file in sorted(os.listdir(fldr_pth))[:6]:
+                for Node in [BaseNode, PCBDFSNode]:
+                    full = BranchAndBound(MILPInstance(file_name=os.path.join(fldr_pth, file)),
+                                          Node=Node, pseudo_costs={})
+                    full.solve()
+                    bb = BranchAndBound(MILPInstance(file_name=os.path.join(fldr_pth, file)),
+                                        Node=Node, pseudo_costs={}, node_limit=3,
+                                        checkpoint_path=path)
+                    bb.solve()
+                    self.assertFalse(os.path.exists(f'{path}.tmp'))
+
+                    resumed = BranchAndBound.resume(path, node_limit=float('inf'))
+                    open_ids = {n.idx for n in bb._node_queue.queue}
+                    self.assertTrue({n.idx for n in resumed._node_queue.queue} == open_ids)
+                    self.assertTrue(resumed.evaluated_nodes == bb.evaluated_nodes)
+                    self.assertTrue(resumed.primal_bound == bb.primal_bound)
+                    self.assertTrue(resumed.solve_time == bb.solve_time)
+                    self.assertTrue(resumed._kwargs['next_node_idx'] == bb._kwargs['next_node_idx'])
+                    self.assertTrue(resumed._kwargs['pseudo_costs'] == bb._kwargs['pseudo_costs'])
+                    self.assertTrue(resumed.node_limit == float('inf'))
+                    self.assertTrue(resumed.checkpoint_path == path)
+                    self.assertTrue(isclose(resumed.dual_bound, bb.dual_bound, abs_tol=1e-9))
+                    self.assertTrue(resumed.status == bb.status)
+                    # stats keep only their totals and the cuts only what is left to pull
+                    self.assertTrue(resumed.stats.phases == bb.stats.phases)
+                    self.assertFalse(resumed.stats.nodes)
+                    self.assertTrue(resumed.stats.gap_history == bb.stats.gap_history[-1:])
+                    self.assertTrue(resumed._shared_cuts.version == bb._shared_cuts.version)
+                    pulled = min((n.shared_cut_version for n in bb._node_queue.queue),
+                                 default=bb._shared_cuts.version)
+                    self.assertTrue(resumed._shared_cuts.cuts_since(pulled).keys() ==
+                                    bb._shared_cuts.cuts_since(pulled).keys())
+                    # only the open nodes and what connects them to the root are rebuilt
+                    ancestors = {idx for n in bb._node_queue.queue for idx in n.lineage}
+                    self.assertTrue(set(resumed.tree.nodes) == ancestors | {0})
+                    if open_ids:
+                        self.assertTrue({n.idx for n in resumed.tree.get_leaves(0)} == open_ids)
+
+                    resumed.solve()
+                    self.assertTrue(resumed.status == full.status)
+                    self.assertTrue(resumed.objective_value == full.objective_value)
+                    self.assertTrue(resumed.evaluated_nodes == full.evaluated_nodes)
+                    self.assertTrue(isclose(resumed.dual_bound, full.dual_bound, abs_tol=.01))
+                    if resumed.tree.detached_leaf_bound is not None:
+                        self.assertRaisesRegex(AssertionError, 'dual functions need every leaf',
+                                               resumed.find_parameterized_dual_bound,
+                                               CyLPArray([]))
+
+    def test_checkpoint_saves_coefficients_once(self):
+        # open nodes share the model's coefficients, so they are saved only once
+        rng = np.random.default_rng(0)
+        A, c = rng.integers(1, 20, (100, 40)), rng.integers(1, 30, 40).astype(float)
+        model = build_milp(A=A, b=CyLPArray(A.sum(axis=1) / 3), c=CyLPArray(c),
+                           l=CyLPArray(np.zeros(40)), u=CyLPArray(np.ones(40)),
+                           integerIndices=list(range(40)), sense=['Min', '>='], numVars=40)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'checkpoint.pkl')
+            bb = BranchAndBound(model, gomory_cuts=False, node_limit=20, checkpoint_path=path)
+            bb.solve()
+            open_nodes = bb._node_queue.qsize()
+            self.assertTrue(open_nodes > 10)
+            coefs_size = len(pickle.dumps(bb._model_coefs))
+            self.assertTrue((os.path.getsize(path) - coefs_size) / open_nodes < coefs_size / 4,
+                            'each open node should add far less than a copy of A')
+
+            # and the resumed nodes share the resumed model's
+            resumed = BranchAndBound.resume(path, node_limit=float('inf'))
+            coefs = next(iter(resumed._model_coefs.values()))
+            self.assertTrue(np.array_equal(resumed.model.A, A))
+            self.assertTrue(all(n._lp_data['constraints'][0][1] is coefs
+                                for n in resumed._node_queue.queue))
+            resumed.solve()
+        full = BranchAndBound(model, gomory_cuts=False)
+        full.solve()
+        self.assertTrue(resumed.objective_value == full.objective_value)
+
+    def test_resume_before_solve(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'checkpoint.pkl')
+            bb = BranchAndBound(self.small_branch_std, gomory_cuts=False)
+            bb.checkpoint(path)
+            resumed = BranchAndBound.resume(path)
+            self.assertTrue(resumed.status == 'unsolved')
+            self.assertTrue(resumed._node_queue.empty())
+            resumed.solve()
+            self.assertTrue(resumed.status == 'optimal')
+            self.assertTrue(resumed.objective_value == -2)
+
+    def test_solve_sparse_model(self):
+        fldr_pth = os.path.join(os.path.dirname(os.path.abspath(inspect.getfile(example_models))),
+                                'example_models')
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'checkpoint.pkl')
+            for file in sorted(os.listdir(fldr_pth))[:4]:
+                model = MILPInstance(file_name=os.path.join(fldr_pth, file))
+                dense = MILPInstance(A=model.A.toarray(), b=model.b, c=model.lp.objective,
+                                     l=model.lp.variablesLower.copy(),
+                                     u=model.lp.variablesUpper.copy(),
+                                     integerIndices=model.integerIndices,
+                                     sense=['Min', model.sense], numVars=model.lp.nVariables)
+                bb = BranchAndBound(model, gomory_cuts=False, checkpoint_path=path)
+                self.assertTrue(sp.issparse(bb.model.A), 'A stays sparse')
+                bb.solve()
+                expected = BranchAndBound(dense, gomory_cuts=False)
+                expected.solve()
+                self.assertTrue(bb.objective_value == expected.objective_value)
+
+                # as do its checkpoints and warm starts
+                self.assertTrue(sp.issparse(BranchAndBound.resume(path).model.A))
+                warm = BranchAndBound.warm_start(bb, CyLPArray(model.b))
+                self.assertTrue(sp.issparse(warm.model.A))
+                warm.solve()
+                self.assertTrue(warm.objective_value == bb.objective_value)
+
+    def test_checkpoint_and_resume_presolve(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'checkpoint.pkl')
+            bb = BranchAndBound(self.presolve_model(CyLPArray([3, 1, -10])), gomory_cuts=False,
+                                presolve=True, checkpoint_path=path)
+            bb.solve()
+            resumed = BranchAndBound.resume(path)
+            self.assertTrue(resumed.model.lp.objectiveOffset == -3)
+            self.assertTrue(all(resumed._presolve.kept_vars == [0, 1]))
+            resumed.solve()
+            self.assertTrue(resumed.objective_value == bb.objective_value == 5)
+            self.assertTrue(all(resumed.solution == [2, 0, 1]))
+
+    def test_warm_start_fails_asserts(self):
+        bb = BranchAndBound(self.small_branch_std, gomory_cuts=False)
+        self.assertRaisesRegex(AssertionError, 'previous must be a BranchAndBound instance',
+                               BranchAndBound.warm_start, bb.root_node, CyLPArray([1, 1]))
+        self.assertRaisesRegex(AssertionError, 'previous must be solved',
+                               BranchAndBound.warm_start, bb, CyLPArray([1, 1]))
+        bb.solve()
+        self.assertRaisesRegex(AssertionError, 'only works with CyLP arrays',
+                               BranchAndBound.warm_start, bb, np.array([1, 1]))
+        self.assertRaisesRegex(AssertionError, 'b needs an entry for each constraint',
+                               BranchAndBound.warm_start, bb, CyLPArray([1]))
+        bb.tree.detached_leaf_bound = -10
+        self.assertRaisesRegex(AssertionError, 'warm starts need every leaf',
+                               BranchAndBound.warm_start, bb, CyLPArray([1, 1]))
+        bb = BranchAndBound(self.small_branch_std, gomory_cuts=False, reduced_cost_fixing=True)
+        bb.solve()
+        self.assertRaisesRegex(AssertionError, 'right hand side only',
+                               BranchAndBound.warm_start, bb, CyLPArray([1, 1]))
+        bb = BranchAndBound(self.small_branch_std, gomory_cuts=False, presolve=True)
+        bb.solve()
+        self.assertRaisesRegex(AssertionError, "presolve reduced previous's model",
+                               BranchAndBound.warm_start, bb, CyLPArray([1, 1]))
+
+    def test_warm_start(self):
+        bb = BranchAndBound(h3p1, gomory_cuts=False)
+        bb.solve()
+
+        # same rhs keeps the incumbent and the dual function prunes every leaf
+        warm = BranchAndBound.warm_start(bb, CyLPArray([3.5, -3.5]))
+        self.assertTrue(warm.primal_bound == bb.objective_value)
+        self.assertTrue(len(warm.tree.nodes) == len(bb.tree.nodes))
+        self.assertTrue(warm._kwargs['next_node_idx'] == bb._kwargs['next_node_idx'])
+        warm.solve()
+        self.assertTrue(warm.status == 'optimal')
+        self.assertTrue(warm.evaluated_nodes == 0)
+        self.assertTrue((warm.solution == bb.solution).all())
+
+        # new rhs match solving from scratch
+        prob = {0: h3p1_0, 1: h3p1_1, 2: h3p1_2, 3: h3p1_3, 4: h3p1_4, 5: h3p1_5}
+        for beta, model in prob.items():
+            cold = BranchAndBound(model)
+            cold.solve()
+            warm = BranchAndBound.warm_start(bb, CyLPArray([beta, -beta]))
+            self.assertTrue(min(n.dual_bound for n in warm.tree.get_leaves(0)) <=
+                            cold.objective_value + .01, 'leaves should start with valid dual bounds')
+            warm.solve()
+            self.assertTrue(warm.status == cold.status)
+            self.assertTrue(isclose(warm.objective_value, cold.objective_value, abs_tol=.01))
+            self.assertTrue(warm.find_parameterized_dual_bound(CyLPArray([beta, -beta])) <=
+                            cold.objective_value + .01)
+
+        # infeasible leaves and flipped constraints are handled too
+        bb = BranchAndBound(self.small_branch_std, gomory_cuts=False)
+        bb.solve()
+        for b in [[-2.5, -4.5], [-1, -.75], [.5, .75]]:
+            warm = BranchAndBound.warm_start(bb, CyLPArray(b), node_limit=100)
+            self.assertTrue(warm.node_limit == 100)
+            warm.solve()
+            model = MILPInstance(A=bb.model.A, b=CyLPArray(b), c=bb.model.lp.objective,
+                                 l=bb.model.lp.variablesLower, sense=['Min', '>='],
+                                 integerIndices=bb.model.integerIndices, numVars=3)
+            cold = BranchAndBound(model, gomory_cuts=False)
+            cold.solve()
+            self.assertTrue(warm.status == cold.status)
+            self.assertTrue(warm.objective_value == cold.objective_value or
+                            isclose(warm.objective_value, cold.objective_value, abs_tol=.01))
+
+    def test_solve_checkpoints(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'checkpoint.pkl')
+            bb = BranchAndBound(self.small_branch_std, gomory_cuts=False, checkpoint_path=path,
+                                checkpoint_interval=1e-9)
+            with patch.object(bb, 'checkpoint') as cp:
+                bb.solve()
+                self.assertTrue(cp.call_count == bb.evaluated_nodes + 1,
+                                'should checkpoint after every node and when done')
+                self.assertTrue(cp.call_args.args[0] == path)
+
+            bb = BranchAndBound(self.small_branch_std, gomory_cuts=False, checkpoint_path=path)
+            with patch.object(bb, 'checkpoint') as cp:
+                bb.solve()
+                self.assertTrue(cp.call_count == 1, 'should only checkpoint when done')
 
     def test_solve_infeasible(self):
         # check and make sure we're good with both nodes
@@ -435,6 +1028,181 @@ class TestBranchAndBound(unittest.TestCase):
             self.assertTrue(bb.evaluated_nodes == 1,
                             'only one node should be evaluated since other pruned')
 
+    def test_evaluate_node_prunes_node_queue(self):
+        bb = BranchAndBound(no_branch)
+        open_nodes = [BaseNode(bb.model.lp, bb.model.integerIndices, dual_bound=d)
+                      for d in [-3, -2, -1]]
+        for node in open_nodes:
+            bb._node_queue.put(node)
+        with patch.object(bb, '_prune_node_queue', wraps=bb._prune_node_queue) as pnq:
+            bb._evaluate_node(bb.root_node)
+            self.assertTrue(pnq.call_count == 1, 'new incumbent should prune the queue')
+        self.assertTrue(bb._node_queue.qsize() == 1)
+        self.assertTrue(bb._node_queue.get() is open_nodes[0])
+        for node in open_nodes[1:]:
+            self.assertTrue(node._lp is None, 'pruned nodes should release their lps')
+
+    def test_update_incumbent(self):
+        bb = BranchAndBound(self.small_branch_std, gomory_cuts=False)
+        bb._evaluate_node(bb.root_node)
+        with patch.object(bb, '_prune_node_queue', wraps=bb._prune_node_queue) as pnq:
+            bb._update_incumbent(np.array([1, 1, 0]), -2)
+            self.assertTrue(pnq.call_count == 1)
+        self.assertTrue(all(bb._best_solution == [1, 1, 0]) and bb.primal_bound == -2)
+        self.assertTrue(bb._node_queue.qsize() == 2, "the children's bound of -2.75 can beat -2")
+
+    def test_run_heuristics(self):
+        heuristics = [FractionalDiving(), CoefficientDiving()]
+        bb = BranchAndBound(self.small_branch_std, gomory_cuts=False, heuristics=heuristics,
+                            heuristic_frequency=2)
+        bb.evaluated_nodes = 1
+        bb.root_node.bound(gomory_cuts=False)
+        with patch.object(FractionalDiving, 'dive', wraps=heuristics[0].dive) as fd:
+            bb._run_heuristics(bb.root_node)
+            self.assertTrue(fd.call_count == 1, 'heuristics always run at the root')
+        self.assertTrue(bb.primal_bound == -2)
+        self.assertTrue(all(bb._best_solution == [1, 1, 0]))
+        for name in ['FractionalDiving.dive', 'CoefficientDiving.dive']:
+            self.assertTrue(bb.stats.phases[name]['calls'] == 1)
+            self.assertTrue(bb.stats.phases[name]['simplex_iterations'] > 0)
+
+        # elsewhere only every heuristic_frequency-th node
+        child = bb.root_node.branch(next_node_idx=1)['left']
+        child.bound(gomory_cuts=False)
+        with patch.object(FractionalDiving, 'dive', wraps=heuristics[0].dive) as fd:
+            bb.evaluated_nodes = 3
+            bb._run_heuristics(child)
+            self.assertTrue(fd.call_count == 0)
+            bb.evaluated_nodes = 4
+            bb._run_heuristics(child)
+            self.assertTrue(fd.call_count == 1)
+
+    def test_solve_with_heuristics(self):
+        bb = BranchAndBound(self.small_branch_std, gomory_cuts=False)
+        bb.solve()
+        heuristics = [FractionalDiving(), CoefficientDiving(), PseudoCostDiving()]
+        dived = BranchAndBound(self.small_branch_std, PseudoCostBranchNode, gomory_cuts=False,
+                               pseudo_costs={}, heuristics=heuristics)
+        dived.solve()
+        self.assertTrue(dived.status == 'optimal')
+        self.assertTrue(dived.objective_value == bb.objective_value)
+        # the dives at the root find the optimal solution, so there is a gap
+        # after the first node instead of the sixth
+        self.assertTrue(bb.stats.gap_history[0][1:] == (1, None))
+        self.assertTrue(dived.stats.gap_history[0][1:] == (1, .375))
+
+        # dives are only run from nodes evaluated in the main process
+        parallel = BranchAndBound(self.small_branch_std, gomory_cuts=False,
+                                  heuristics=heuristics, processes=2)
+        parallel.solve()
+        self.assertTrue(parallel.objective_value == bb.objective_value)
+        self.assertTrue(parallel.stats.phases['FractionalDiving.dive']['calls'] == 1)
+
+    def test_process_branch_rtn_fixes_by_reduced_cost(self):
+        # root solution is [1.75, 0, ...] with objective value 1.75 and x_1 and
+        # x_3 with reduced costs 1.5 and 5
+        bb = BranchAndBound(h3p1, gomory_cuts=False, reduced_cost_fixing=True,
+                            initial_primal_bound=5)
+        bb._evaluate_node(bb.root_node)
+        for node in bb._node_queue.queue:
+            self.assertTrue(node._lp_data['variables_upper'][1] == 2)
+            self.assertTrue(node._lp_data['variables_upper'][3] == 0)
+        self.assertTrue(bb.root_node.lp.variablesUpper[1] > 2, "the root's LP is left alone")
+
+        # children keep their reduced costs until they branch, except for the root
+        child = bb._node_queue.get()
+        self.assertTrue(child.keep_reduced_costs)
+        bb._evaluate_node(child)
+        self.assertTrue(child.children and child.reduced_costs is None)
+        self.assertTrue(bb.root_node.reduced_costs is not None)
+
+        # nothing to fix without an incumbent or when turned off
+        for kwargs in [{'reduced_cost_fixing': True}, {'initial_primal_bound': 5}]:
+            bb = BranchAndBound(h3p1, gomory_cuts=False, **kwargs)
+            bb._evaluate_node(bb.root_node)
+            for node in bb._node_queue.queue:
+                self.assertTrue(node._lp_data['variables_upper'][1] > 2)
+
+        # which copies no reduced costs
+        self.assertTrue(bb.root_node.reduced_costs is None)
+        self.assertFalse(any(n.keep_reduced_costs for n in bb._node_queue.queue))
+
+    def test_fix_open_nodes_by_reduced_cost(self):
+        bb = BranchAndBound(h3p1, gomory_cuts=False, reduced_cost_fixing=True)
+        bb._evaluate_node(bb.root_node)
+        left, right = [bb.tree.get_node_instances(i) for i in bb.root_node.children]
+        self.assertTrue(left._lp_data['variables_upper'][3] > 0)
+        right.lp  # open nodes may have built LP's too
+        bb._update_incumbent(np.array([0, 0, 0, 1, 0, 0]), 5)
+        self.assertTrue(left._lp_data['variables_upper'][3] == 0)
+        self.assertTrue(right.lp.variablesUpper[3] == 0)
+        self.assertTrue(left._lp_data['variables_upper'][1] == 2)
+
+        # when turned off, open nodes keep their bounds
+        bb = BranchAndBound(h3p1, gomory_cuts=False)
+        bb._evaluate_node(bb.root_node)
+        bb._update_incumbent(np.array([0, 0, 0, 1, 0, 0]), 5)
+        for node in bb._node_queue.queue:
+            self.assertTrue(node._lp_data['variables_upper'][3] > 0)
+
+    def test_solve_reduced_cost_fixing(self):
+        fldr_pth = os.path.join(os.path.dirname(os.path.abspath(inspect.getfile(example_models))),
+                                'example_models')
+        nodes = {True: 0, False: 0}
+        for file in sorted(os.listdir(fldr_pth))[:16]:
+            values = {}
+            for fixing in [True, False]:
+                bb = BranchAndBound(MILPInstance(file_name=os.path.join(fldr_pth, file)),
+                                    PseudoCostBranchNode, pseudo_costs={},
+                                    heuristics=[FractionalDiving()],
+                                    reduced_cost_fixing=fixing)
+                bb.solve()
+                values[fixing] = bb.objective_value
+                nodes[fixing] += bb.evaluated_nodes
+            self.assertTrue(isclose(values[True], values[False], abs_tol=1e-6),
+                            f'different for {file}')
+        self.assertTrue(nodes[True] <= nodes[False])
+
+    def test_solve_presolve(self):
+        fldr_pth = os.path.join(os.path.dirname(os.path.abspath(inspect.getfile(example_models))),
+                                'example_models')
+        for file in sorted(os.listdir(fldr_pth))[:16]:
+            values = {}
+            for presolve in [False, True]:
+                bb = BranchAndBound(MILPInstance(file_name=os.path.join(fldr_pth, file)),
+                                    PseudoCostBranchNode, pseudo_costs={}, presolve=presolve)
+                bb.solve()
+                values[presolve] = bb.objective_value
+            # gomory cuts can leave objective values a little off integer
+            self.assertTrue(isclose(values[True], values[False], abs_tol=1e-3),
+                            f'different for {file}')
+
+            # the solution is of the original model
+            model = MILPInstance(file_name=os.path.join(fldr_pth, file))
+            self.assertTrue(len(bb.solution) == model.lp.nVariables)
+            self.assertTrue(isclose(np.inner(model.lp.objective, bb.solution), values[True],
+                                    abs_tol=1e-6))
+
+    def test_prune_node_queue(self):
+        bb = BranchAndBound(self.small_branch_std, gomory_cuts=False)
+        bb._evaluate_node(bb.root_node)
+        left, right = [bb.tree.get_node_instances(i) for i in bb.root_node.children]
+        left.dual_bound, right.dual_bound = -3, -1
+        right.lp  # build an lp to release
+        bb.primal_bound = -2
+        bb._prune_node_queue()
+        self.assertTrue(bb._node_queue.qsize() == 1)
+        self.assertTrue(right._lp is None and right._lp_data)
+        self.assertTrue(bb.tree.get_node_attr(right.idx, 'fathomed'))
+        self.assertFalse(bb.tree.get_node_attr(left.idx, 'fathomed'))
+
+        # queues without a prune method are left alone
+        bb = BranchAndBound(self.small_branch_std, node_queue=PriorityQueue())
+        bb._node_queue.put(bb.root_node)
+        bb.primal_bound = -float('inf')
+        bb._prune_node_queue()
+        self.assertTrue(bb._node_queue.qsize() == 1)
+
     def test_process_branch_rtn_fails_asserts(self):
         self.assertRaisesRegex(AssertionError, 'rtn must be a dictionary',
                                self.bb._process_branch_rtn, 0, 'fish')
@@ -507,12 +1275,45 @@ class TestBranchAndBound(unittest.TestCase):
         with patch.object(cglp_bb, '_process_rtn') as pr:
             cglp_bb._process_bound_rtn(rtn)
             args, kwargs = pr.call_args
-            self.assertTrue(len(args) == 1 and len(kwargs) == 0)
+            self.assertTrue(len(args) == 2 and len(kwargs) == 0)
             self.assertFalse(args[0])
-            for node in cglp_bb._node_queue.queue:
-                self.assertTrue(len(node.cut_pool) == 1)
-                self.assertTrue((node.cut_pool['node_0_cglp_cut'][0] == pi).all())
-                self.assertTrue((node.cut_pool['node_0_cglp_cut'][1] == pi0).all())
+            self.assertTrue(args[1] is None)
+            self.assertTrue(cglp_bb._shared_cuts.version == 1)
+            cuts = cglp_bb._shared_cuts.cuts_since(0)
+            self.assertTrue((cuts['cut_cglp_0_0'][0] == pi).all())
+            self.assertTrue(cuts['cut_cglp_0_0'][1] == pi0)
+
+    def test_pull_shared_cuts(self):
+        bb = BranchAndBound(self.small_branch_std, gomory_cuts=False)
+        bb._evaluate_node(bb.root_node)
+        left, right = [bb.tree.get_node_instances(i) for i in bb.root_node.children]
+        self.assertTrue(left.shared_cut_version == right.shared_cut_version == 0)
+
+        # open nodes only get the cuts when they are evaluated
+        pi, pi0 = CyLPArray([0, 0, 1]), 1
+        bb._process_bound_rtn({'cuts': {'cut_cglp_0_0': (pi, pi0)}})
+        self.assertFalse(left.cut_pool)
+        bb._pull_shared_cuts(left)
+        self.assertTrue(left.cut_pool == {'cut_cglp_0_0': (pi, pi0)})
+        self.assertTrue(left.shared_cut_version == 1)
+
+        # and only pull each once
+        bb._process_bound_rtn({'cuts': {'cut_cglp_1_0': (pi, 2)}})
+        bb._pull_shared_cuts(left)
+        self.assertTrue(set(left.cut_pool) == {'cut_cglp_0_0', 'cut_cglp_1_0'})
+        left.cut_pool = {}
+        bb._pull_shared_cuts(left)
+        self.assertFalse(left.cut_pool)
+
+        # _evaluate_node pulls before bounding
+        with patch.object(bb, '_pull_shared_cuts') as psc:
+            bb._evaluate_node(left)
+            self.assertTrue(psc.call_args.args[0] is left)
+
+        # children only see cuts shared after they were created
+        self.assertTrue(left.children)
+        for idx in left.children:
+            self.assertTrue(bb.tree.get_node_instances(idx).shared_cut_version == 2)
 
     def test_find_parameterized_dual_bound_fails_asserts(self):
         bb = BranchAndBound(self.small_branch_std, gomory_cuts=False)
@@ -524,6 +1325,11 @@ class TestBranchAndBound(unittest.TestCase):
         self.assertRaisesRegex(AssertionError, 'shape of the RHS being added should match',
                                bb.find_parameterized_dual_bound, CyLPArray([4.5]))
 
+        bb = BranchAndBound(self.small_branch_std, gomory_cuts=False, reduced_cost_fixing=True)
+        bb.solve()
+        self.assertRaisesRegex(AssertionError, 'right hand side only',
+                               bb.find_parameterized_dual_bound, CyLPArray([2.5, 4.5]))
+
         bb = BranchAndBound(infeasible2)
         bb.root_node.lp += np.matrix([[0, -1, -1]]) * bb.root_node.lp.getVarByName('x') >= CyLPArray([-2.5])
         bb.solve()
@@ -564,9 +1370,8 @@ class TestBranchAndBound(unittest.TestCase):
         # check function calls
         bb = BranchAndBound(self.small_branch_std, gomory_cuts=False)
         bb.solve()
-        bound_parameterized_duals = [bb._bound_parameterized_dual(n.lp) for n in bb.tree.get_node_instances([6, 12, 10, 8, 2])]
-        with patch.object(bb, '_bound_parameterized_dual') as bd:
-            bd.side_effect = bound_parameterized_duals
+        with patch.object(bb, '_bound_parameterized_dual',
+                          wraps=bb._bound_parameterized_dual) as bd:
             bound = bb.find_parameterized_dual_bound(CyLPArray([3, 3]))
             self.assertTrue(bd.call_count == 5)
 
@@ -577,6 +1382,69 @@ class TestBranchAndBound(unittest.TestCase):
             bound = bb.find_parameterized_dual_bound(CyLPArray([1, 1]))
             self.assertFalse(bd.called)
 
+    def test_dual_function(self):
+        bb = BranchAndBound(self.small_branch_std, gomory_cuts=False)
+        self.assertRaisesRegex(AssertionError, 'must solve this instance before',
+                               bb.dual_function)
+        bb.solve()
+        dual_function = bb.dual_function()
+        self.assertTrue(isinstance(dual_function, DualFunction))
+        self.assertTrue(bb.dual_function() is dual_function, 'should only build once')
+        self.assertTrue(dual_function.leaves.sum() == len(bb.tree.get_leaves(0)))
+        self.assertTrue(dual_function.parents[0] == -1)
+
+        # evaluating many rhs at once matches evaluating each on its own
+        rhs = np.array([[-2.5, -4.5], [3, 3], [1, 1], [0, -1]])
+        bounds = dual_function(rhs)
+        for b, bound in zip(rhs, bounds):
+            self.assertTrue(isclose(bb.find_parameterized_dual_bound(CyLPArray(b)), bound,
+                                    abs_tol=1e-9))
+
+        # and still does after a save and load without any LP's
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'dual_function.npz')
+            dual_function.save(path)
+            loaded = DualFunction.load(path)
+        self.assertTrue(np.allclose(loaded(rhs), bounds))
+
+        # more evaluated nodes make a new one
+        bb.evaluated_nodes += 1
+        self.assertTrue(bb.dual_function() is not dual_function)
+
+        # bounding infeasible leaves' duals leaves the tree's LP's, and so the
+        # model's, as they were
+        bb = BranchAndBound(infeasible2, gomory_cuts=False)
+        bb.solve()
+        self.assertTrue(any(n.lp_feasible is False for n in bb.tree.get_leaves(0)))
+        bb.dual_function()
+        for n in bb.tree.get_node_instances(list(bb.tree.nodes)):
+            if n.lp is not None:
+                self.assertTrue(n.lp.nVariables == 3)
+                n.release_lp()
+        self.assertTrue(bb.model.lp.nVariables == 3)
+
+    def test_dual_function_presolve(self):
+        bb = BranchAndBound(self.presolve_model(CyLPArray([3, 1, -10])), gomory_cuts=False,
+                            presolve=True)
+        bb.solve()
+        self.assertTrue(bb.objective_value == 5)
+        self.assertTrue(all(bb.solution == [2, 0, 1]))
+        dual_function = bb.dual_function()
+        self.assertTrue(dual_function.num_constraints == 3)
+
+        # bounds the original MILP at each right hand side
+        rhs = np.array([[3, 1, -10], [5, 1, -10], [3, 4, -10], [1, 1, 0]])
+        for b, bound in zip(rhs, dual_function(rhs)):
+            full = BranchAndBound(self.presolve_model(CyLPArray(b)), gomory_cuts=False)
+            full.solve()
+            self.assertTrue(bound <= full.objective_value + 1e-9)
+
+        # bounds presolve tightened only hold at this right hand side
+        bb = BranchAndBound(self.small_branch_std, gomory_cuts=False, presolve=True)
+        bb.solve()
+        self.assertRaisesRegex(AssertionError, 'presolve tightened bounds with this right hand',
+                               bb.dual_function)
+
     @unittest.skipIf(skip_longs, "debugging")
     def test_find_parameterized_dual_bound_many_times(self):
         pattern = re.compile('evaluation_(\d+).mps')
@@ -600,51 +1468,50 @@ class TestBranchAndBound(unittest.TestCase):
                                 bb.objective_value + .01, 'dual_bound should be less')
 
     def test_bound_parameterized_dual(self):
-        bb = BranchAndBound(infeasible2)
+        # the extra constraint below changes the model, so leave the shared one alone
+        model = MILPInstance(A=infeasible2.A, b=infeasible2.b, c=infeasible2.lp.objective,
+                             l=infeasible2.l, sense=['Min', infeasible2.sense],
+                             integerIndices=infeasible2.integerIndices, numVars=3)
+        bb = BranchAndBound(model)
         bb.root_node.lp += np.matrix([[0, -1, -1]]) * bb.root_node.lp.getVarByName('x') >= CyLPArray([-2.5])
         bb.solve()
         terminal_nodes = bb.tree.get_leaves(0)
         infeasible_nodes = [n for n in terminal_nodes if n.lp_feasible is False]
         n = infeasible_nodes[0]
+        old_lower, old_upper = n.lp.variablesLower.copy(), n.lp.variablesUpper.copy()
+        old_constraints_lower = n.lp.constraintsLower.copy()
         lp = bb._bound_parameterized_dual(n.lp)
 
-        # test that we get a CyClpSimplex object back
-        self.assertTrue(isinstance(lp, CyClpSimplex), 'should return CyClpSimplex instance')
+        # test that we get a copy back and the node's LP is left alone
+        self.assertTrue(lp is not n.lp, 'should add slacks to a copy')
+        self.assertTrue(n.lp.nVariables == 3 and n.lp.getStatusCode() == 1)
 
-        # same variables plus extra 's'
-        self.assertTrue({v.name for v in lp.variables} == {'x', 's_0', 's_1'},
-                        'x should already exist and s_1 and s_2 should be added')
-        old_x = n.lp.getVarByName('x')
-        new_x, s_0, s_1 = lp.getVarByName('x'), lp.getVarByName('s_0'), lp.getVarByName('s_1')
+        # same modeled variables, plus a slack column for each row
+        self.assertTrue([v.name for v in lp.variables] == ['x'], 'slacks are not modeled')
+        self.assertTrue(lp.nVariables == 6, 'should add a column for each of the 3 rows')
 
         # same variable bounds, plus s >= 0
-        self.assertTrue(all(new_x.lower == old_x.lower) and all(new_x.upper == old_x.upper),
-                        'x should have the same bounds')
-        self.assertTrue(all(s_0.lower == [0, 0]) and all(s_0.upper > [1e300, 1e300]), 's_0 >= 0')
-        self.assertTrue(all(s_1.lower == [0]) and all(s_1.upper > 1e300), 's_1 >= 0')
+        self.assertTrue(all(lp.variablesLower[:3] == old_lower) and
+                        all(lp.variablesUpper[:3] == old_upper), 'x should have the same bounds')
+        self.assertTrue(all(lp.variablesLower[3:] == 0) and all(lp.variablesUpper[3:] > 1e300),
+                        's >= 0')
 
         # same constraints, plus slack s
         self.assertTrue(lp.nConstraints == 3, 'should have same number of constraints')
-        self.assertTrue((lp.constraints[0].varCoefs[new_x] == np.array([[-1, -1, 0], [0, 0, -1]])).all(),
-                        'x coefs should stay same')
-        self.assertTrue((lp.constraints[0].varCoefs[s_0] == np.matrix(np.identity(2))).all(),
-                        's_0 should have coef of 2-D identity')
-        self.assertTrue(all(lp.constraints[1].varCoefs[new_x] == np.array([0, -1, -1])),
-                        'x coefs should stay same')
-        self.assertTrue(lp.constraints[1].varCoefs[s_1] == np.matrix(np.identity(1)),
-                        's_0 should have coef of 1-D identity')
-        self.assertTrue(all(lp.constraints[0].lower == np.array([1, -1])) and
-                        all(lp.constraints[0].upper >= np.array([1e300])),
-                        'constraint bounds should remain same')
-        self.assertTrue(lp.constraints[1].lower == np.array([-2.5]) and
-                        lp.constraints[1].upper >= np.array([1e300]),
-                        'constraint bounds should remain same')
+        self.assertTrue((lp.coefMatrix.toarray() ==
+                         np.array([[-1, -1, 0, 1, 0, 0], [0, 0, -1, 0, 1, 0],
+                                   [0, -1, -1, 0, 0, 1]])).all(),
+                        'x coefs should stay same and s should have identity coefs')
+        self.assertTrue(all(lp.constraintsLower == old_constraints_lower) and
+                        all(lp.constraintsUpper >= 1e300), 'constraint bounds should remain same')
 
         # same objective, plus large s coefficient
         self.assertTrue(all(lp.objective == np.array([-1, -1, 0, bb._M, bb._M, bb._M])))
 
-        # problem is now feasible
+        # problem is now feasible, warm started from the old basis
         self.assertTrue(lp.getStatusCode() == 0, 'lp should now be optimal')
+        self.assertTrue(lp.iteration <= 3, 'should start from the old basis')
+        self.assertTrue(lp.primalVariableSolution['x'].shape == (3,))
 
     def test_bound_parameterized_dual_fails_asserts(self):
         bb = BranchAndBound(self.infeasible_std)
@@ -652,12 +1519,11 @@ class TestBranchAndBound(unittest.TestCase):
         terminal_nodes = bb.tree.get_leaves(0)
         infeasible_nodes = [n for n in terminal_nodes if n.lp_feasible is False]
         n = infeasible_nodes[0]
-        n.lp.addVariable('s_0', 1)
-        self.assertRaisesRegex(AssertionError, "variable 's_0' is a reserved name",
-                               bb._bound_parameterized_dual, n.lp)
         self.assertRaisesRegex(AssertionError, "must give CyClpSimplex instance",
                                bb._bound_parameterized_dual, n)
-
+        lp = bb._bound_parameterized_dual(n.lp)
+        self.assertRaisesRegex(AssertionError, "already has columns outside its variables",
+                               bb._bound_parameterized_dual, lp)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,103 @@
+from coinor.cuppy.milpInstance import MILPInstance
+import inspect
+from math import isclose
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+from simple_mip_solver import BaseNode, BranchAndBound, PseudoCostBranchNode, solve_many
+from simple_mip_solver.algorithms.solve_many import _model_data, _solve_model
+from test_simple_mip_solver import example_models
+from test_simple_mip_solver.example_models import small_branch, no_branch
+
+
+class TestSolveMany(unittest.TestCase):
+
+    def setUp(self) -> None:
+        fldr_pth = os.path.join(os.path.dirname(os.path.abspath(inspect.getfile(example_models))),
+                                'example_value_functions', 'instance_0')
+        self.files = [os.path.join(fldr_pth, f'evaluation_{i}.mps') for i in range(6)]
+
+    def test_solve_many_fails_asserts(self):
+        self.assertRaisesRegex(AssertionError, 'processes is a positive integer',
+                               solve_many, self.files, processes=1.5)
+        self.assertRaisesRegex(AssertionError, 'max_run_time is positive value',
+                               solve_many, self.files, max_run_time=0)
+        self.assertRaisesRegex(AssertionError, 'total_run_time is positive value',
+                               solve_many, self.files, total_run_time=0)
+        self.assertRaisesRegex(AssertionError, 'cannot be shared across models',
+                               solve_many, self.files, cglp=5)
+
+    def test_solve_many(self):
+        serial = {}
+        for file in self.files:
+            bb = BranchAndBound(MILPInstance(file_name=file), Node=PseudoCostBranchNode,
+                                pseudo_costs={})
+            bb.solve()
+            serial[file] = bb
+
+        for processes in [1, 3]:
+            results = dict(solve_many(self.files, Node=PseudoCostBranchNode,
+                                      processes=processes, pseudo_costs={}))
+            self.assertTrue(set(results) == set(range(len(self.files))))
+            for idx, result in results.items():
+                bb = serial[self.files[idx]]
+                self.assertTrue(result['status'] == bb.status)
+                self.assertTrue(isclose(result['objective_value'], bb.objective_value,
+                                        abs_tol=.01))
+                self.assertTrue(result['evaluated_nodes'] > 0)
+                self.assertTrue(result['stats'].phases['_bound_lp']['calls'] > 0)
+
+    def test_solve_many_with_instances(self):
+        results = dict(solve_many([small_branch, no_branch], processes=2))
+        self.assertTrue(results[0]['objective_value'] == -2)
+        self.assertTrue(results[1]['status'] == 'optimal')
+
+    def test_solve_many_streams(self):
+        # models are read as workers free up, so stopping early skips the rest
+        read = []
+
+        def models():
+            for file in self.files:
+                read.append(file)
+                yield file
+        for idx, result in solve_many(models(), processes=2):
+            break
+        self.assertTrue(len(read) <= 4)
+
+    def test_solve_many_total_run_time(self):
+        with patch('simple_mip_solver.algorithms.solve_many.time') as t, \
+                patch('simple_mip_solver.algorithms.solve_many._solve_model') as sm:
+            # the budget runs out after the first model starts
+            t.time.side_effect = [0, 0, 10]
+            sm.return_value = {}
+            results = list(solve_many(self.files, processes=1, total_run_time=5))
+        self.assertTrue([idx for idx, result in results] == [0])
+        self.assertTrue(sm.call_args[0][3] == 5, 'solves get the deadline, not the time left')
+
+        # solves that waited in a worker's queue past the deadline are skipped
+        results = list(solve_many(self.files, processes=2, total_run_time=.001))
+        self.assertTrue(len(results) < len(self.files))
+
+    def test_model_data(self):
+        data = _model_data(small_branch)
+        self.assertTrue(data['sense'] == ['Min', small_branch.sense])
+        self.assertTrue(_model_data(self.files[0]) == self.files[0])
+        self.assertRaisesRegex(AssertionError, 'models must be MILPInstances or paths',
+                               _model_data, 5)
+
+    def test_solve_model(self):
+        result = _solve_model(_model_data(small_branch), BaseNode, float('inf'),
+                              time.time() + 60, {})
+        self.assertTrue(result['status'] == 'optimal')
+        self.assertTrue(result['objective_value'] == -2)
+        self.assertTrue(result['dual_bound'] <= result['objective_value'])
+
+        # nothing is solved once the deadline has passed
+        self.assertTrue(_solve_model(_model_data(small_branch), BaseNode, float('inf'),
+                                     time.time() - 1, {}) is None)
+
+
+if __name__ == '__main__':
+    unittest.main()
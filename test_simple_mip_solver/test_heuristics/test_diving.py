@@ -0,0 +1,102 @@
+from coinor.cuppy.milpInstance import MILPInstance
+import numpy as np
+import unittest
+
+from simple_mip_solver import BaseNode
+from simple_mip_solver.heuristics.diving import DivingHeuristic, FractionalDiving, \
+    CoefficientDiving, PseudoCostDiving
+from test_simple_mip_solver.example_models import small_branch
+
+
+class TestDivingHeuristic(unittest.TestCase):
+
+    def setUp(self) -> None:
+        # fresh model so diving doesn't change the shared one
+        lp = small_branch.lp
+        self.model = MILPInstance(A=small_branch.A, b=small_branch.b, c=lp.objective,
+                                  l=small_branch.l, u=small_branch.u, sense=['Min', '>='],
+                                  integerIndices=small_branch.integerIndices, numVars=3)
+        self.node = BaseNode(self.model.lp, self.model.integerIndices, idx=0)
+        # solution is [0, 1.25, 1.5] with objective value -2.75
+        self.node.bound(gomory_cuts=False)
+        self.solution = np.array([0, 1.25, 1.5])
+
+    def test_init(self):
+        heuristic = FractionalDiving()
+        self.assertTrue(heuristic.max_iterations == 500)
+        self.assertTrue(heuristic.backtrack)
+        heuristic = FractionalDiving(max_iterations=10, backtrack=False)
+        self.assertTrue(heuristic.max_iterations == 10)
+        self.assertFalse(heuristic.backtrack)
+
+    def test_init_fails_asserts(self):
+        self.assertRaisesRegex(AssertionError, 'max_iterations is a positive integer',
+                               FractionalDiving, max_iterations=0)
+        self.assertRaisesRegex(AssertionError, 'backtrack is boolean',
+                               FractionalDiving, backtrack=1)
+
+    def test_dive(self):
+        lp = self.node.lp
+        for heuristic in [FractionalDiving(), CoefficientDiving(), PseudoCostDiving()]:
+            solution, objective_value, iterations = heuristic.dive(self.node, float('inf'))
+            self.assertTrue(objective_value == -2, 'best is -2 since x1 + x3 <= 1.5')
+            self.assertTrue(np.inner(lp.objective, solution) == objective_value)
+            self.assertTrue(all(solution == np.round(solution)))
+            self.assertTrue(iterations > 0)
+
+            # the node's LP is as it was
+            self.assertTrue(self.node.lp is lp)
+            self.assertTrue(all(lp.variablesLower == 0) and all(lp.variablesUpper == 10))
+            self.assertTrue(all(lp.primalVariableSolution['x'] == self.solution))
+            self.assertTrue(lp.objectiveValue == -2.75 and lp.getStatusCode() == 0)
+            self.assertTrue(all(self.node.solution == self.solution))
+
+    def test_dive_stops(self):
+        # nothing beats an incumbent that is optimal
+        solution, objective_value, _ = FractionalDiving().dive(self.node, -2)
+        self.assertTrue(solution is None and objective_value == float('inf'))
+
+        # out of simplex iterations
+        solution, _, iterations = FractionalDiving(max_iterations=1).dive(self.node,
+                                                                          float('inf'))
+        self.assertTrue(solution is None and iterations == 1)
+
+        # rounding x3 up to 2 is infeasible, and without backtracking the dive ends
+        solution, _, _ = FractionalDiving(backtrack=False).dive(self.node, float('inf'))
+        self.assertTrue(solution is None)
+        self.assertTrue(all(self.node.lp.variablesUpper == 10))
+
+    def test_dive_fails_asserts(self):
+        self.assertRaisesRegex(AssertionError, 'node must be a BaseNode instance',
+                               FractionalDiving().dive, 'node', float('inf'))
+        node = BaseNode(self.model.lp, self.model.integerIndices)
+        self.assertRaisesRegex(AssertionError, 'node must be bounded',
+                               FractionalDiving().dive, node, float('inf'))
+
+    def test_select(self):
+        self.assertRaises(NotImplementedError, DivingHeuristic()._select, self.node,
+                          self.solution, [1, 2])
+
+        # x2 is closest to integer
+        self.assertTrue(FractionalDiving()._select(self.node, self.solution, [1, 2]) ==
+                        (1, 'left'))
+
+        # constraints are -x1 - x3 >= -1.5 and -x2 >= -1.25, so only increasing locks
+        locks = CoefficientDiving()._prepare(self.node)['locks']
+        self.assertTrue(all(locks['left'] == [0, 0, 0]) and all(locks['right'] == [1, 1, 1]))
+        locks = {'left': np.array([0, 2, 0]), 'right': np.array([0, 1, 1])}
+        self.assertTrue(CoefficientDiving()._select(self.node, self.solution, [1, 2],
+                                                    locks=locks) == (2, 'left'))
+
+        # unknown directions average to 4 down and 1 up, so rounding x3 down
+        # costs 2 and up .5, the biggest ratio
+        pseudo_costs = {1: {'left': {'cost': 4, 'times': 1}, 'right': {'cost': 1, 'times': 1}}}
+        self.assertTrue(PseudoCostDiving()._select(self.node, self.solution, [1, 2],
+                                                   pseudo_costs=pseudo_costs) == (2, 'right'))
+        # without pseudo costs, the variable closest to integer rounds to it
+        self.assertTrue(PseudoCostDiving()._select(self.node, self.solution, [1, 2]) ==
+                        (1, 'left'))
+
+
+if __name__ == '__main__':
+    unittest.main()
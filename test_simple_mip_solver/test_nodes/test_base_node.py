@@ -1,6 +1,7 @@
 import re
 
 from coinor.cuppy.milpInstance import MILPInstance
+from cylp.cy.CyClpSimplex import CyClpSimplex
 from cylp.py.modeling.CyLPModel import CyLPArray
 # so pulp and pyomo don't believe reading in flat files is a worthwhile feature
 # so we don't have much of an option here but to use some sort of commercial solver
@@ -10,14 +11,18 @@ except ImportError:
     gu = None
 from math import isclose
 import numpy as np
+import pickle
 from queue import PriorityQueue
 import unittest
 from unittest.mock import patch, PropertyMock
 
 from simple_mip_solver import BaseNode
 from simple_mip_solver.algorithms.base_algorithm import BaseAlgorithm
+from simple_mip_solver.nodes import base_node
+from simple_mip_solver.nodes.base_node import shutdown_strong_branch_pool
+from simple_mip_solver.utils.lp_data import get_lp_data, sharing_coefs, variable_bounds
 from test_simple_mip_solver.example_models import no_branch, small_branch, \
-    infeasible, random, unbounded, cut2, cut1, small_branch_copy, cut3, small_branch_max
+    infeasible, random, unbounded, cut2, cut1, small_branch_copy, cut3, small_branch_max, h3p1
 from test_simple_mip_solver.helpers import TestModels
 
 
@@ -403,8 +408,23 @@ class TestBaseNode(TestModels):
         self.assertFalse(node.cut_generation_dual_bound)
         self.assertFalse(node.tracked_cut_generation_iterations)
 
+    def test_bound_lp_records_stats(self):
+        node = BaseNode(self.small_branch_std.lp, self.small_branch_std.integerIndices)
+        node._bound_lp()
+        stats = node.stats.phases['_bound_lp']
+        self.assertTrue(stats['calls'] == 1)
+        self.assertTrue(stats['time'] >= 0)
+        self.assertTrue(stats['simplex_iterations'] == node.lp.iteration)
+
+        # strong branching counts its base branch and its iterations
+        node._strong_branch(node._most_fractional_index, iterations=5)
+        self.assertTrue(node.stats.phases['_strong_branch']['calls'] == 1)
+        self.assertTrue(node.stats.phases['_base_branch']['calls'] == 1)
+        self.assertTrue(node.stats.phases['_strong_branch']['simplex_iterations'] <= 10)
+
     def test_bound_lp_fractional(self):
         node = BaseNode(self.small_branch_std.lp, self.small_branch_std.integerIndices)
+        node.keep_reduced_costs = True
         node._bound_lp(track_dual_bound=True)
         self.assertTrue(node.objective_value == -2.75)
         self.assertTrue(all(node.solution == [0, 1.25, 1.5]))
@@ -414,6 +434,12 @@ class TestBaseNode(TestModels):
         self.assertFalse(node.unbounded)
         self.assertTrue(node.cut_generation_dual_bound == {0: -2.75})
         self.assertTrue(node.tracked_cut_generation_iterations == 0)
+        self.assertTrue(all(node.reduced_costs == [0, 0, 0]))
+
+        # reduced costs are only kept when asked for
+        node = BaseNode(self.small_branch_std.lp, self.small_branch_std.integerIndices)
+        node._bound_lp()
+        self.assertTrue(node.reduced_costs is None)
 
     def test_bound_lp_infeasible(self):
         node = BaseNode(infeasible.lp, infeasible.integerIndices)
@@ -423,6 +449,7 @@ class TestBaseNode(TestModels):
         self.assertFalse(node.mip_feasible)
         self.assertFalse(node.unbounded)
         self.assertTrue(node.solution is None)
+        self.assertTrue(node.reduced_costs is None)
         self.assertTrue(node.objective_value == float('inf'))
         self.assertFalse(node.cut_generation_dual_bound)
         self.assertFalse(node.tracked_cut_generation_iterations)
@@ -535,16 +562,17 @@ class TestBaseNode(TestModels):
         node._bound_lp()
 
         with patch.object(node, '_find_gomory_cuts') as fgc, \
-                patch('simple_mip_solver.nodes.base_node.numerically_safe_cut') as nsc, \
+                patch('simple_mip_solver.nodes.base_node.numerically_safe_cuts') as nsc, \
                 patch.object(node, '_update_gmic_counts') as ugc:
-            fgc.return_value = {0: (CyLPArray([0, -1, 0]), -2)}
-            nsc.return_value = (CyLPArray([0, -1, 0]), -2)
+            fgc.return_value = (np.array([0]), np.array([[0, -1, 0]]), np.array([-2]))
+            nsc.return_value = (np.array([[0, -1, 0]]), np.array([-2]))
 
             cut_pool = node._generate_cuts(gomory_cuts=True)
             self.assertTrue(fgc.called)
-            self.assertTrue(all(nsc.call_args.kwargs['pi'] == CyLPArray([0, -1, 0])))
-            self.assertTrue(nsc.call_args.kwargs['pi0'] == -2)
+            self.assertTrue((nsc.call_args.kwargs['pis'] == [[0, -1, 0]]).all())
+            self.assertTrue(all(nsc.call_args.kwargs['pi0s'] == [-2]))
             self.assertTrue(nsc.call_args.kwargs['estimate'] == 'over')
+            self.assertTrue(isinstance(cut_pool['cut_gomory_0_0_0'][0], CyLPArray))
             self.assertTrue(all(cut_pool['cut_gomory_0_0_0'][0] == CyLPArray([0, -1, 0])))
             self.assertTrue(cut_pool['cut_gomory_0_0_0'][1] == -2)
             self.assertTrue(ugc.called)
@@ -627,6 +655,20 @@ class TestBaseNode(TestModels):
             self.assertFalse(node.cut_pool)
             self.assertTrue(node.cut_generation_terminator == 'no cuts')
 
+    def test_select_cuts_parallel(self):
+        cuts = {
+            'cut_1': (CyLPArray([-1, 0, -1]), -1),  # keep
+            'cut_2': (CyLPArray([-2, 0, -2]), -2.5),  # pick off for same direction as cut_1
+            'cut_3': (CyLPArray([1, 0, 1]), 2),  # keep since opposite cut_1
+            'cut_4': (CyLPArray([-1, -1e-4, -1]), -1.1)  # pick off for within 10 degrees of cut_1
+        }
+        node = BaseNode(self.small_branch_std.lp, self.small_branch_std.integerIndices)
+        node._bound_lp()
+        node.cut_pool = cuts
+        added_cuts = node._select_cuts()
+        self.assertTrue(set(added_cuts.keys()) == {'cut_1', 'cut_3'})
+        self.assertTrue(set(node.cut_pool.keys()) == {'cut_2', 'cut_4'})
+
     def test_select_cuts_different_tolerances(self):
         cuts = {
             'cut_1': (CyLPArray([-1, -1, -1]), -2),  # option to pick off for too many nonzero
@@ -654,16 +696,21 @@ class TestBaseNode(TestModels):
     def test_find_gomory_cuts(self):
         node = BaseNode(lp=self.cut3_std.lp, integer_indices=self.cut3_std.integerIndices)
         node._bound_lp()
-        cuts = node._find_gomory_cuts()
-        self.assertTrue(len(cuts) == 1)
-        self.assertTrue(np.max(np.abs(cuts[0][0] - np.array([-5, -10]))) < .0001)
-        self.assertTrue(isclose(cuts[0][1], -5, abs_tol=.01))
+        rows, coefs, rhs = node._find_gomory_cuts()
+        self.assertTrue(coefs.shape == (1, 2) and list(rows) == [0])
+        self.assertTrue(np.max(np.abs(coefs[0] - np.array([-5, -10]))) < .0001)
+        self.assertTrue(isclose(rhs[0], -5, abs_tol=.01))
 
         mock_pth = 'simple_mip_solver.nodes.base_node.BaseNode.basic_variable_indices'
         with patch(mock_pth, new_callable=PropertyMock) as bvi:
             bvi.return_value = [0, 1]
-            cuts = node._find_gomory_cuts()
-            self.assertFalse(cuts)
+            rows, coefs, rhs = node._find_gomory_cuts()
+            self.assertTrue(len(rows) == 0 and coefs.shape == (0, 2) and len(rhs) == 0)
+
+        # integer feasible solutions make no cuts
+        node.solution = np.round(node.solution)
+        rows, coefs, rhs = node._find_gomory_cuts()
+        self.assertTrue(len(rows) == 0 and coefs.shape == (0, 2) and len(rhs) == 0)
 
     def test_tableau(self):
         node = BaseNode(lp=self.cut3_std.lp, integer_indices=self.cut3_std.integerIndices)
@@ -678,6 +725,38 @@ class TestBaseNode(TestModels):
             bvi.return_value = [0, 1]
             self.assertFalse(node.tableau)
 
+    def test_tableau_rows(self):
+        node = BaseNode(lp=self.cut3_std.lp, integer_indices=self.cut3_std.integerIndices)
+        node._bound_lp()
+        tableau = node.tableau
+        rows = node.tableau_rows([2, 0])
+        self.assertTrue(np.max(abs(rows - tableau[[2, 0]])) < .0001)
+        self.assertTrue(node.tableau_rows([]).shape == (0, 5))
+
+        # rows are kept until the basis changes
+        factorization = node._factorization
+        self.assertTrue(set(factorization['rows']) == {0, 1, 2})
+        with patch('simple_mip_solver.nodes.base_node.splu') as lu:
+            node.tableau_rows([1])
+            self.assertFalse(lu.called)
+        self.assertTrue(node._factorization is factorization)
+        node._bound_lp()
+        self.assertTrue(node._factorization is None)
+        node.lp.addConstraint(CyLPArray([1, 1]) * node.lp.getVarByName('x') >= 1, 'cut_1')
+        node._bound_lp()
+        self.assertTrue(node.tableau_rows([0]).shape == (1, 6))
+        self.assertFalse(node._factorization['rows'].keys() & {1, 2})
+
+        # factorizations don't get pickled
+        self.assertTrue(pickle.loads(pickle.dumps(node))._factorization is None)
+
+        # singular bases have no tableau
+        node._factorization = None
+        with patch('simple_mip_solver.nodes.base_node.splu') as lu:
+            lu.side_effect = RuntimeError('Factor is exactly singular')
+            self.assertTrue(node.tableau_rows([0]) is None)
+            self.assertFalse(len(node._find_gomory_cuts()[0]))
+
     def test_basic_variable_indices(self):
         node = BaseNode(lp=self.cut3_std.lp, integer_indices=self.cut3_std.integerIndices)
         node._bound_lp()
@@ -723,6 +802,7 @@ class TestBaseNode(TestModels):
             for name, n in rtn.items():
                 if name not in ['left', 'right']:
                     continue
+                self.assertTrue(n._lp is None, 'lp should not be built until accessed')
                 self.assertTrue(all(n.lp.matrix.elements == node.lp.matrix.elements))
                 self.assertTrue(all(n.lp.objective == node.lp.objective))
                 self.assertTrue(all(n.lp.constraintsLower == node.lp.constraintsLower))
@@ -762,6 +842,195 @@ class TestBaseNode(TestModels):
         node._base_branch(2, 1)
         self.assertTrue(node.children == (1, 2))
 
+    def test_base_branch_shares_lp_data(self):
+        node = BaseNode(self.small_branch_std.lp, self.small_branch_std.integerIndices)
+        node.bound(gomory_cuts=False)
+        A = node.lp.constraints[0].varCoefs[node.lp.getVarByName('x')]
+        rtn = node._base_branch(2, 1)
+        left, right = rtn['left']._lp_data, rtn['right']._lp_data
+
+        # children keep only the bound they branched on, sharing the rest
+        self.assertTrue(left['bound_change'] == (2, 0, 1))
+        self.assertTrue(right['bound_change'] == (2, 2, 10))
+        for key in ['variables_lower', 'variables_upper', 'basis', 'objective']:
+            self.assertTrue(left[key] is right[key])
+        self.assertTrue(all(left['variables_upper'] == 10), "the parent's bounds are kept")
+
+        # and both rebuild from the parent's coefficients
+        for child in [rtn['left'], rtn['right']]:
+            self.assertTrue(get_lp_data(child.lp)['constraints'][0][1] is A)
+
+    def test_init_with_lp_data(self):
+        lp = self.small_branch_std.lp
+        node = BaseNode(get_lp_data(lp), self.small_branch_std.integerIndices)
+        self.assertTrue(node._lp is None and node._lp_data)
+        self.assertTrue(node._sense == '>=')
+        self.assertTrue(node._variables_nonnegative)
+        self.assertTrue(node._x_only_variable)
+        self.assertTrue(node.max_term == 1)
+        self.assertTrue(node._lp is None, 'checks should not build the lp')
+
+        # lp is built on first access
+        self.assertTrue(isinstance(node.lp, CyClpSimplex))
+        self.assertTrue(node._lp_data is None)
+        self.assertTrue(all(node.lp.constraintsLower == lp.constraintsLower))
+        node.bound(gomory_cuts=False)
+        self.assertTrue(node.objective_value == -2.75)
+
+        # asserts check the data too
+        lp_data = get_lp_data(lp)
+        lp_data['variables_lower'] = np.array([-1., 0, 0])
+        self.assertRaisesRegex(AssertionError, 'must have x >= 0 for all variables',
+                               BaseNode, lp_data, self.small_branch_std.integerIndices)
+        self.assertRaisesRegex(AssertionError, 'branch val should be within 1 of both bounds',
+                               BaseNode, get_lp_data(lp), self.small_branch_std.integerIndices,
+                               b_idx=0, b_dir='left', b_val=20)
+
+    def test_release_lp(self):
+        node = BaseNode(self.small_branch_std.lp, self.small_branch_std.integerIndices)
+        node.bound(gomory_cuts=False)
+        basis = node.lp.getBasisStatus()
+        node.release_lp()
+        self.assertTrue(node._lp is None and node._lp_data)
+        node.release_lp()  # nothing to release twice
+        self.assertTrue(node._lp_data)
+        self.assertTrue(node.lp.objectiveValue == node.objective_value)
+        for i in [0, 1]:
+            self.assertTrue(all(node.lp.getBasisStatus()[i] == basis[i]))
+
+    def test_pass_lp(self):
+        node = BaseNode(self.small_branch_std.lp, self.small_branch_std.integerIndices, idx=0)
+        node.bound(gomory_cuts=False)
+        children = node.branch(next_node_idx=1)
+        lp = node.lp
+        upper = variable_bounds(children['left']._lp_data)[1]
+        node.pass_lp(children['left'])
+        self.assertTrue(children['left'].lp is lp, 'child should reuse the LP')
+        self.assertTrue(node._lp is None and node._lp_data, 'parent keeps its lp data')
+        self.assertTrue(all(lp.variablesUpper == upper), "LP should have the child's bounds")
+        children['left'].bound(gomory_cuts=False)
+        self.assertTrue(children['left'].lp_feasible)
+        self.assertTrue(node.lp.objectiveValue == node.objective_value,
+                        'parent rebuilds its own LP when accessed again')
+
+    def test_pass_lp_fails_asserts(self):
+        node = BaseNode(self.small_branch_std.lp, self.small_branch_std.integerIndices, idx=0)
+        node.bound(gomory_cuts=False)
+        children = node.branch(next_node_idx=1)
+        children['right'].lp  # build the child's LP
+        self.assertRaisesRegex(AssertionError, 'child must not have built its LP yet',
+                               node.pass_lp, children['right'])
+        other = BaseNode(self.small_branch_std.lp, self.small_branch_std.integerIndices, idx=5)
+        other.bound(gomory_cuts=False)
+        self.assertRaisesRegex(AssertionError, 'child must have been branched from this node',
+                               other.pass_lp, children['left'])
+        node.release_lp()
+        self.assertRaisesRegex(AssertionError, 'must have a built LP to pass on',
+                               node.pass_lp, children['left'])
+
+    def test_reduced_cost_bounds(self):
+        model = MILPInstance(A=h3p1.A, b=h3p1.b, c=h3p1.lp.objective, l=h3p1.l, u=h3p1.u,
+                             sense=['Min', '>='], integerIndices=h3p1.integerIndices,
+                             numVars=6)
+        node = BaseNode(model.lp, model.integerIndices)
+        node.keep_reduced_costs = True
+        node.bound(gomory_cuts=False)
+        # solution is [1.75, 0, ...] with objective value 1.75 and integer indices 0, 1, 3
+        self.assertTrue(all(node.reduced_costs == [0, 1.5, 7, 5, 2.5, 4.5]))
+
+        lower, upper = node.reduced_cost_bounds(5)
+        self.assertTrue(all(lower == -float('inf')))
+        # x_1 can grow by 3.25 / 1.5 and x_3 by 3.25 / 5. x_0 is basic and
+        # x_2 is continuous, so neither is bounded
+        self.assertTrue(all(upper == [float('inf'), 2, float('inf'), 0, float('inf'),
+                                      float('inf')]))
+
+        # a solution as good as the incumbent is never cut off
+        lower, upper = node.reduced_cost_bounds(1.75 + 5)
+        self.assertTrue(upper[3] == 1)
+
+        lower, upper = node.reduced_cost_bounds(float('inf'))
+        self.assertTrue(all(lower == -float('inf')) and all(upper == float('inf')))
+
+        # variables at their upper bound with negative reduced costs get lower bounds
+        node = BaseNode(self.small_branch_std.lp, self.small_branch_std.integerIndices)
+        node.bound(gomory_cuts=False)
+        node.reduced_costs = np.array([0, -1, 0])
+        node.solution = np.array([0, 3, 1.5])
+        lower, upper = node.reduced_cost_bounds(-1.25)
+        self.assertTrue(all(lower == [-float('inf'), 2, -float('inf')]))
+        self.assertTrue(all(upper == float('inf')))
+
+    def test_reduced_cost_bounds_fails_asserts(self):
+        node = BaseNode(infeasible.lp, infeasible.integerIndices)
+        node.bound(gomory_cuts=False)
+        self.assertRaisesRegex(AssertionError, 'must have a feasible LP relaxation',
+                               node.reduced_cost_bounds, 5)
+
+    def test_tighten_bounds(self):
+        node = BaseNode(self.small_branch_std.lp, self.small_branch_std.integerIndices, idx=0)
+        node.bound(gomory_cuts=False)
+        children = node.branch(next_node_idx=1)
+        left, right = children['left'], children['right']
+        lower = np.array([1, -float('inf'), -float('inf')])
+        upper = np.array([float('inf'), 20, 0])
+
+        # open nodes tighten their lp data without building an LP
+        lp_data = left._lp_data
+        self.assertTrue(left.tighten_bounds(lower, upper) == 2)
+        self.assertTrue(left._lp is None)
+        self.assertTrue(all(left._lp_data['variables_lower'] == [1, 0, 0]))
+        self.assertTrue(all(left._lp_data['variables_upper'] == [10, 10, 0]))
+        self.assertTrue(all(lp_data['variables_lower'] == 0), 'lp data is replaced, not edited')
+        self.assertTrue(left.tighten_bounds(lower, upper) == 0, 'nothing left to tighten')
+
+        # built LP's are changed in place
+        lp = right.lp
+        self.assertTrue(right.tighten_bounds(lower, upper) == 2)
+        self.assertTrue(right.lp is lp)
+        self.assertTrue(all(lp.variablesLower == [1, 0, 2]))
+        self.assertTrue(all(lp.variablesUpper == [10, 10, 0]))
+        right.bound(gomory_cuts=False)
+        self.assertFalse(right.lp_feasible, 'x_3 >= 2 and x_3 <= 0 is infeasible')
+
+    def test_tighten_bounds_fails_asserts(self):
+        node = BaseNode(self.small_branch_std.lp, self.small_branch_std.integerIndices)
+        self.assertRaisesRegex(AssertionError, 'need a bound for each variable',
+                               node.tighten_bounds, np.zeros(2), np.ones(2))
+
+    def test_pickle(self):
+        node = BaseNode(self.small_branch_std.lp, self.small_branch_std.integerIndices, idx=0)
+        node.bound(gomory_cuts=False)
+        state = node.__getstate__()
+        self.assertTrue(state['_lp'] is None and state['_lp_data'])
+        self.assertTrue(node._lp is not None, 'pickling should not drop our own lp')
+
+        copy = pickle.loads(pickle.dumps(node))
+        self.assertTrue(copy._lp is None, 'lp should not be rebuilt until used')
+        self.assertTrue(copy.objective_value == node.objective_value)
+        self.assertTrue(all(copy.solution == node.solution))
+        self.assertTrue(copy.lp.getStatusCode() == 0)
+        self.assertTrue(copy._lp_data is None)
+        self.assertTrue(all(copy.lp.primalVariableSolution['x'] == node.solution))
+        for i in [0, 1]:
+            self.assertTrue(all(copy.lp.getBasisStatus()[i] == node.lp.getBasisStatus()[i]))
+
+        # children can be pickled before they are bound too
+        rtn = node._base_branch(2, 1)
+        copy = pickle.loads(pickle.dumps(rtn['left']))
+        self.assertTrue(all(copy.lp.variablesUpper == [10, 10, 1]))
+        copy.bound(gomory_cuts=False)
+        self.assertTrue(copy.lp_feasible)
+
+        # while their coefficients are shared, nodes are pickled with just a key to them
+        A = get_lp_data(node.lp)['constraints'][0][1]
+        with sharing_coefs({'A': A}):
+            data = pickle.dumps(rtn['right'])
+            copy = pickle.loads(data)
+        self.assertTrue(len(data) < len(pickle.dumps(rtn['right'])))
+        self.assertTrue(copy._lp_data['constraints'][0][1] is A)
+        self.assertTrue(all(copy.lp.variablesLower == [0, 0, 2]))
+
     def test_strong_branch_fails_asserts(self):
         node = BaseNode(self.small_branch_std.lp, self.small_branch_std.integerIndices, 0)
         node.bound()
@@ -794,6 +1063,151 @@ class TestBaseNode(TestModels):
             rtn = node._strong_branch(idx, iterations=iters)
             self.assertTrue(bb.called)
 
+    def test_strong_branch_children(self):
+        node = BaseNode(random.lp, random.integerIndices, 0)
+        node.bound(gomory_cuts=False)
+        lp = node.lp
+        fractional = [i for i in node._integer_indices if node._is_fractional(node.solution[i])]
+        rtn = node._strong_branch(fractional[0], iterations=5)
+        node._strong_branch(fractional[1], iterations=5)
+        self.assertTrue(set(node.strong_branch_children) == set(fractional[:2]))
+
+        # the children's LP's are kept where strong branching left them
+        saved = node.strong_branch_children[fractional[0]]
+        for direction, child in rtn.items():
+            self.assertTrue(child.lp.maxNumIteration > 5, 'iteration limit is put back')
+            self.assertTrue(saved[direction]['status'] == -1)
+            for i in [0, 1]:
+                self.assertTrue(all(saved[direction]['basis'][i] ==
+                                    child.lp.getBasisStatus()[i]))
+
+        # strong branching an index again starts from this node's basis, not theirs
+        again = node._strong_branch(fractional[0], iterations=5)
+        for direction, child in again.items():
+            self.assertTrue(child.lp.iteration == rtn[direction].lp.iteration)
+            self.assertTrue(child.lp.objectiveValue == rtn[direction].lp.objectiveValue)
+        saved = node.strong_branch_children[fractional[0]]
+
+        # and branching on the index starts its children from there
+        children = node._base_branch(fractional[0], next_node_idx=1)
+        self.assertFalse(node.strong_branch_children)
+        self.assertTrue(children['left'].idx == 1 and children['left'].lineage == (0, 1))
+        for direction in ['left', 'right']:
+            self.assertTrue(children[direction]._lp_data is saved[direction])
+            children[direction].bound(gomory_cuts=False)
+            fresh = node._base_branch(fractional[0])[direction]
+            fresh.bound(gomory_cuts=False)
+            self.assertTrue(children[direction].lp_feasible == fresh.lp_feasible)
+            self.assertTrue(isclose(children[direction].objective_value, fresh.objective_value,
+                                    abs_tol=1e-6))
+        self.assertTrue(node.lp is lp)
+
+        # strong branching an index again starts from this node's basis
+        node._strong_branch(fractional[0], iterations=5)
+        children = node._base_branch(fractional[0])
+        node._strong_branch(fractional[0], iterations=5)
+        for i in [0, 1]:
+            self.assertTrue(all(node.strong_branch_children[fractional[0]]['left']['basis'][i]
+                                == children['left']._lp_data['basis'][i]))
+
+        # they're dropped with the LP and when pickled
+        self.assertFalse(pickle.loads(pickle.dumps(node)).strong_branch_children)
+        node.release_lp()
+        self.assertFalse(node.strong_branch_children)
+
+    def test_pass_lp_strong_branch_children(self):
+        node = BaseNode(random.lp, random.integerIndices, idx=0)
+        node.bound(gomory_cuts=False)
+        idx = node._most_fractional_index
+        node._strong_branch(idx, iterations=1)
+        basis = node.strong_branch_children[idx]['left']['basis']
+        children = node._base_branch(idx, next_node_idx=1)
+        node.pass_lp(children['left'])
+        for i in [0, 1]:
+            self.assertTrue(all(children['left'].lp.getBasisStatus()[i] == basis[i]))
+
+    def test_strong_branch_in_parallel_fails_asserts(self):
+        node = BaseNode(random.lp, random.integerIndices, idx=0)
+        node.bound(gomory_cuts=False)
+        integer = [i for i in node._integer_indices if not node._is_fractional(node.solution[i])]
+        executor = node._strong_branch_pool(1)
+        self.assertRaisesRegex(AssertionError, 'iterations must be positive integer',
+                               node._strong_branch_in_parallel, [1], executor, 0)
+        self.assertRaisesRegex(AssertionError, 'must strong branch on fractional integer',
+                               node._strong_branch_in_parallel, integer[:1], executor)
+        unbounded_node = BaseNode(random.lp, random.integerIndices, idx=1)
+        self.assertRaisesRegex(AssertionError, 'must solve before strong branching',
+                               unbounded_node._strong_branch_in_parallel, [1], executor)
+        shutdown_strong_branch_pool()
+        self.assertRaisesRegex(AssertionError, 'processes is a positive integer',
+                               node._strong_branch_pool, 0)
+
+    def test_strong_branch_pool(self):
+        node = BaseNode(random.lp, random.integerIndices, idx=0)
+        other = BaseNode(small_branch_copy.lp, small_branch_copy.integerIndices, idx=1)
+        with patch('simple_mip_solver.nodes.base_node.ProcessPoolExecutor') as ppe:
+            # every node in this process shares the pool
+            executor = node._strong_branch_pool(2)
+            self.assertTrue(other._strong_branch_pool(2) is executor)
+            self.assertTrue(ppe.call_count == 1)
+
+            # until a different number of processes is asked for
+            self.assertTrue(other._strong_branch_pool(3) is not None)
+            self.assertTrue(ppe.call_count == 2)
+            self.assertTrue(executor.shutdown.called)
+
+            # or it is shut down
+            executor = base_node._strong_branch_executor[3]
+            shutdown_strong_branch_pool()
+            self.assertTrue(executor.shutdown.called)
+            self.assertTrue(base_node._strong_branch_executor is None)
+            node._strong_branch_pool(3)
+            self.assertTrue(ppe.call_count == 3)
+
+            # pools inherited from a parent process are left to it
+            executor = base_node._strong_branch_executor[3]
+            executor.shutdown.reset_mock()
+            base_node._strong_branch_executor = (-1, 3, executor)
+            node._strong_branch_pool(3)
+            self.assertFalse(executor.shutdown.called)
+            self.assertTrue(ppe.call_count == 4)
+            shutdown_strong_branch_pool()
+
+    def test_strong_branch_in_parallel(self):
+        node = BaseNode(random.lp, random.integerIndices, idx=0)
+        node.bound(gomory_cuts=False)
+        fractional = [i for i in node._integer_indices if node._is_fractional(node.solution[i])]
+        rtn = node._strong_branch_in_parallel(fractional, node._strong_branch_pool(2),
+                                              iterations=5)
+        parallel_children = node.strong_branch_children
+        self.assertTrue(set(rtn) == set(parallel_children) == set(fractional))
+        self.assertTrue(node.stats.phases['_strong_branch_in_parallel']['simplex_iterations'] ==
+                        sum(r['iterations'] for d in rtn.values() for r in d.values()))
+
+        # matches strong branching each index here
+        for idx in fractional:
+            nodes = node._strong_branch(idx, iterations=5)
+            for direction, n in nodes.items():
+                self.assertTrue(rtn[idx][direction]['status'] == n.lp.getStatusCode())
+                self.assertTrue(rtn[idx][direction]['objective_value'] == n.lp.objectiveValue)
+                self.assertTrue(rtn[idx][direction]['iterations'] == n.lp.iteration)
+                saved = node.strong_branch_children[idx][direction]
+                parallel = parallel_children[idx][direction]
+                for a, b in zip([*variable_bounds(parallel), *parallel['basis']],
+                                [*variable_bounds(saved), *saved['basis']]):
+                    self.assertTrue(np.all(a == b))
+                self.assertTrue(parallel_children[idx][direction]['status'] == -1)
+
+        # the same pool then strong branches from the next node's LP
+        child = node.branch()['left']
+        child.bound(gomory_cuts=False)
+        fractional = [i for i in child._integer_indices if child._is_fractional(child.solution[i])]
+        rtn = child._strong_branch_in_parallel(fractional, child._strong_branch_pool(2))
+        shutdown_strong_branch_pool()
+        for idx in fractional:
+            for direction, n in child._strong_branch(idx, iterations=5).items():
+                self.assertTrue(rtn[idx][direction]['objective_value'] == n.lp.objectiveValue)
+
     def test_is_fractional_fails_asserts(self):
         node = BaseNode(self.small_branch_std.lp, self.small_branch_std.integerIndices, 0)
         self.assertRaisesRegex(AssertionError, 'value should be a number',
@@ -1,9 +1,10 @@
 from itertools import product
+import numpy as np
 import unittest
 from unittest.mock import patch
 
-from simple_mip_solver.nodes.branch.pseudo_cost import PseudoCostBranchNode
-from test_simple_mip_solver.example_models import small_branch_copy
+from simple_mip_solver.nodes.branch.pseudo_cost import PseudoCostBranchNode, rounding_costs
+from test_simple_mip_solver.example_models import small_branch_copy, random
 
 from test_simple_mip_solver.helpers import TestModels
 
@@ -18,12 +19,15 @@ class TestNode(TestModels):
         self.assertTrue(node.branch_method == 'pseudo cost')
         self.assertFalse(node.pseudo_costs, 'should exist but be none')
         self.assertFalse(node.strong_branch_iters, 'should exist but be none')
+        self.assertTrue(node.strong_branch_processes == 1)
 
     def test_bound_fails_assertions(self):
         pc = {1: 'hi'}
         node = PseudoCostBranchNode(small_branch_copy.lp, small_branch_copy.integerIndices)
         self.assertRaisesRegex(AssertionError, 'pseudo cost dict has following errors:',
                                node.bound, pc)
+        self.assertRaisesRegex(AssertionError, 'strong_branch_processes is a positive integer',
+                               node.bound, {}, strong_branch_processes=0)
 
     def test_bound(self):
         node = PseudoCostBranchNode(small_branch_copy.lp, small_branch_copy.integerIndices)
@@ -104,6 +108,60 @@ class TestNode(TestModels):
             self.assertTrue(sb.call_count == 1)
             self.assertTrue(cc.call_count == 3)
 
+    def test_update_pseudo_costs_keeps_best_children(self):
+        node = PseudoCostBranchNode(random.lp, random.integerIndices, idx=0)
+        node.bound({}, gomory_cuts=False)
+        # every fractional index was strong branched but only the best is kept
+        best_idx = node._best_pseudo_costs_index(node.pseudo_costs)
+        self.assertTrue(len(node.pseudo_costs) > 1)
+        self.assertTrue(set(node.strong_branch_children) == {best_idx})
+
+        # which branch uses
+        saved = node.strong_branch_children[best_idx]
+        rtn = node.branch(node.pseudo_costs, next_node_idx=1)
+        self.assertTrue(rtn['left']._b_idx == best_idx)
+        self.assertTrue(rtn['left']._lp_data is saved['left'])
+        self.assertTrue(rtn['right']._lp_data is saved['right'])
+        self.assertFalse(node.strong_branch_children)
+
+    def test_update_pseudo_costs_in_parallel(self):
+        nodes = {}
+        for processes in [1, 2]:
+            nodes[processes] = PseudoCostBranchNode(random.lp, random.integerIndices, idx=0)
+            nodes[processes].bound({}, strong_branch_processes=processes, gomory_cuts=False)
+        self.assertTrue('_strong_branch_in_parallel' in nodes[2].stats.phases)
+        self.assertFalse('_strong_branch' in nodes[2].stats.phases)
+
+        # strong branching in other processes gives the same pseudo costs and children
+        self.assertTrue(nodes[1].pseudo_costs == nodes[2].pseudo_costs)
+        self.assertTrue(set(nodes[1].strong_branch_children) ==
+                        set(nodes[2].strong_branch_children))
+        for idx, children in nodes[1].strong_branch_children.items():
+            for direction, lp_data in children.items():
+                for i in [0, 1]:
+                    self.assertTrue(all(nodes[2].strong_branch_children[idx][direction]['basis'][i]
+                                        == lp_data['basis'][i]))
+
+        # with one index to strong branch on no pool is started
+        node = PseudoCostBranchNode(small_branch_copy.lp, small_branch_copy.integerIndices)
+        node.bound({1: {'right': {'cost': 1, 'times': 1}, 'left': {'cost': 1, 'times': 1}}},
+                   strong_branch_processes=2, gomory_cuts=False)
+        self.assertTrue(set(node.pseudo_costs) == {1, 2})
+        self.assertFalse('_strong_branch_in_parallel' in node.stats.phases)
+
+    def test_calculate_strong_branch_costs(self):
+        node = PseudoCostBranchNode(small_branch_copy.lp, small_branch_copy.integerIndices)
+        node.pseudo_costs = {}
+        node._base_bound(gomory_cuts=False)
+        node.solution = [0, 1.25, 2.5]
+        node.objective_value = -1
+        node._calculate_strong_branch_costs(1, {
+            'right': {'status': 0, 'objective_value': 2, 'iterations': 1},
+            'left': {'status': 1, 'objective_value': 5, 'iterations': 0}})
+        self.assertTrue(node.pseudo_costs[1]['right'] == {'cost': 4, 'times': 1})
+        self.assertTrue(node.pseudo_costs[1]['left'] == {'cost': 0, 'times': 1},
+                        'infeasible strong branches add no cost')
+
     def test_calculate_costs(self):
         node = PseudoCostBranchNode(small_branch_copy.lp, small_branch_copy.integerIndices)
         node.pseudo_costs = {}
@@ -222,6 +280,21 @@ class TestNode(TestModels):
     # node type to use in base_test_models
     Node = PseudoCostBranchNode
 
+    def test_rounding_costs(self):
+        solution = np.array([1, .25, 1.5])
+        pc = {1: {'left': {'cost': 4, 'times': 2}, 'right': {'cost': 8, 'times': 0}}}
+        costs = rounding_costs(pc, solution, [1, 2])
+        self.assertTrue(set(costs) == {1, 2}, 'only the given indices have costs')
+        self.assertTrue(costs[1] == {'left': 1, 'right': 0},
+                        'costs never updated are unknown, and there are none to average')
+        self.assertTrue(costs[2] == {'left': 2, 'right': 0},
+                        'unknown costs are the average of known ones')
+
+        # directions with no known costs at all use the default
+        costs = rounding_costs(pc, solution, [1, 2], default=1)
+        self.assertTrue(costs[1] == {'left': 1, 'right': .75})
+        self.assertTrue(costs[2] == {'left': 2, 'right': .5})
+
     def test_models(self):
         self.base_test_models()
 
@@ -0,0 +1,223 @@
+from cylp.cy.CyClpSimplex import CyLPArray
+from math import isclose
+import numpy as np
+import unittest
+from unittest.mock import patch
+
+from simple_mip_solver import BaseNode, BranchAndBound
+from simple_mip_solver.nodes.branch.reliability import ReliabilityBranchNode
+from simple_mip_solver.utils.lp_data import build_milp
+from test_simple_mip_solver.example_models import small_branch_copy, random
+
+from test_simple_mip_solver.helpers import TestModels
+
+
+class TestNode(TestModels):
+
+    def make_node(self, model=small_branch_copy, pseudo_costs=None, **kwargs):
+        node = ReliabilityBranchNode(model.lp, model.integerIndices)
+        node.pseudo_costs = {} if pseudo_costs is None else pseudo_costs
+        node.strong_branch_iters = 5
+        node.strong_branch_processes = kwargs.get('strong_branch_processes', 1)
+        node.reliability_threshold = kwargs.get('reliability_threshold', 8)
+        node.max_strong_branch_candidates = kwargs.get('max_strong_branch_candidates', 100)
+        node.strong_branch_lookahead = kwargs.get('strong_branch_lookahead', 8)
+        node._base_bound(gomory_cuts=False)
+        return node
+
+    def test_init(self):
+        node = ReliabilityBranchNode(small_branch_copy.lp, small_branch_copy.integerIndices)
+        self.assertTrue(node.branch_method == 'reliability')
+        self.assertFalse(node.reliability_threshold, 'should exist but be none')
+        self.assertFalse(node.max_strong_branch_candidates, 'should exist but be none')
+        self.assertFalse(node.strong_branch_lookahead, 'should exist but be none')
+
+    def test_bound_fails_assertions(self):
+        node = ReliabilityBranchNode(small_branch_copy.lp, small_branch_copy.integerIndices)
+        self.assertRaisesRegex(AssertionError, 'reliability_threshold is a positive integer',
+                               node.bound, {}, reliability_threshold=0)
+        self.assertRaisesRegex(AssertionError,
+                               'max_strong_branch_candidates is a positive integer',
+                               node.bound, {}, max_strong_branch_candidates=1.5)
+        self.assertRaisesRegex(AssertionError, 'strong_branch_lookahead is a positive integer',
+                               node.bound, {}, strong_branch_lookahead=-1)
+
+    def test_bound(self):
+        node = ReliabilityBranchNode(small_branch_copy.lp, small_branch_copy.integerIndices)
+        rtn = node.bound({}, reliability_threshold=2, max_strong_branch_candidates=3,
+                         strong_branch_lookahead=4, gomory_cuts=False)
+        self.assertTrue(node.reliability_threshold == 2)
+        self.assertTrue(node.max_strong_branch_candidates == 3)
+        self.assertTrue(node.strong_branch_lookahead == 4)
+
+        # both fractional indices were strong branched and only the best one's
+        # children are kept
+        for idx in [1, 2]:
+            for direction in ['right', 'left']:
+                self.assertTrue(rtn['pseudo_costs'][idx][direction]['times'] == 1)
+        self.assertTrue(set(node.strong_branch_children) == {1})
+
+    def test_update_pseudo_costs(self):
+        sb_return = {'right': ReliabilityBranchNode(small_branch_copy.lp,
+                                                    small_branch_copy.integerIndices),
+                     'left': ReliabilityBranchNode(small_branch_copy.lp,
+                                                   small_branch_copy.integerIndices)}
+
+        # strong branch each unreliable fractional index
+        node = self.make_node()
+        with patch.object(node, '_strong_branch') as sb, \
+                patch.object(node, '_calculate_costs') as cc:
+            sb.return_value = sb_return
+            node._update_pseudo_costs()
+            self.assertTrue(sb.call_count == 2)
+            self.assertTrue(cc.call_count == 4)
+
+        # but no more than max_strong_branch_candidates of them
+        node = self.make_node(max_strong_branch_candidates=1)
+        with patch.object(node, '_strong_branch') as sb, \
+                patch.object(node, '_calculate_costs') as cc:
+            sb.return_value = sb_return
+            node._update_pseudo_costs()
+            self.assertTrue(sb.call_count == 1)
+            self.assertTrue(cc.call_count == 2)
+
+        # and skip those that are reliable
+        pc = {idx: {direction: {'cost': 1, 'times': 8} for direction in ['right', 'left']}
+              for idx in [1, 2]}
+        node = self.make_node(pseudo_costs=pc)
+        with patch.object(node, '_strong_branch') as sb, \
+                patch.object(node, '_calculate_costs') as cc:
+            node._update_pseudo_costs()
+            self.assertFalse(sb.called)
+            self.assertFalse(cc.called)
+
+        # stop once strong_branch_lookahead indices in a row don't improve the
+        # best score, which none after the first can when costs aren't updated
+        node = self.make_node(model=random, strong_branch_lookahead=2)
+        with patch.object(node, '_strong_branch') as sb, \
+                patch.object(node, '_calculate_costs') as cc:
+            sb.return_value = sb_return
+            node._update_pseudo_costs()
+            self.assertTrue(sb.call_count == 3)
+            self.assertTrue(cc.call_count == 6)
+
+        # the branched on index is updated if it wasn't strong branched
+        node = self.make_node(pseudo_costs=pc)
+        node._b_idx = 0
+        with patch.object(node, '_calculate_costs') as cc:
+            node._update_pseudo_costs()
+            self.assertTrue(cc.call_count == 1)
+            cc.assert_called_with(node)
+
+    def test_update_pseudo_costs_in_parallel(self):
+        # strong branching in batches across processes gives the same pseudo costs,
+        # even when the lookahead stops before a batch is used up
+        for kwargs in [{}, {'strong_branch_lookahead': 1}, {'max_strong_branch_candidates': 3}]:
+            nodes = {}
+            for processes in [1, 4]:
+                nodes[processes] = self.make_node(model=random, strong_branch_processes=processes,
+                                                  **kwargs)
+                nodes[processes]._update_pseudo_costs()
+            self.assertTrue('_strong_branch_in_parallel' in nodes[4].stats.phases)
+            self.assertTrue(nodes[1].pseudo_costs == nodes[4].pseudo_costs)
+            self.assertTrue(set(nodes[1].strong_branch_children) ==
+                            set(nodes[4].strong_branch_children))
+
+    def test_check_pseudo_costs(self):
+        node = self.make_node()
+        # indices branched on without strong branching only have one direction
+        pc = {1: {'right': {'cost': 1, 'times': 2}, 'left': {'cost': 1, 'times': 1}},
+              2: {'left': {'cost': 1, 'times': 1}}}
+        self.assertFalse(node._check_pseudo_costs(pc))
+        self.assertFalse(pc[2].get('right'), 'should not fill in the missing direction')
+
+        # but the directions there are still checked
+        pc[2]['left']['times'] = -1
+        self.assertTrue(node._check_pseudo_costs(pc) ==
+                        ['index 2 direction left times must be nonnegative int'])
+        self.assertTrue(node._check_pseudo_costs({5: {}}) == ['index 5 not integer index'])
+
+    def test_solve_with_few_candidates(self):
+        # few candidates and a short lookahead leave most fractional indices to
+        # be branched on without strong branching, giving them one direction
+        rng = np.random.default_rng(0)
+        for trial in range(14):
+            A = rng.integers(-5, 6, (8, 15))
+            b = CyLPArray(rng.integers(-10, 1, 8).astype(float))
+            c = CyLPArray(rng.integers(-5, 6, 15).astype(float))
+            u = CyLPArray(rng.integers(1, 5, 15).astype(float))
+            objective_values = []
+            for Node, kwargs in [(BaseNode, {}),
+                                 (ReliabilityBranchNode,
+                                  {'pseudo_costs': {}, 'max_strong_branch_candidates': 2,
+                                   'strong_branch_lookahead': 1})]:
+                model = build_milp(A=A, b=b, c=c, l=CyLPArray(np.zeros(15)), u=u,
+                                   integerIndices=list(range(15)), sense=['Min', '>='],
+                                   numVars=15)
+                bb = BranchAndBound(model, Node, gomory_cuts=False, **kwargs)
+                bb.solve()
+                objective_values.append(bb.objective_value)
+            self.assertTrue(bb.status == 'optimal')
+            self.assertTrue(isclose(*objective_values, abs_tol=1e-6), f'trial {trial}')
+
+    def test_is_reliable(self):
+        node = self.make_node(reliability_threshold=2)
+        self.assertFalse(node._is_reliable(1))
+        node.pseudo_costs = {1: {'right': {'cost': 1, 'times': 2},
+                                 'left': {'cost': 1, 'times': 1}}}
+        self.assertFalse(node._is_reliable(1))
+        node.pseudo_costs[1]['left']['times'] = 2
+        self.assertTrue(node._is_reliable(1))
+
+    def test_scores(self):
+        node = self.make_node()
+        node.solution = [0, 1.25, 2.5]
+
+        # without pseudo costs indices are scored by how fractional they are
+        self.assertTrue(node._scores({}, [1, 2]) == {1: .25, 2: .5})
+
+        # missing directions use the average of the others
+        pc = {1: {'right': {'cost': 2, 'times': 1}, 'left': {'cost': 4, 'times': 1}}}
+        self.assertTrue(node._scores(pc, [1, 2]) == {1: 1, 2: 1})
+        pc[2] = {'right': {'cost': 4, 'times': 1}}
+        self.assertTrue(node._scores(pc, [1, 2]) == {1: 1, 2: 2})
+        # as do directions never branched on
+        pc[2]['left'] = {'cost': 0, 'times': 0}
+        self.assertTrue(node._scores(pc, [1, 2]) == {1: 1, 2: 2})
+
+    def test_best_pseudo_costs_index(self):
+        pc = {1: {'right': {'cost': 1, 'times': 1}, 'left': {'cost': 1, 'times': 1}},
+              2: {'right': {'cost': 1, 'times': 1}, 'left': {'cost': 1, 'times': 1}}}
+        node = self.make_node()
+        node.solution = [0, 1.25, 2.5]
+        self.assertTrue(node._best_pseudo_costs_index(pc) == 2)
+        pc[1] = {'right': {'cost': 10, 'times': 1}, 'left': {'cost': 10, 'times': 1}}
+        self.assertTrue(node._best_pseudo_costs_index(pc) == 1)
+
+        # fractional indices don't all need pseudo costs, 2 scores 10 * .5 with
+        # the average cost
+        del pc[2]
+        self.assertTrue(node._best_pseudo_costs_index(pc) == 2)
+        self.assertTrue(node._best_pseudo_costs_index({}) == 2)
+
+    def test_branch(self):
+        node = ReliabilityBranchNode(random.lp, random.integerIndices)
+        rtn = node.bound({}, max_strong_branch_candidates=2, gomory_cuts=False)
+        best_idx = node._best_pseudo_costs_index(rtn['pseudo_costs'])
+        saved = node.strong_branch_children.get(best_idx)
+        rtn = node.branch(rtn['pseudo_costs'], next_node_idx=1)
+        for direction in ['right', 'left']:
+            self.assertTrue(isinstance(rtn[direction], ReliabilityBranchNode))
+            self.assertTrue(rtn[direction]._b_idx == best_idx)
+            if saved:
+                self.assertTrue(rtn[direction]._lp_data is saved[direction])
+
+    # node type to use in base_test_models
+    Node = ReliabilityBranchNode
+
+    def test_models(self):
+        self.base_test_models(reliability_threshold=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 
 from simple_mip_solver import PseudoCostBranchDepthFirstSearchNode, \
-    DisjunctiveCutBoundPseudoCostBranchNode
+    DisjunctiveCutBoundPseudoCostBranchNode, PseudoCostBranchBestEstimateSearchNode
 from test_simple_mip_solver.helpers import TestModels
 
 
@@ -21,5 +21,13 @@ class TestDisjunctiveCutBoundPseudoCostBranchNode(TestModels):
         self.disjunctive_cut_test_models()
 
 
+class TestPseudoCostBranchBestEstimateSearchNode(TestModels):
+
+    Node = PseudoCostBranchBestEstimateSearchNode  # node type to use in base_test_models
+
+    def test_models(self):
+        self.base_test_models()
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,83 @@
+from coinor.cuppy.milpInstance import MILPInstance
+from queue import PriorityQueue
+import unittest
+
+from simple_mip_solver.nodes.search.best_estimate import BestEstimateSearchNode
+from test_simple_mip_solver.example_models import small_branch
+
+from test_simple_mip_solver.helpers import TestModels
+
+
+class TestNode(TestModels):
+
+    def setUp(self) -> None:
+        # fresh model so bounding doesn't change the shared one
+        lp = small_branch.lp
+        self.model = MILPInstance(A=small_branch.A, b=small_branch.b, c=lp.objective,
+                                  l=small_branch.l, u=small_branch.u, sense=['Min', '>='],
+                                  integerIndices=small_branch.integerIndices, numVars=3)
+
+    def test_init(self):
+        node = BestEstimateSearchNode(self.model.lp, self.model.integerIndices, dual_bound=-3)
+        self.assertTrue(node.search_method == 'best estimate')
+        self.assertTrue(node.estimate == -3, 'estimate defaults to the dual bound')
+        node = BestEstimateSearchNode(self.model.lp, self.model.integerIndices, estimate=2)
+        self.assertTrue(node.estimate == 2)
+
+    def test_init_fails_asserts(self):
+        self.assertRaisesRegex(AssertionError, 'estimate must be a float or an int',
+                               BestEstimateSearchNode, self.model.lp,
+                               self.model.integerIndices, estimate='1')
+
+    def test_base_branch(self):
+        node = BestEstimateSearchNode(self.model.lp, self.model.integerIndices)
+        node.bound(gomory_cuts=False)
+        # solution is [0, 1.25, 1.5] with objective value -2.75 and index 2 most fractional
+        pseudo_costs = {0: {'left': {'cost': 2, 'times': 1}, 'right': {'cost': 4, 'times': 1}}}
+        rtn = node.branch(pseudo_costs=pseudo_costs, next_node_idx=1)
+        # indices without pseudo costs use the averages, 2 down and 4 up. index 1
+        # adds its cheaper rounding, .25 * 2, and index 2 the one for its direction
+        self.assertTrue(rtn['left'].estimate == -2.75 + .5 + .5 * 2)
+        self.assertTrue(rtn['right'].estimate == -2.75 + .5 + .5 * 4)
+        self.assertTrue(rtn['left'].dual_bound == rtn['right'].dual_bound == -2.75)
+
+        # without pseudo costs, the estimate is the dual bound
+        node = BestEstimateSearchNode(self.model.lp, self.model.integerIndices)
+        node.bound(gomory_cuts=False)
+        rtn = node.branch(next_node_idx=1)
+        self.assertTrue(rtn['left'].estimate == rtn['right'].estimate == -2.75)
+
+    def test_lt(self):
+        node1 = BestEstimateSearchNode(self.model.lp, self.model.integerIndices, estimate=1)
+        node2 = BestEstimateSearchNode(self.model.lp, self.model.integerIndices, estimate=0,
+                                       dual_bound=2)
+
+        self.assertTrue(node2 < node1)
+        self.assertFalse(node1 < node2)
+        self.assertRaises(TypeError, node1.__lt__, 5)
+
+        # make sure if we put them in PQ that they come out in the right order
+        q = PriorityQueue()
+        q.put(node1)
+        q.put(node2)
+        self.assertTrue(q.get().estimate == 0)
+        self.assertTrue(q.get().estimate == 1)
+
+    def test_eq(self):
+        node1 = BestEstimateSearchNode(self.model.lp, self.model.integerIndices, estimate=1)
+        node2 = BestEstimateSearchNode(self.model.lp, self.model.integerIndices, estimate=0)
+        node3 = BestEstimateSearchNode(self.model.lp, self.model.integerIndices, estimate=0,
+                                       dual_bound=-1)
+
+        self.assertTrue(node3 == node2)
+        self.assertFalse(node1 == node2)
+        self.assertRaises(TypeError, node1.__eq__, 5)
+
+    Node = BestEstimateSearchNode
+
+    def test_models(self):
+        self.base_test_models()
+
+
+if __name__ == '__main__':
+    unittest.main()
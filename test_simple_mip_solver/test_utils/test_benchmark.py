@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from simple_mip_solver import BaseNode, PseudoCostBranchDepthFirstSearchNode, \
+    DisjunctiveCutBoundPseudoCostBranchNode, PseudoCostBranchBestEstimateSearchNode
+from simple_mip_solver.utils.benchmark import find_models, run_benchmark, compare, \
+    write_results, read_results, main, node_classes, model_sets
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.result = {'model': 'example_models/a.mps', 'Node': 'BaseNode',
+                       'status': 'optimal', 'objective_value': -2, 'wall_time': 1,
+                       'evaluated_nodes': 10, 'simplex_iterations': 100, 'peak_memory': 1000}
+
+    def test_node_classes(self):
+        self.assertTrue(set(node_classes.values()) == {PseudoCostBranchDepthFirstSearchNode,
+                                                       DisjunctiveCutBoundPseudoCostBranchNode,
+                                                       PseudoCostBranchBestEstimateSearchNode})
+
+    def test_find_models_fails_asserts(self):
+        self.assertRaisesRegex(AssertionError, 'model_set must be one of', find_models, 'miplib')
+
+    def test_find_models(self):
+        self.assertTrue(set(model_sets) == {'example_models', 'scale_1_models',
+                                            'example_value_functions'})
+        self.assertTrue(len(find_models('example_models')) == 64)
+        files = find_models('example_value_functions')
+        self.assertTrue(len(files) == 1600, 'should search each instance folder')
+        self.assertTrue(files == sorted(files))
+        self.assertTrue(all(f.endswith('.mps') for f in files))
+
+    def test_run_benchmark_fails_asserts(self):
+        self.assertRaisesRegex(AssertionError, 'Nodes must be BaseNode subclasses',
+                               run_benchmark, find_models('example_models')[:1], [int])
+
+    def test_run_benchmark(self):
+        files = find_models('example_models')[:2]
+        results = run_benchmark(files, [BaseNode, PseudoCostBranchDepthFirstSearchNode])
+        self.assertTrue(len(results) == 4)
+        self.assertTrue([r['Node'] for r in results[:2]] ==
+                        ['BaseNode', 'PseudoCostBranchDepthFirstSearchNode'])
+        models = {os.path.join('example_models', os.path.basename(f)) for f in files}
+        for r in results:
+            self.assertTrue(r['model'] in models)
+            self.assertTrue(r['status'] == 'optimal')
+            self.assertTrue(r['wall_time'] >= r['solve_time'] > 0)
+            self.assertTrue(r['evaluated_nodes'] > 0)
+            self.assertTrue(r['simplex_iterations'] > 0)
+            self.assertTrue(r['peak_memory'] > 0)
+            self.assertTrue(r['gap_history'][-1][1] == r['evaluated_nodes'])
+            self.assertTrue('_bound_lp' in r['phases'])
+
+    def test_compare_fails_asserts(self):
+        self.assertRaisesRegex(AssertionError, 'tolerance is nonnegative',
+                               compare, [], [], tolerance=-1)
+        self.assertRaisesRegex(AssertionError, 'min_time is nonnegative',
+                               compare, [], [], min_time=-1)
+
+    def test_compare(self):
+        same = dict(self.result)
+        self.assertFalse(compare([same], [self.result]))
+
+        # small changes and solves missing from the baseline pass
+        close = {**self.result, 'objective_value': -2.001, 'wall_time': 1.2,
+                 'evaluated_nodes': 12}
+        self.assertFalse(compare([close], [self.result]))
+        self.assertFalse(compare([{**self.result, 'Node': 'PseudoCostBranchNode'}],
+                                 [self.result]))
+
+        worse = {**self.result, 'status': 'stopped on iterations or time',
+                 'evaluated_nodes': 20, 'simplex_iterations': 200, 'peak_memory': 2000}
+        regressions = compare([worse], [self.result])
+        self.assertTrue(len(regressions) == 4)
+        self.assertTrue(regressions[0].startswith('example_models/a.mps with BaseNode: status'))
+        self.assertTrue(len(compare([{**self.result, 'objective_value': -1}],
+                                    [self.result])) == 1)
+
+        # wall time has to grow past timer noise too
+        fast = {**self.result, 'wall_time': .01}
+        self.assertFalse(compare([{**fast, 'wall_time': .05}], [fast]))
+        self.assertTrue(len(compare([{**fast, 'wall_time': .5}], [fast])) == 1)
+
+    def test_write_and_read_results(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'results.json')
+            results = [{**self.result, 'objective_value': float('inf'),
+                        'gap_history': [[0.1, 1, None]]}]
+            write_results(results, path)
+            self.assertTrue(read_results(path) == results)
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'results.json')
+            baseline = os.path.join(folder, 'baseline.json')
+            args = ['--model-sets', 'example_models', '--nodes',
+                    'PseudoCostBranchDepthFirstSearchNode', '--output', path]
+            files = find_models('example_models')
+            with patch('simple_mip_solver.utils.benchmark.find_models',
+                       return_value=files[:1]):
+                self.assertTrue(main(args) == 0)
+                results = read_results(path)
+                self.assertTrue(len(results) == 1)
+
+                # a baseline that did much better flags a regression
+                write_results([{**results[0], 'evaluated_nodes': 0, 'wall_time': 0}], baseline)
+                self.assertTrue(main(args + ['--baseline', baseline]) == 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
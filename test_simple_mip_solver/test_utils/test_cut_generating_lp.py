@@ -5,6 +5,7 @@ from math import isclose
 import numpy as np
 from numpy.testing import assert_allclose
 import os
+import scipy.sparse as sp
 import unittest
 from unittest.mock import patch
 
@@ -118,6 +119,7 @@ class TestCutGeneratingLP(unittest.TestCase):
         self.assertTrue((lp.constraints[0].varCoefs[u_5] == dn[5].lp.coefMatrix.T).toarray().all())
         self.assertTrue((lp.constraints[0].varCoefs[w_5] == np.eye(3)).all())
         self.assertTrue((lp.constraints[0].varCoefs[v_5] == -np.eye(3)).all())
+        self.assertTrue(sp.issparse(lp.constraints[0].varCoefs[w_5]), 'identity stays sparse')
 
         self.assertTrue(len(lp.constraints[1].varCoefs) == 4)
         self.assertTrue((lp.constraints[1].varCoefs[pi0] == -1).toarray().all())
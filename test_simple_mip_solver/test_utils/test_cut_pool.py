@@ -0,0 +1,62 @@
+from cylp.py.modeling.CyLPModel import CyLPArray
+import unittest
+
+from simple_mip_solver.utils.cut_pool import CutPool
+
+
+class TestCutPool(unittest.TestCase):
+
+    def test_add_fails_asserts(self):
+        self.assertRaisesRegex(AssertionError, 'cuts must be a dictionary',
+                               CutPool().add, [(CyLPArray([1, 0]), 0)])
+
+    def test_add(self):
+        pool = CutPool()
+        self.assertTrue(pool.version == 0)
+        pool.add({'cut_1': (CyLPArray([1, 0]), 0), 'cut_2': (CyLPArray([0, 1]), 1)})
+        self.assertTrue(pool.version == 2)
+        pool.add({})
+        self.assertTrue(pool.version == 2)
+
+    def test_cuts_since_fails_asserts(self):
+        pool = CutPool()
+        self.assertRaisesRegex(AssertionError, 'version must be an integer no greater',
+                               pool.cuts_since, 1)
+        self.assertRaisesRegex(AssertionError, 'version must be an integer no greater',
+                               pool.cuts_since, -1)
+
+    def test_cuts_since(self):
+        pool = CutPool()
+        pool.add({'cut_1': (CyLPArray([1, 0]), 0)})
+        pool.add({'cut_2': (CyLPArray([0, 1]), 1), 'cut_3': (CyLPArray([1, 1]), 2)})
+        self.assertTrue(list(pool.cuts_since(0)) == ['cut_1', 'cut_2', 'cut_3'])
+        self.assertTrue(list(pool.cuts_since(1)) == ['cut_2', 'cut_3'])
+        self.assertTrue(pool.cuts_since(2)['cut_3'][1] == 2)
+        self.assertFalse(pool.cuts_since(3))
+
+    def test_trimmed_fails_asserts(self):
+        pool = CutPool()
+        pool.add({'cut_1': (CyLPArray([1, 0]), 0)})
+        self.assertRaisesRegex(AssertionError, 'between the trimmed and current versions',
+                               pool.trimmed, 2)
+        self.assertRaisesRegex(AssertionError, 'between the trimmed and current versions',
+                               pool.trimmed(1).trimmed, 0)
+        self.assertRaisesRegex(AssertionError, 'cuts before this version were trimmed',
+                               pool.trimmed(1).cuts_since, 0)
+
+    def test_trimmed(self):
+        pool = CutPool()
+        pool.add({'cut_1': (CyLPArray([1, 0]), 0)})
+        pool.add({'cut_2': (CyLPArray([0, 1]), 1), 'cut_3': (CyLPArray([1, 1]), 2)})
+        trimmed = pool.trimmed(1)
+        self.assertTrue(len(trimmed._cuts) == 2)
+        self.assertTrue(trimmed.version == 3)
+        self.assertTrue(list(trimmed.cuts_since(1)) == ['cut_2', 'cut_3'])
+        trimmed.add({'cut_4': (CyLPArray([2, 1]), 2)})
+        self.assertTrue(trimmed.version == 4)
+        self.assertTrue(list(trimmed.cuts_since(3)) == ['cut_4'])
+        self.assertTrue(pool.version == 3, 'the original is left alone')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import numpy as np
+import os
+import tempfile
+import unittest
+
+from simple_mip_solver.utils.dual_function import DualFunction
+
+
+class TestDualFunction(unittest.TestCase):
+
+    def setUp(self) -> None:
+        # root 0 with children 1 and 2, and 2 with children 3 and 4
+        self.constraint_duals = np.array([[1, 0], [2, 0], [0, 1], [0, 2], [1, 1]])
+        self.bound_terms = np.array([0, -1, 0, -2, 1])
+        self.parents = np.array([-1, 0, 0, 2, 2])
+        self.leaves = np.array([False, True, False, True, True])
+        self.df = DualFunction(self.constraint_duals, self.bound_terms, self.parents,
+                               self.leaves)
+
+    def brute_force(self, b):
+        values = self.constraint_duals @ b + self.bound_terms
+        lineages = {1: [0, 1], 3: [0, 2, 3], 4: [0, 2, 4]}
+        return min(max(values[n] for n in lineage) for lineage in lineages.values())
+
+    def test_init_fails_asserts(self):
+        self.assertRaisesRegex(AssertionError, 'constraint_duals is a 2-D array',
+                               DualFunction, self.bound_terms, self.bound_terms,
+                               self.parents, self.leaves)
+        self.assertRaisesRegex(AssertionError, 'need an entry for each row',
+                               DualFunction, self.constraint_duals, self.bound_terms[:4],
+                               self.parents, self.leaves)
+        self.assertRaisesRegex(AssertionError, 'parents must come before their children',
+                               DualFunction, self.constraint_duals, self.bound_terms,
+                               np.array([-1, 0, 0, 4, 2]), self.leaves)
+        self.assertRaisesRegex(AssertionError, 'there must be at least one leaf',
+                               DualFunction, self.constraint_duals, self.bound_terms,
+                               self.parents, np.zeros(5))
+        self.assertRaisesRegex(AssertionError, 'negate_rhs is boolean',
+                               DualFunction, self.constraint_duals, self.bound_terms,
+                               self.parents, self.leaves, 1)
+        self.assertRaisesRegex(AssertionError, 'node_ids needs an entry for each row',
+                               DualFunction, self.constraint_duals, self.bound_terms,
+                               self.parents, self.leaves, node_ids=[0, 1])
+
+    def test_init(self):
+        self.assertTrue(self.df.num_constraints == 2)
+        self.assertTrue([list(level) for level in self.df._levels] == [[1, 2], [3, 4]])
+
+    def test_call_fails_asserts(self):
+        self.assertRaisesRegex(AssertionError, 'shape of the RHS being added should match',
+                               self.df, [1, 2, 3])
+        self.assertRaisesRegex(AssertionError, 'chunk_size is positive integer',
+                               self.df, [1, 2], chunk_size=0)
+
+    def test_call(self):
+        rhs = np.array([[0, 0], [1, 2], [-3, 1], [2, -2], [5, 5]])
+        expected = [self.brute_force(b) for b in rhs]
+        self.assertTrue(np.allclose(self.df(rhs), expected))
+        self.assertTrue(np.allclose(self.df(rhs, chunk_size=2), expected))
+        self.assertTrue(self.df(rhs[1]) == expected[1])
+
+        negated = DualFunction(self.constraint_duals, self.bound_terms, self.parents,
+                               self.leaves, negate_rhs=True)
+        self.assertTrue(np.allclose(negated(-rhs), expected))
+
+    def test_leaf_bounds(self):
+        self.assertRaisesRegex(AssertionError, 'shape of the RHS being added should match',
+                               self.df.leaf_bounds, [[1, 2]])
+        b = np.array([1, 2])
+        bounds = self.df.leaf_bounds(b)
+        self.assertTrue(bounds == {1: 1, 3: 2, 4: 4})
+        self.assertTrue(min(bounds.values()) == self.df(b))
+
+        named = DualFunction(self.constraint_duals, self.bound_terms, self.parents,
+                             self.leaves, node_ids=[0, 5, 6, 9, 10])
+        self.assertTrue(named.leaf_bounds(b) == {5: 1, 9: 2, 10: 4})
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'dual_function')
+            self.df.save(path)
+            self.assertTrue(os.path.exists(path), 'should save to the exact path')
+            loaded = DualFunction.load(path)
+        self.assertTrue((loaded.constraint_duals == self.constraint_duals).all())
+        self.assertTrue((loaded.parents == self.parents).all())
+        self.assertFalse(loaded.negate_rhs)
+        self.assertTrue((loaded.node_ids == self.df.node_ids).all())
+        rhs = np.array([[1, 2], [-3, 1]])
+        self.assertTrue(np.allclose(loaded(rhs), self.df(rhs)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,8 +4,9 @@ import numpy as np
 import unittest
 from unittest.mock import patch
 
+from simple_mip_solver.utils import floating_point
 from simple_mip_solver.utils.floating_point import scale_cut, numerically_safe_cut, \
-    get_fraction
+    get_fraction, numerically_safe_cuts, get_fractions
 from simple_mip_solver.utils.tolerance import exact_coefficient_approximation_epsilon as eps
 
 
@@ -46,14 +47,15 @@ class TestFloatingPoint(unittest.TestCase):
         pi0 = 4
 
         # check function calls
-        with patch('simple_mip_solver.utils.floating_point.scale_cut') as sc, \
-                patch('simple_mip_solver.utils.floating_point.get_fraction') as gf:
-            sc.return_value = (CyLPArray([.25, .5, 1]), 1)
-            gf.side_effect = [(1, 4), (1, 2), (1, 1), (4, 1)]
+        with patch('simple_mip_solver.utils.floating_point.get_fractions') as gf:
+            gf.side_effect = [(np.array([[1, 1, 1]]), np.array([[4, 2, 1]])),
+                              (np.array([4]), np.array([1]))]
             safe_pi, safe_pi0 = numerically_safe_cut(pi, pi0, make_integer=True)
 
-            self.assertTrue(sc.called)
-            self.assertTrue(gf.call_count == 4)
+            self.assertTrue(gf.call_count == 2)
+            self.assertTrue((gf.call_args_list[0].args[0] == [[.25, .5, 1]]).all())
+            self.assertTrue(gf.call_args_list[1].args[0] == [4])
+            self.assertTrue(isinstance(safe_pi, CyLPArray))
             self.assertTrue(all(safe_pi == [1, 2, 4]))
             self.assertTrue(safe_pi0 == 4)
 
@@ -144,6 +146,83 @@ class TestFloatingPoint(unittest.TestCase):
         self.assertTrue(all(safe_pi == np.array([1, 0, 100])))
         self.assertTrue(isclose(safe_pi0, 1, abs_tol=eps))
 
+    def test_numerically_safe_cuts_fails_asserts(self):
+        self.assertRaisesRegex(AssertionError, 'pis is a 2D array', numerically_safe_cuts,
+                               pis=np.array([1, 2, 3]), pi0s=np.array([4]))
+        self.assertRaisesRegex(AssertionError, 'pi0s has a bound for each cut',
+                               numerically_safe_cuts, pis=np.array([[1, 2, 3]]),
+                               pi0s=np.array([4, 5]))
+        self.assertRaisesRegex(AssertionError, 'estimate must be over or under',
+                               numerically_safe_cuts, pis=np.array([[1, 2, 3]]),
+                               pi0s=np.array([4]), estimate=None)
+        self.assertRaisesRegex(AssertionError, 'max_abs should be positive',
+                               numerically_safe_cuts, pis=np.array([[1, 2, 3]]),
+                               pi0s=np.array([4]), max_abs=0)
+
+    def test_numerically_safe_cuts(self):
+        # each cut gets exactly what it would on its own
+        pis = np.vstack([np.random.uniform(-10, 10, (50, 4)), np.zeros((1, 4)),
+                         [[1, 100, 10000], [100, 9999, 10000]] @ np.eye(3, 4)])
+        pi0s = np.concatenate([np.random.uniform(-10, 10, 51), [100, 100]])
+        for estimate in ['over', 'under']:
+            for make_integer in [True, False]:
+                safe_pis, safe_pi0s = numerically_safe_cuts(
+                    pis=pis, pi0s=pi0s, estimate=estimate, make_integer=make_integer,
+                    max_term=1000)
+                for pi, pi0, safe_pi, safe_pi0 in zip(pis, pi0s, safe_pis, safe_pi0s):
+                    expected_pi, expected_pi0 = numerically_safe_cut(
+                        pi=CyLPArray(pi), pi0=float(pi0), estimate=estimate,
+                        make_integer=make_integer, max_term=1000)
+                    self.assertTrue(all(safe_pi == expected_pi))
+                    self.assertTrue(safe_pi0 == expected_pi0)
+        self.assertTrue(all(safe_pis[50] == 0) and safe_pi0s[50] == pi0s[50])
+
+        # no cuts
+        safe_pis, safe_pi0s = numerically_safe_cuts(pis=np.zeros((0, 3)), pi0s=np.zeros(0))
+        self.assertTrue(safe_pis.shape == (0, 3) and safe_pi0s.shape == (0,))
+
+    def test_get_fractions_fails_asserts(self):
+        self.assertRaisesRegex(AssertionError, 'should be a numpy array',
+                               get_fractions, [.5])
+        self.assertRaisesRegex(AssertionError, 'should be positive',
+                               get_fractions, np.array([.5]), max_term=-1)
+        self.assertRaisesRegex(AssertionError, "should be 'over' or 'under'",
+                               get_fractions, np.array([.5]), estimate='over-estimate')
+
+    def test_get_fractions(self):
+        # the same fractions as get_fraction, dead zones included
+        x = np.concatenate([np.random.uniform(-2, 2, 500),
+                            np.random.randint(-256, 256, 100) / 256,
+                            [0, 1e-8, .99999999, 3141.59, -1e-8, -.99999999, -3141.59]])
+        for max_term in [1000, 2 ** 60]:
+            for estimate in [None, 'over', 'under']:
+                n, d = get_fractions(x.reshape(-1, 1), max_term=max_term, estimate=estimate)
+                self.assertTrue(n.shape == d.shape == (len(x), 1))
+                for value, n_i, d_i in zip(x, n[:, 0], d[:, 0]):
+                    self.assertTrue((n_i, d_i) ==
+                                    get_fraction(value, max_term=max_term, estimate=estimate))
+
+    def test_get_fractions_memo(self):
+        floating_point._fraction_memo.clear()
+        x = np.array([.5, .25, .5])
+        with patch('simple_mip_solver.utils.floating_point._continued_fractions') as cf:
+            cf.return_value = (np.array([1, 1]), np.array([4, 2]))
+            n, d = get_fractions(x)
+            self.assertTrue(all(cf.call_args.args[0] == [.25, .5]), 'repeats solved once')
+            self.assertTrue(all(n == [1, 1, 1]) and all(d == [2, 4, 2]))
+            self.assertTrue(floating_point._fraction_memo[(.5, 1e3, None)] == (1, 2))
+
+            # seen values are looked up
+            cf.reset_mock()
+            get_fractions(np.array([.25]))
+            self.assertFalse(cf.called)
+
+        # and the memo is bounded
+        with patch('simple_mip_solver.utils.floating_point.fraction_memo_size', 3):
+            get_fractions(np.array([.125, .375]))
+            self.assertTrue(set(floating_point._fraction_memo) ==
+                            {(.125, 1e3, None), (.375, 1e3, None)})
+
     def test_get_fraction_fails_asserts(self):
         self.assertRaisesRegex(AssertionError, 'should be an int or float',
                                get_fraction, '5')
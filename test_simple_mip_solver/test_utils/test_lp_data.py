@@ -0,0 +1,145 @@
+from cylp.cy.CyClpSimplex import CyClpSimplex
+from cylp.py.modeling.CyLPModel import CyLPArray
+import numpy as np
+import pickle
+import scipy.sparse as sp
+import unittest
+
+from simple_mip_solver.algorithms.base_algorithm import BaseAlgorithm
+from simple_mip_solver.utils.lp_data import get_lp_data, build_lp, build_milp, \
+    compact_lp_data, expand_lp_data, shared_coefs, sharing_coefs, variable_bounds
+from test_simple_mip_solver.example_models import small_branch
+
+
+class TestLPData(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.lp = BaseAlgorithm._convert_constraints_to_greq(small_branch).lp
+        self.lp.dual()
+
+    def test_get_lp_data_fails_asserts(self):
+        self.assertRaisesRegex(AssertionError, 'lp must be CyClpSimplex instance',
+                               get_lp_data, 'fish')
+        lp = CyClpSimplex()
+        lp.addVariable('x', 1)
+        lp.addVariable('y', 1)
+        self.assertRaisesRegex(AssertionError, 'x must be our only variable', get_lp_data, lp)
+
+    def test_get_lp_data(self):
+        lp_data = get_lp_data(self.lp)
+        self.assertTrue(all(lp_data['variables_lower'] == self.lp.variablesLower))
+        self.assertTrue(all(lp_data['variables_upper'] == self.lp.variablesUpper))
+        self.assertTrue(all(lp_data['objective'] == self.lp.objective))
+        self.assertTrue(lp_data['objective_offset'] == 0)
+        self.assertTrue([c[0] for c in lp_data['constraints']] ==
+                        [c.name for c in self.lp.constraints])
+        self.assertTrue(lp_data['status'] == 0)
+        for i in [0, 1]:
+            self.assertTrue(all(lp_data['basis'][i] == self.lp.getBasisStatus()[i]))
+
+        # bounds are copied so changing the lp doesn't change the data
+        self.lp.variablesUpper = np.array([1., 1., 1.])
+        self.assertTrue(all(lp_data['variables_upper'] == 10))
+
+        # and it can be pickled
+        self.assertTrue(pickle.loads(pickle.dumps(lp_data))['status'] == 0)
+
+    def test_build_lp(self):
+        lp_data = get_lp_data(self.lp)
+        lp = build_lp(lp_data)
+        self.assertTrue(lp.getStatusCode() == 0)
+        self.assertTrue(lp.iteration == 0, 'warm start should need no more pivots')
+        self.assertTrue(lp.objectiveValue == self.lp.objectiveValue)
+        self.assertTrue(all(lp.primalVariableSolution['x'] ==
+                            self.lp.primalVariableSolution['x']))
+        self.assertTrue((lp.coefMatrix.toarray() == self.lp.coefMatrix.toarray()).all())
+        self.assertTrue(all(lp.constraintsLower == self.lp.constraintsLower))
+        self.assertTrue(get_lp_data(lp)['constraints'][0][1] is lp_data['constraints'][0][1],
+                        'rebuilt lps should share the coefficients they were built from')
+
+        # objective offsets (e.g. from presolve) carry over to objective values
+        lp = build_lp({**lp_data, 'objective_offset': -1})
+        self.assertTrue(lp.objectiveOffset == -1)
+        self.assertTrue(lp.objectiveValue == self.lp.objectiveValue + 1)
+
+        # bounds can be overridden and resolves skipped
+        u = lp_data['variables_upper'].copy()
+        u[2] = 1
+        lp = build_lp(lp_data, variables_upper=u, resolve=False)
+        self.assertTrue(all(lp.variablesUpper == [10, 10, 1]))
+        self.assertTrue(lp.getStatusCode() == -1)
+
+        # or changed by a bound change
+        lp = build_lp({**lp_data, 'bound_change': (2, 0, 1)}, resolve=False)
+        self.assertTrue(all(lp.variablesUpper == [10, 10, 1]))
+
+        # unsolved lps are not resolved
+        lp_data['status'] = -1
+        self.assertTrue(build_lp(lp_data).getStatusCode() == -1)
+
+    def test_variable_bounds(self):
+        lp_data = get_lp_data(self.lp)
+        lower, upper = variable_bounds(lp_data)
+        self.assertTrue(lower is lp_data['variables_lower'])
+        self.assertTrue(upper is lp_data['variables_upper'])
+
+        # bound changes are applied to copies
+        saved_lower, saved_upper = lower.copy(), upper.copy()
+        lower, upper = variable_bounds({**lp_data, 'bound_change': (1, 2, 3)})
+        self.assertTrue(lower[1] == 2 and upper[1] == 3)
+        self.assertTrue(all(lower[[0, 2]] == saved_lower[[0, 2]]))
+        self.assertTrue(all(upper[[0, 2]] == saved_upper[[0, 2]]))
+        self.assertTrue(all(lp_data['variables_lower'] == saved_lower))
+        self.assertTrue(all(lp_data['variables_upper'] == saved_upper))
+
+    def test_compact_lp_data(self):
+        lp_data = get_lp_data(self.lp)
+        A = lp_data['constraints'][0][1]
+        self.assertTrue(compact_lp_data(lp_data) is lp_data, 'nothing is shared yet')
+
+        with sharing_coefs({'A': A}):
+            compact = compact_lp_data(lp_data)
+            self.assertTrue(compact['constraints'][0][1] == 'A')
+            self.assertTrue(lp_data['constraints'][0][1] is A, 'lp_data should not change')
+            self.assertTrue(len(pickle.dumps(compact)) < len(pickle.dumps(lp_data)))
+            expanded = expand_lp_data(pickle.loads(pickle.dumps(compact)))
+            self.assertTrue(expanded['constraints'][0][1] is A)
+            self.assertTrue(build_lp(expanded).objectiveValue == self.lp.objectiveValue)
+
+            # sharing again within leaves them shared
+            with sharing_coefs({'A': A}):
+                pass
+            self.assertTrue(shared_coefs() == {'A': A})
+        self.assertFalse(shared_coefs())
+        self.assertRaisesRegex(AssertionError, 'are not shared with this process',
+                               expand_lp_data, compact)
+
+    def test_build_milp(self):
+        A, b = small_branch.A, small_branch.b
+        kwargs = {'c': small_branch.lp.objective, 'l': small_branch.l, 'u': small_branch.u,
+                  'integerIndices': [0, 1, 2], 'sense': ['Min', '>=']}
+        for coefs in [A, sp.csc_matrix(A), sp.csr_matrix(A)]:
+            model = build_milp(A=coefs, b=b, **kwargs)
+            self.assertTrue(model.A is coefs, 'A is used as given')
+            self.assertTrue(model.sense == '>=' and model.integerIndices == [0, 1, 2])
+            model.lp.dual()
+            self.assertTrue(model.lp.objectiveValue == -2.75)
+            self.assertTrue((model.lp.coefMatrix.toarray() == A).all())
+            self.assertTrue(all(model.lp.variablesUpper == 10))
+
+        # maximizing flips the objective, and a single variable is fine
+        model = build_milp(A=sp.csr_matrix([[1.]]), b=CyLPArray([1]), c=CyLPArray([2]),
+                           l=CyLPArray([0]), u=CyLPArray([5]), sense=['Max', '<='])
+        model.lp.primal()
+        self.assertTrue(model.lp.objectiveValue == -2)
+
+    def test_build_milp_fails_asserts(self):
+        self.assertRaisesRegex(AssertionError, 'sense is', build_milp, A=small_branch.A,
+                               b=small_branch.b, c=small_branch.lp.objective)
+        self.assertRaisesRegex(AssertionError, 'sense is', build_milp, A=small_branch.A,
+                               b=small_branch.b, c=small_branch.lp.objective,
+                               sense=['Min', '=='])
+
+
+if __name__ == '__main__':
+    unittest.main()
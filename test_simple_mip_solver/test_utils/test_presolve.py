@@ -0,0 +1,172 @@
+from coinor.cuppy.milpInstance import MILPInstance
+from cylp.cy.CyClpSimplex import CyClpSimplex
+from cylp.py.modeling.CyLPModel import CyLPArray
+import numpy as np
+import pickle
+import scipy.sparse as sp
+import unittest
+
+from simple_mip_solver.utils.lp_data import build_milp
+from simple_mip_solver.utils.presolve import Presolve
+
+
+class TestPresolve(unittest.TestCase):
+
+    def setUp(self) -> None:
+        # x3 is fixed to 1, row 0 divides by 2 to x0 + 2x1 >= 2, row 1 is a weaker
+        # copy of it, row 2 bounds x2 by 3, row 3 holds within the bounds and
+        # row 4 becomes x1 + x2 >= 1 once x3 is moved to its right hand side
+        self.A = np.matrix([[2, 4, 0, 0],
+                            [1, 2, 0, 0],
+                            [0, 0, -1, 0],
+                            [1, 0, 0, 1],
+                            [0, 1, 1, -1]])
+        self.b = CyLPArray([3, 1, -3, -1, 0])
+        self.c = CyLPArray([1, 2, -1, 1])
+        self.model = self.make_model(self.A, self.b)
+
+    def make_model(self, A, b, integer_indices=None, u=None):
+        return build_milp(A=A, b=b, c=self.c, l=CyLPArray([0, 0, 0, 1]),
+                          u=CyLPArray([10, 10, 10, 1]) if u is None else u,
+                          integerIndices=[0, 1, 2, 3] if integer_indices is None
+                          else integer_indices, sense=['Min', '>='])
+
+    def test_init(self):
+        presolve = Presolve(self.model)
+        self.assertTrue(sp.isspmatrix_csr(presolve._A))
+        self.assertTrue(all(presolve.kept_rows == [0, 4]))
+        self.assertTrue(all(presolve.kept_vars == [0, 1, 2]))
+        self.assertTrue(all(presolve.fixed_values == [0, 0, 0, 1]))
+        self.assertTrue(presolve.objective_offset == 1)
+        self.assertTrue(all(presolve.fixed_activity == [0, -1]))
+        self.assertTrue(all(presolve.row_scales == [2, 1, 1, 1, 1]))
+        self.assertTrue(presolve.removed_rows == 3)
+        self.assertTrue(presolve.tightened_bounds == 1)
+        self.assertTrue(presolve.tightened_rows == 1)
+        self.assertTrue(presolve.fixed_variables == 1)
+        self.assertTrue(presolve.rhs_dependent, 'row 2 became a bound')
+        self.assertFalse(presolve.infeasible)
+
+        # sparse models stay sparse and give the same reductions
+        sparse = Presolve(self.make_model(sp.csc_matrix(self.A), self.b))
+        self.assertTrue((sparse._A != presolve._A).nnz == 0)
+        self.assertTrue(all(sparse._rows == presolve._rows))
+        self.assertTrue(all(sparse._u == presolve._u))
+
+        # and it can be pickled
+        self.assertTrue(all(pickle.loads(pickle.dumps(presolve)).kept_vars == [0, 1, 2]))
+
+    def test_init_fails_asserts(self):
+        self.assertRaisesRegex(AssertionError, 'model must be cuppy MILPInstance',
+                               Presolve, CyClpSimplex())
+        model = MILPInstance(A=self.A, b=self.b, c=self.c, sense=['Min', '<='],
+                             integerIndices=[0], numVars=4)
+        self.assertRaisesRegex(AssertionError, 'constraints of the form Ax >= b',
+                               Presolve, model)
+        self.assertRaisesRegex(AssertionError, 'max_passes is a positive integer',
+                               Presolve, self.model, max_passes=0)
+
+    def test_remove_small_rows(self):
+        presolve = Presolve(self.model, max_passes=1)
+        self.assertFalse(presolve._rows[2])
+        self.assertTrue(presolve._u[2] == 3)
+
+        # rows of only fixed variables are removed unless they are violated
+        b = CyLPArray([3, 1, -3, -1, 0])
+        A = np.matrix([[0, 0, 0, 1]] * 5)
+        for rhs, infeasible in [(1, False), (2, True)]:
+            b[0] = rhs
+            presolve = Presolve(self.make_model(A, b))
+            self.assertTrue(presolve.infeasible == infeasible)
+            self.assertTrue(presolve._rows[0] == infeasible)
+
+    def test_remove_redundant_rows(self):
+        presolve = Presolve(self.model)
+        self.assertFalse(presolve._rows[3])
+        self.assertTrue(presolve._remove_redundant_rows() == 0)
+
+    def test_tighten_bounds(self):
+        # x0 + x1 + x2 >= 25 needs x0 to be at least 5 when the others are at most 10
+        A = np.matrix([[1, 1, 1, 0]])
+        presolve = Presolve(self.make_model(A, CyLPArray([25])))
+        self.assertTrue(all(presolve._l == [5, 5, 5, 1]))
+        self.assertTrue(presolve.rhs_dependent)
+
+        # and is infeasible if they can't reach it
+        presolve = Presolve(self.make_model(A, CyLPArray([31])))
+        self.assertTrue(presolve.infeasible)
+
+        # nothing to tighten with more than one unbounded term
+        u = CyLPArray([float('inf'), float('inf'), 10, 1])
+        presolve = Presolve(self.make_model(A, CyLPArray([25]), u=u))
+        self.assertTrue(all(presolve._l == [0, 0, 0, 1]))
+        self.assertFalse(presolve.rhs_dependent)
+
+    def test_tighten_integer_coefficients(self):
+        presolve = Presolve(self.model)
+        self.assertTrue(all(presolve._A[0].toarray()[0] == [1, 2, 0, 0]))
+        self.assertTrue(presolve._b[0] == 2)
+
+        # rows with continuous variables are left alone
+        presolve = Presolve(self.make_model(self.A, self.b, integer_indices=[1, 2, 3]))
+        self.assertTrue(all(presolve._A[0].toarray()[0] == [2, 4, 0, 0]))
+        self.assertTrue(presolve._b[0] == 3)
+        self.assertTrue(presolve.row_scales[0] == 1)
+
+    def test_remove_duplicate_rows(self):
+        presolve = Presolve(self.model)
+        self.assertTrue(presolve._rows[0] and not presolve._rows[1])
+
+        # the tighter row is kept whichever comes first
+        presolve = Presolve(self.make_model(self.A[[1, 0, 4]], self.b[[1, 0, 4]]))
+        self.assertTrue(all(presolve._rows == [False, True, True]))
+
+    def test_reduced_model(self):
+        model = Presolve(self.model).reduced_model()
+        self.assertTrue(isinstance(model, MILPInstance))
+        self.assertTrue(sp.isspmatrix_csc(model.A))
+        self.assertTrue((model.A.toarray() == [[1, 2, 0], [0, 1, 1]]).all())
+        self.assertTrue(all(model.b == [2, 1]))
+        self.assertTrue(all(model.lp.variablesUpper == [10, 10, 3]))
+        self.assertTrue(model.integerIndices == [0, 1, 2])
+
+        # the offset keeps objective values those of the original
+        model.lp.primal()
+        self.assertTrue(all(model.lp.primalVariableSolution['x'] == [0, 1, 3]))
+        self.assertTrue(model.lp.objectiveValue == 0, 'x = [0, 1, 3, 1] has value 2 - 3 + 1')
+
+        # a single variable left still makes a model
+        A = np.matrix([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0]])
+        presolve = Presolve(self.make_model(A, CyLPArray([10, 10, 0])))
+        self.assertTrue(all(presolve.kept_vars == [2]))
+        model = presolve.reduced_model()
+        model.lp.primal()
+        self.assertTrue(model.lp.objectiveValue == 10 + 20 - 10 + 1)
+
+    def test_postsolve(self):
+        presolve = Presolve(self.model)
+        self.assertTrue(all(presolve.postsolve(np.array([0, 1, 3])) == [0, 1, 3, 1]))
+        self.assertTrue(presolve.postsolve(None) is None)
+        self.assertRaisesRegex(AssertionError, 'solution must be of the reduced MILP',
+                               presolve.postsolve, np.array([0, 1, 3, 1]))
+
+    def test_postsolve_dual_function(self):
+        presolve = Presolve(self.model)
+        duals, terms = presolve.postsolve_dual_function(np.array([[2, 1], [0, 1]]),
+                                                        np.array([1, 0]))
+        self.assertTrue((duals == [[1, 0, 0, 0, 1], [0, 0, 0, 0, 1]]).all())
+        self.assertTrue(all(terms == [2, 1]), 'fixed activity -1 moves into the bound terms')
+
+        # the mapped function gives the reduced one's value at the original rhs
+        # for rows presolve didn't round
+        reduced_b = self.b[presolve.kept_rows] / presolve.row_scales[presolve.kept_rows] - \
+            presolve.fixed_activity
+        self.assertTrue(all(duals @ self.b + terms ==
+                            np.array([[2, 1], [0, 1]]) @ reduced_b + [1, 0]))
+        self.assertRaisesRegex(AssertionError, 'needs a column for each row',
+                               presolve.postsolve_dual_function, np.array([[1, 1, 1]]),
+                               np.array([0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
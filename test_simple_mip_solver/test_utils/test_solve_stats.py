@@ -0,0 +1,113 @@
+import pickle
+import unittest
+
+from simple_mip_solver.utils.solve_stats import SolveStats, timed
+
+
+class Timed:
+
+    def __init__(self):
+        self.stats = SolveStats()
+
+    @timed()
+    def phase(self, x):
+        return x
+
+    @timed('renamed')
+    def nested(self):
+        return self.nested_again()
+
+    @timed('renamed')
+    def nested_again(self):
+        return 1
+
+
+class TestSolveStats(unittest.TestCase):
+
+    def test_record(self):
+        stats = SolveStats()
+        with stats.record('a'):
+            with stats.record('a'):
+                pass
+            with stats.record('b'):
+                pass
+        self.assertTrue(stats.phases['a']['calls'] == 1, 'nested calls count once')
+        self.assertTrue(stats.phases['b']['calls'] == 1)
+        self.assertTrue(stats.phases['a']['time'] >= stats.phases['b']['time'] >= 0)
+        self.assertFalse(stats._active)
+
+        # failed calls still count
+        with self.assertRaises(ValueError):
+            with stats.record('b'):
+                raise ValueError
+        self.assertTrue(stats.phases['b']['calls'] == 2)
+        self.assertFalse(stats._active)
+
+    def test_add_simplex_iterations_fails_asserts(self):
+        self.assertRaisesRegex(AssertionError, 'iterations is a nonnegative integer',
+                               SolveStats().add_simplex_iterations, 'a', -1)
+
+    def test_add_simplex_iterations(self):
+        stats = SolveStats()
+        stats.add_simplex_iterations('a', 3)
+        stats.add_simplex_iterations('a', 2)
+        stats.add_simplex_iterations('b', 1)
+        self.assertTrue(stats.phases['a'] == {'calls': 0, 'time': 0, 'simplex_iterations': 5})
+        self.assertTrue(stats.simplex_iterations == 6)
+
+    def test_add_node_stats_fails_asserts(self):
+        self.assertRaisesRegex(AssertionError, 'stats must be a SolveStats instance',
+                               SolveStats().add_node_stats, 0, {})
+
+    def test_add_node_stats(self):
+        stats = SolveStats()
+        for idx in range(2):
+            node_stats = SolveStats()
+            with node_stats.record('a'):
+                pass
+            node_stats.add_simplex_iterations('a', 2)
+            stats.add_node_stats(idx, node_stats)
+        self.assertTrue(stats.phases['a']['calls'] == 2)
+        self.assertTrue(stats.phases['a']['simplex_iterations'] == 4)
+        self.assertTrue(stats.nodes[1]['a']['calls'] == 1)
+        self.assertTrue(stats.nodes[1]['a']['simplex_iterations'] == 2)
+
+    def test_add_gap(self):
+        stats = SolveStats()
+        stats.add_gap(.1, 1, None)
+        stats.add_gap(.2, 2, None)
+        stats.add_gap(.3, 3, .5)
+        stats.add_gap(.4, 4, 0)
+        self.assertTrue(stats.gap_history == [(.1, 1, None), (.3, 3, .5), (.4, 4, 0)],
+                        'only changes in the gap are kept')
+
+    def test_timed(self):
+        t = Timed()
+        self.assertTrue(t.phase(5) == 5)
+        self.assertTrue(t.phase.__name__ == 'phase')
+        self.assertTrue(t.stats.phases['phase']['calls'] == 1)
+        self.assertTrue(t.nested() == 1)
+        self.assertTrue(t.stats.phases['renamed']['calls'] == 1)
+
+    def test_totals(self):
+        stats = SolveStats()
+        with stats.record('a'):
+            stats.add_simplex_iterations('a', 3)
+        stats.add_node_stats(0, stats)
+        stats.add_gap(1, 1, None)
+        stats.add_gap(2, 3, .5)
+        totals = stats.totals()
+        self.assertTrue(totals.phases == stats.phases)
+        self.assertTrue(totals.phases['a'] is not stats.phases['a'])
+        self.assertFalse(totals.nodes)
+        self.assertTrue(totals.gap_history == [(2, 3, .5)])
+
+    def test_pickle(self):
+        stats = SolveStats()
+        with stats.record('a'):
+            pass
+        self.assertTrue(pickle.loads(pickle.dumps(stats)).phases == stats.phases)
+
+
+if __name__ == '__main__':
+    unittest.main()